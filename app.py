@@ -4,17 +4,23 @@ A Python-based web chatbot for creating professional PDF documents.
 """
 
 from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, session
+import io
 import os
 import json
+import threading
 from datetime import datetime, timedelta
 # PHASE 4: REMOVED - PromptParser replaced by main.py smart flow
 from utils.simple_steel_generator import SimpleSteelPDFGenerator
 from utils.pdf_integration import AIBAPDFIntegration
 from models.memory import ChatMemory
-from auth import auth_bp, login_required, profile_required, auth_manager
+from auth import auth_bp, login_required, profile_required, auth_manager, get_current_profile
 from config import Config
 from firestore_service import firestore_service
-from quote_brain import quote_brain, extract_quote_fields, detect_intent, update_quote_draft, quote_draft_state
+from chat_jobs import ChatJobManager
+from session_cleanup import SessionCleanupScheduler
+from pdf_render_pool import pdf_render_pool, RenderPoolBusy, RenderTimeout
+from bulk_quotations import BulkQuotationService, validate_request as validate_bulk_request
+from quote_brain import quote_brain, extract_quote_fields, detect_intent, update_quote_draft, get_quote_draft, quote_draft_registry
 
 app = Flask(__name__)
 app.secret_key = Config.SECRET_KEY
@@ -28,17 +34,86 @@ app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
 # Register authentication blueprint
 app.register_blueprint(auth_bp, url_prefix='/auth')
 
-# Initialize components
-# PHASE 4: REMOVED - prompt_parser replaced by main.py smart flow
-chat_memory = ChatMemory()
+# Template-based PDF generator and PDF result helpers
+from utils.template_pdf_generator import TemplatePDFGenerator, build_template_data
+from utils.pdf_result_cache import pdf_result_cache, PROFILE_FIELDS as PDF_PROFILE_FIELDS
+from utils.quote_utils import summarize_items
 
-# Initialize the enhanced PDF generators (Windows compatible)
-steel_pdf_generator = SimpleSteelPDFGenerator()
-pdf_integration = AIBAPDFIntegration()
+# Components are started by init_app(), not on import: PDF render workers re-run the
+# launching script (`python app.py`) and must not start chat memory threads, job pools
+# or warm-up there. run_server() and wsgi.py call it; the first request is a fallback.
+chat_memory = None
+steel_pdf_generator = None
+pdf_integration = None
+template_pdf_generator = None
+chat_jobs = None
+bulk_quotations = None
+session_cleanup = None
+_init_lock = threading.Lock()
 
-# Initialize the new template-based PDF generator
-from utils.template_pdf_generator import TemplatePDFGenerator
-template_pdf_generator = TemplatePDFGenerator()
+def init_app():
+    """
+    Start AIBA's components once per process.
+    
+    Returns:
+        Flask: The initialized app (usable as a WSGI factory)
+    """
+    global chat_memory, steel_pdf_generator, pdf_integration, template_pdf_generator
+    global chat_jobs, bulk_quotations, session_cleanup
+    
+    with _init_lock:
+        if chat_memory is not None:
+            return app
+        
+        # PHASE 4: REMOVED - prompt_parser replaced by main.py smart flow
+        memory = ChatMemory()
+        
+        # Initialize the enhanced PDF generators (Windows compatible)
+        steel_pdf_generator = SimpleSteelPDFGenerator()
+        pdf_integration = AIBAPDFIntegration()
+        template_pdf_generator = TemplatePDFGenerator()
+        
+        # Compile PDF templates and load fonts in the background so the first PDF isn't the slow one
+        # (render workers warm their own caches; inline rendering warms this process)
+        if os.environ.get('AIBA_PDF_WARMUP', '1') != '0':
+            if pdf_render_pool.enabled:
+                pdf_render_pool.start()
+            else:
+                threading.Thread(target=template_pdf_generator.warm_up, name='pdf-warmup', daemon=True).start()
+        
+        # Background pool for AI-bound chat turns (/chat/async)
+        chat_jobs = ChatJobManager(
+            max_workers=int(os.environ.get('AIBA_CHAT_WORKERS', '8')),
+            max_pending=int(os.environ.get('AIBA_CHAT_MAX_PENDING', '64'))
+        )
+        
+        # One price list to many customers (renders on the PDF render pool)
+        bulk_quotations = BulkQuotationService(
+            firestore_service,
+            pdf_render_pool,
+            max_customers=int(os.environ.get('AIBA_BULK_MAX_CUSTOMERS', '500'))
+        )
+        
+        # Idle session cleanup runs in the background, never on the request path (0 = disabled;
+        # use `python session_cleanup.py` from a scheduler instead)
+        session_cleanup_interval = float(os.environ.get('AIBA_SESSION_CLEANUP_INTERVAL_SECONDS', '0'))
+        if session_cleanup_interval > 0:
+            session_cleanup = SessionCleanupScheduler(
+                memory.firestore_memory,
+                hours=int(os.environ.get('AIBA_SESSION_CLEANUP_HOURS', '24')),
+                interval_seconds=session_cleanup_interval
+            )
+            session_cleanup.start()
+        
+        # Set last: it marks the app as initialized
+        chat_memory = memory
+    return app
+
+@app.before_request
+def ensure_initialized():
+    """Start the components on the first request if the server didn't call init_app()."""
+    if chat_memory is None:
+        init_app()
 
 @app.route('/')
 @login_required
@@ -74,7 +149,7 @@ def profile_setup():
 def settings():
     """User settings page."""
     user_id = request.args.get('user_id') or session.get('user_id')
-    profile = auth_manager.get_user_profile(user_id) if user_id else None
+    profile = get_current_profile(user_id) if user_id else None
     return render_template('settings.html', profile=profile)
 
 @app.route('/chat', methods=['POST'])
@@ -107,6 +182,76 @@ def chat():
             'type': 'error'
         })
 
+@app.route('/chat/async', methods=['POST'])
+@login_required
+@profile_required
+def chat_async():
+    """
+    Queue a chat message on the background pool and return a job ID.
+    Poll /chat/jobs/<job_id> or stream /chat/jobs/<job_id>/stream for the result.
+    """
+    try:
+        data = request.get_json()
+        user_message = data.get('message', '').strip()
+        session_id = data.get('session_id', 'default')
+        
+        if not user_message:
+            return jsonify({
+                'response': '🤔 I didn\'t receive any message. Please try again!',
+                'type': 'error'
+            })
+        
+        # Background threads have no request context - capture what they need now
+        user_id = session.get('user_id')
+        
+        def run_turn():
+            chat_state = chat_memory.get_state(session_id)
+            return process_user_message(user_message, chat_state, session_id, user_id)
+        
+        job = chat_jobs.submit(session_id, run_turn, user_id)
+        if job is None:
+            return jsonify({
+                'response': '⏳ AIBA is busy right now. Please try again in a few seconds.',
+                'type': 'error'
+            }), 429
+        
+        return jsonify({
+            'job_id': job.job_id,
+            'status': job.status,
+            'poll_url': url_for('chat_job_status', job_id=job.job_id),
+            'stream_url': url_for('chat_job_stream', job_id=job.job_id)
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'response': f'❌ Sorry, I encountered an error: {str(e)}',
+            'type': 'error'
+        })
+
+@app.route('/chat/jobs/<job_id>', methods=['GET'])
+@login_required
+def chat_job_status(job_id):
+    """Poll the status (and result, once finished) of a queued chat message."""
+    job = chat_jobs.get(job_id, session.get('user_id'))
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found or expired'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/chat/jobs/<job_id>/stream', methods=['GET'])
+@login_required
+def chat_job_stream(job_id):
+    """Stream job status changes as Server-Sent Events."""
+    job = chat_jobs.get(job_id, session.get('user_id'))
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found or expired'}), 404
+    
+    from flask import Response
+    return Response(
+        chat_jobs.stream(job),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/phase5-pdf', methods=['POST'])
 @login_required
 @profile_required
@@ -116,8 +261,11 @@ def phase5_create_pdf():
     Direct PDF generation using the new Phase 5 logic
     """
     try:
+        data = request.get_json(silent=True) or {}
+        session_id = data.get('session_id', 'default')
+        
         # ✅ PHASE 5: Direct PDF generation from finalized data
-        result = generate_pdf_from_finalized_data()
+        result = generate_pdf_from_finalized_data(session_id)
         return jsonify(result)
         
     except Exception as e:
@@ -150,7 +298,7 @@ def create_pdf():
         
         # Get user profile for PDF generation
         user_id = session.get('user_id')
-        user_profile = auth_manager.get_user_profile(user_id)
+        user_profile = get_current_profile(user_id)
         
         if not user_profile:
             return jsonify({
@@ -158,49 +306,49 @@ def create_pdf():
                 'message': 'User profile not found. Please complete your profile setup.'
             })
         
-        # Generate PDF with user profile data
-        if use_template:
-            # Use new template-based generator
-            pdf_path, pdf_bytes = handle_template_generation(document_data, user_profile, document_type)
-        else:
+        template_data = build_template_data(document_data, user_profile, document_type)
+        
+        def render():
+            # Generate PDF with user profile data
+            if use_template:
+                # Use new template-based generator
+                return handle_template_generation(document_data, user_profile, document_type, template_data)
             # Use existing generator
             if document_type == 'quotation':
-                pdf_path = handle_quotation_generation(document_data, user_profile)
-                # Read the PDF bytes for Firestore storage
-                with open(os.path.join('data', pdf_path), 'rb') as f:
-                    pdf_bytes = f.read()
-            else:
-                pdf_path = pdf_integration.create_po_from_aiba_data(document_data, user_profile)
-                # Read the PDF bytes for Firestore storage
-                with open(os.path.join('data', pdf_path), 'rb') as f:
-                    pdf_bytes = f.read()
+                return handle_quotation_generation(document_data, user_profile)
+            return handle_po_generation(document_data, user_profile)
         
-        # Generate proper document number and metadata
-        current_time = datetime.now()
-        if document_type == 'quotation':
-            doc_number = f"AIBA-Q-{current_time.strftime('%Y%m%d%H%M')}"
-        else:
-            doc_number = f"AIBA-PO-{current_time.strftime('%Y%m%d%H%M')}"
-        
-        # Save PDF to Firestore with improved structure
-        document_metadata = {
-            'document_name': pdf_path,
-            'document_type': document_type,
-            'document_number': doc_number,
-            'customer_name': document_data.get('customer_name', 'Unknown Customer'),
-            'quote_number': doc_number if document_type == 'quotation' else '',
-            'po_number': doc_number if document_type == 'purchase_order' else '',
-            'grand_total': float(document_data.get('grand_total', 0)),
-            'items_count': len(document_data.get('items', [])),
-            'file_path': pdf_path,
-            'customer_address': document_data.get('customer_address', ''),
-            'customer_email': document_data.get('customer_email', ''),
-            'customer_gstin': document_data.get('customer_gstin', ''),
-            'items_summary': _get_items_summary(document_data.get('items', [])),
-            'creation_source': 'aiba_chat'
-        }
+        def save(pdf_path, pdf_bytes):
+            # Generate proper document number and metadata
+            current_time = datetime.now()
+            if document_type == 'quotation':
+                doc_number = f"AIBA-Q-{current_time.strftime('%Y%m%d%H%M')}"
+            else:
+                doc_number = f"AIBA-PO-{current_time.strftime('%Y%m%d%H%M')}"
+            
+            # Save PDF to Firestore with improved structure
+            document_metadata = {
+                'document_name': pdf_path,
+                'document_type': document_type,
+                'document_number': doc_number,
+                'customer_name': document_data.get('customer_name', 'Unknown Customer'),
+                'quote_number': doc_number if document_type == 'quotation' else '',
+                'po_number': doc_number if document_type == 'purchase_order' else '',
+                'grand_total': float(document_data.get('grand_total', 0)),
+                'items_count': len(document_data.get('items', [])),
+                'file_path': pdf_path,
+                'customer_address': document_data.get('customer_address', ''),
+                'customer_email': document_data.get('customer_email', ''),
+                'customer_gstin': document_data.get('customer_gstin', ''),
+                'items_summary': _get_items_summary(document_data.get('items', [])),
+                'creation_source': 'aiba_chat'
+            }
+            return firestore_service.save_document(user_id, document_metadata, pdf_bytes)
         
-        doc_id = firestore_service.save_document(user_id, document_metadata, pdf_bytes)
+        renderer = template_pdf_generator.template_version(document_type) if use_template else 'reportlab'
+        pdf_path, doc_id, reused = generate_document_once(
+            user_id, document_type, document_data, template_data, renderer, render, save, user_profile
+        )
         
         # Clear the session after successful PDF generation
         chat_memory.clear_state(session_id)
@@ -209,6 +357,7 @@ def create_pdf():
             'success': True,
             'pdf_path': pdf_path,
             'document_id': doc_id,
+            'reused': reused,
             'message': f'✅ Professional {document_type.title()} PDF created and saved successfully!'
         })
         
@@ -218,6 +367,83 @@ def create_pdf():
             'message': f'❌ Failed to create PDF: {str(e)}'
         })
 
+@app.route('/quotations/bulk', methods=['POST'])
+@login_required
+@profile_required
+def create_bulk_quotations():
+    """
+    Generate one quotation per customer from shared items and terms.
+    Runs in the background and returns a job id, or with "wait": true
+    returns the zip of PDFs directly.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        customers = data.get('customers') or []
+        shared = {
+            'items': data.get('items') or [],
+            'loading_charges': data.get('loading_charges'),
+            'transport_charges': data.get('transport_charges'),
+            'payment_terms': data.get('payment_terms')
+        }
+        
+        error = validate_bulk_request(customers, shared['items'], bulk_quotations.max_customers)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
+        
+        user_id = session.get('user_id')
+        user_profile = get_current_profile(user_id)
+        
+        if data.get('wait'):
+            job = bulk_quotations.generate(user_id, customers, shared, user_profile)
+            if not job.zip_bytes:
+                return jsonify({'success': False, **job.to_dict()}), 500
+            return send_file(
+                io.BytesIO(job.zip_bytes),
+                mimetype='application/zip',
+                as_attachment=True,
+                download_name=f"quotations_{job.job_id}.zip"
+            )
+        
+        job = bulk_quotations.submit(user_id, customers, shared, user_profile)
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'total': job.total,
+            'status_url': url_for('bulk_quotation_status', job_id=job.job_id),
+            'download_url': url_for('bulk_quotation_download', job_id=job.job_id)
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'❌ Bulk quotation generation failed: {str(e)}'
+        })
+
+@app.route('/quotations/bulk/<job_id>', methods=['GET'])
+@login_required
+def bulk_quotation_status(job_id):
+    """Progress (and per-customer results, once finished) of a bulk job."""
+    job = bulk_quotations.get(job_id, session.get('user_id'))
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found or expired'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/quotations/bulk/<job_id>/download', methods=['GET'])
+@login_required
+def bulk_quotation_download(job_id):
+    """Zip of a finished bulk job's PDFs."""
+    job = bulk_quotations.get(job_id, session.get('user_id'))
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found or expired'}), 404
+    if not job.zip_bytes:
+        return jsonify({'success': False, 'message': 'Quotations are not ready yet', **job.to_dict()}), 409
+    return send_file(
+        io.BytesIO(job.zip_bytes),
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=f"quotations_{job.job_id}.zip"
+    )
+
 @app.route('/download/<filename>')
 def download_file(filename):
     """Download generated PDF files."""
@@ -238,6 +464,7 @@ def reset_chat():
         session_id = data.get('session_id', 'default')
         
         chat_memory.clear_state(session_id)
+        quote_draft_registry.discard(session_id)
         
         return jsonify({
             'response': '🔄 Chat reset successfully! How can I help you today?',
@@ -266,12 +493,17 @@ def get_documents():
         
         if search_term:
             documents = firestore_service.search_user_documents(user_id, search_term, doc_type if doc_type else None)
+            next_cursor = None
         else:
-            documents = firestore_service.get_user_documents(user_id)
+            cursor = request.args.get('cursor') or None
+            limit = min(max(request.args.get('limit', 50, type=int), 1), 100)
+            page = firestore_service.get_user_documents_page(user_id, limit=limit, cursor=cursor)
+            documents, next_cursor = page['documents'], page['next_cursor']
         
         return jsonify({
             'success': True,
-            'documents': documents
+            'documents': documents,
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -297,21 +529,11 @@ def view_document(doc_id):
         if document.get('user_id') != user_id:
             return "Access denied", 403
         
-        # Get PDF content
-        pdf_content = firestore_service.get_document_content(doc_id)
-        if not pdf_content:
+        # Stream PDF for viewing
+        response = _send_document_pdf(doc_id, document, as_attachment=False)
+        if response is None:
             return "Document content not found", 404
-        
-        # Return PDF for viewing
-        from flask import Response
-        return Response(
-            pdf_content,
-            mimetype='application/pdf',
-            headers={
-                'Content-Disposition': f'inline; filename="{document.get("document_name", "document.pdf")}"',
-                'Content-Type': 'application/pdf'
-            }
-        )
+        return response
         
     except Exception as e:
         return f"Error viewing document: {str(e)}", 500
@@ -333,21 +555,11 @@ def download_document(doc_id):
         if document.get('user_id') != user_id:
             return "Access denied", 403
         
-        # Get PDF content
-        pdf_content = firestore_service.get_document_content(doc_id)
-        if not pdf_content:
+        # Stream PDF for download
+        response = _send_document_pdf(doc_id, document, as_attachment=True)
+        if response is None:
             return "Document content not found", 404
-        
-        # Return PDF for download
-        from flask import Response
-        return Response(
-            pdf_content,
-            mimetype='application/pdf',
-            headers={
-                'Content-Disposition': f'attachment; filename="{document.get("document_name", "document.pdf")}"',
-                'Content-Type': 'application/pdf'
-            }
-        )
+        return response
         
     except Exception as e:
         return f"Error downloading document: {str(e)}", 500
@@ -363,6 +575,7 @@ def delete_document_endpoint(doc_id):
         success = firestore_service.delete_document(doc_id, user_id)
         
         if success:
+            pdf_result_cache.forget_document(doc_id)
             return jsonify({
                 'success': True,
                 'message': 'Document deleted successfully'
@@ -379,10 +592,28 @@ def delete_document_endpoint(doc_id):
             'message': f'Error deleting document: {str(e)}'
         })
 
-def process_user_message(message, chat_state, session_id):
+def _send_document_pdf(doc_id, document, as_attachment):
+    """Stream a stored document's PDF from the content store (None if missing)"""
+    stream = firestore_service.open_document_content(doc_id, document)
+    if stream is None:
+        return None
+    
+    content_key = document.get('content_key')
+    return send_file(
+        stream,
+        mimetype='application/pdf',
+        as_attachment=as_attachment,
+        download_name=document.get('document_name', 'document.pdf'),
+        # Content-addressed, so the key is a stable ETag
+        etag=content_key or False
+    )
+
+def process_user_message(message, chat_state, session_id, user_id=None):
     """
     Phase 3: Ultra-simplified processing using main.py smart flow
     Single function handles everything - ultimate simplification!
+    
+    user_id must be passed when running outside a request (background jobs).
     """
     
     try:
@@ -391,16 +622,16 @@ def process_user_message(message, chat_state, session_id):
         
         # ✅ Let main.py handle ALL logic including PDF generation
         # Only intercept if main.py explicitly says "ready to generate PDF"
-        response = handle_user_input(message)
+        response = handle_user_input(message, session_id)
         
         # ✅ Handle PDF generation ONLY if main.py confirms it's ready
         message_lower = message.lower().strip()
         if (message_lower in ['generate', 'create pdf', 'yes'] and 
             'ready to generate pdf' in response.lower() and 
-            quote_draft_state.is_ready_for_pdf()):
+            get_quote_draft(session_id).is_ready_for_pdf()):
             
             # ✅ Now actually generate the PDF
-            result = generate_pdf_from_finalized_data()
+            result = generate_pdf_from_finalized_data(session_id, user_id)
             if result['success']:
                 return {
                     'response': result['message'],
@@ -467,77 +698,85 @@ def process_user_message(message, chat_state, session_id):
 def handle_quotation_generation(quote_data, user_profile):
     """Enhanced quotation generation with steel calculations using PDF integration"""
     
-    # Use the PDF integration to convert AIBA data and generate PDF
-    filename = pdf_integration.create_quotation_from_aiba_data(quote_data, user_profile)
+    # Use the PDF integration to convert AIBA data and render the PDF in memory (render pool)
+    filename, pdf_bytes = pdf_render_pool.render(
+        'aiba_quotation', quote_data, user_profile, Config.PDF_SAVE_TO_DISK
+    )
     
-    return filename
+    return filename, pdf_bytes
 
-def handle_template_generation(document_data, user_profile, document_type):
+def handle_po_generation(po_data, user_profile):
+    """Purchase order generation through the PDF integration (render pool)"""
+    return pdf_render_pool.render('aiba_purchase_order', po_data, user_profile, Config.PDF_SAVE_TO_DISK)
+
+def generate_document_once(user_id, document_type, document_data, template_data, renderer, render, save,
+                           user_profile=None):
+    """
+    Render and save a document once per distinct content.
+    Identical requests (double-clicks, retries) get the first PDF and document id back
+    instead of rendering again and adding another user_documents entry.
+    
+    Returns:
+        tuple: (pdf_path, doc_id, reused)
+    """
+    key_data = dict(template_data)
+    key_data['totals'] = {field: document_data.get(field)
+                          for field in ('subtotal', 'gst_amount', 'gst', 'grand_total')}
+    # The ReportLab path (and the template path's fallback to it) renders from the full
+    # document data and the seller's business and bank details, not just template_data
+    key_data['document'] = document_data
+    key_data['profile'] = {field: (user_profile or {}).get(field)
+                           for field in PDF_PROFILE_FIELDS}
+    key = pdf_result_cache.make_key(user_id, document_type, key_data, renderer)
+    
+    with pdf_result_cache.lock_for(key):
+        cached = pdf_result_cache.get(key)
+        if cached and cached['document_id']:
+            print(f"♻️ Reusing {document_type} PDF: {cached['document_id']}")
+            return cached['filename'], cached['document_id'], True
+        
+        # Bytes rendered earlier but not saved yet (e.g. Firestore was down) are reused
+        if cached:
+            pdf_path, pdf_bytes = cached['filename'], cached['pdf_bytes']
+        else:
+            pdf_path, pdf_bytes = render()
+        
+        doc_id = save(pdf_path, pdf_bytes)
+        pdf_result_cache.put(key, pdf_path, pdf_bytes, doc_id, user_id)
+        return pdf_path, doc_id, False
+
+def handle_template_generation(document_data, user_profile, document_type, template_data=None):
     """Generate PDF using the new template-based generator"""
     try:
-        # Prepare data for template generator
-        template_data = {
-            'customer_name': document_data.get('customer_name', 'Customer'),
-            'customer_address': document_data.get('customer_address', 'Customer Address'),
-            'customer_email': document_data.get('customer_email', 'customer@email.com'),
-            'customer_gstin': document_data.get('customer_gstin', 'Customer GST'),
-            'seller_name': user_profile.get('business_name', 'IGNITE INDUSTRIAL CORPORATION'),
-            'seller_address': user_profile.get('business_address', 'No.1A, 1st FLOOR, JONES STREET, MANNADY, CHENNAI - 600001'),
-            'seller_email': user_profile.get('business_email', 'igniteindustrialcorporation@gmail.com'),
-            'seller_gstin': user_profile.get('gst_number', '33AAKFI5034N1Z6'),
-            'items': document_data.get('items', []),
-            'quote_number': f"AIBA-{document_type.upper()[0]}-{datetime.now().strftime('%Y%m%d%H%M')}",
-            'date': datetime.now().strftime('%d %B %Y'),
-            'valid_until': (datetime.now() + timedelta(days=30)).strftime('%d %B %Y'),
-            # ✨ Terms & Conditions Logic (Corrected) - Pass individual terms
-            'loading_charges': document_data.get('loading_charges', 'Included'),
-            'transport_charges': document_data.get('transport_charges', 'Included'),
-            'payment_terms': document_data.get('payment_terms', 'Included')
-        }
+        if template_data is None:
+            template_data = build_template_data(document_data, user_profile, document_type)
         
-        # Add purchase order specific fields
-        if document_type == 'purchase_order':
-            template_data.update({
-                'po_number': template_data['quote_number'].replace('Q-', 'PO-'),
-                'delivery_date': (datetime.now() + timedelta(days=14)).strftime('%d %B %Y'),
-                'urgent': document_data.get('urgent', False),
-                'delivery_address': document_data.get('delivery_address', template_data['customer_address']),
-                'delivery_contact': document_data.get('delivery_contact', 'Site Manager'),
-                'delivery_phone': document_data.get('delivery_phone', '+91-XXXXXXXXX'),
-                'delivery_instructions': document_data.get('delivery_instructions', 'Please call before delivery')
-            })
-        
-        # Generate PDF using template generator
+        # Generate PDF using template generator (in a render worker process)
         if document_type == 'quotation':
-            pdf_bytes = template_pdf_generator.generate_quotation_pdf(template_data)
+            pdf_bytes = pdf_render_pool.render('template_quotation', template_data)
         else:
-            pdf_bytes = template_pdf_generator.generate_purchase_order_pdf(template_data)
+            pdf_bytes = pdf_render_pool.render('template_purchase_order', template_data)
         
-        # Save PDF to file
+        # Optionally keep a copy on disk (the bytes go straight to Firestore either way)
         filename = f"{document_type.title()}_{template_data['customer_name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        filepath = os.path.join('data', filename)
-        
-        with open(filepath, 'wb') as f:
-            f.write(pdf_bytes)
+        if Config.PDF_SAVE_TO_DISK:
+            os.makedirs('data', exist_ok=True)
+            with open(os.path.join('data', filename), 'wb') as f:
+                f.write(pdf_bytes)
+            print(f"✅ Template-based {document_type} PDF saved: {filename}")
         
-        print(f"✅ Template-based {document_type} PDF saved: {filename}")
         return filename, pdf_bytes
         
+    except (RenderPoolBusy, RenderTimeout):
+        # The fallback would queue on the same saturated pool
+        raise
     except Exception as e:
         print(f"❌ Template generation failed: {e}")
-        # Fallback to existing generator
+        # Fallback to existing generator (renders in memory)
         if document_type == 'quotation':
-            pdf_path = handle_quotation_generation(document_data, user_profile)
-            # Read the PDF bytes for fallback
-            with open(os.path.join('data', pdf_path), 'rb') as f:
-                pdf_bytes = f.read()
-            return pdf_path, pdf_bytes
+            return handle_quotation_generation(document_data, user_profile)
         else:
-            pdf_path = pdf_integration.create_po_from_aiba_data(document_data, user_profile)
-            # Read the PDF bytes for fallback
-            with open(os.path.join('data', pdf_path), 'rb') as f:
-                pdf_bytes = f.read()
-            return pdf_path, pdf_bytes
+            return handle_po_generation(document_data, user_profile)
 
 # PHASE 4: REMOVED - Complex PO collection function replaced by main.py smart flow
 
@@ -681,14 +920,7 @@ What business document would you like to create?"""
 
 def _get_items_summary(items):
     """Generate a summary of items for document metadata."""
-    if not items:
-        return "No items"
-    
-    if len(items) == 1:
-        item = items[0]
-        return f"{item.get('description', 'Item')} ({item.get('quantity', 'N/A')} {item.get('unit', 'nos')})"
-    else:
-        return f"{len(items)} items: {', '.join([item.get('description', 'Item')[:20] + ('...' if len(item.get('description', '')) > 20 else '') for item in items[:3]])}"
+    return summarize_items(items)
 
 # Phase 2: Helper functions for simplified quote draft state
 def get_conversation_context(session_id):
@@ -714,6 +946,7 @@ def update_conversation_context(session_id, message):
 def handle_pdf_generation_request(session_id):
     """Handle PDF generation request."""
     
+    quote_draft_state = get_quote_draft(session_id)
     if not quote_draft_state.is_ready_for_pdf():
         return {
             'response': '⚠️ **Quote draft is not ready for PDF generation.**\n\n' + 
@@ -763,15 +996,17 @@ def handle_pdf_generation_request(session_id):
     }
 
 # ✅ PHASE 5: Create PDF from Finalized Data
-def generate_pdf_from_finalized_data():
+def generate_pdf_from_finalized_data(session_id='default', user_id=None):
     """
     Phase 5: Create PDF from finalized quote data
     Uses the smart state check from quote_brain.py
     """
+    quote_draft_state = get_quote_draft(session_id)
+    
     # ✅ Use the smart state check instead of basic check
     if quote_draft_state.is_ready_for_pdf():
         # render quotation_template.html
-        return generate_pdf(quote_draft_state)
+        return generate_pdf(quote_draft_state, user_id)
     else:
         # ✅ Use smart error reporting
         required_fields = ["customer_name", "quantity", "rate", "amount", "subtotal", "gst", "grand_total"]
@@ -797,7 +1032,7 @@ def generate_pdf_from_finalized_data():
             'type': 'incomplete'
         }
 
-def generate_pdf(quote_state):
+def generate_pdf(quote_state, user_id=None):
     """
     Generate PDF using quotation template with finalized data
     Phase 5 implementation using HTML template rendering
@@ -807,8 +1042,8 @@ def generate_pdf(quote_state):
         pdf_data = quote_state.to_pdf_format()
         
         # Get user profile for PDF generation
-        user_id = session.get('user_id')
-        user_profile = auth_manager.get_user_profile(user_id) if user_id else {}
+        user_id = user_id or session.get('user_id')
+        user_profile = get_current_profile(user_id) if user_id else {}
         
         if not user_profile:
             return {
@@ -817,31 +1052,39 @@ def generate_pdf(quote_state):
                 'type': 'error'
             }
         
-        # Generate PDF using template-based generator
-        pdf_path, pdf_bytes = handle_template_generation(pdf_data, user_profile, 'quotation')
-        
-        # Generate document metadata
-        current_time = datetime.now()
-        doc_number = f"AIBA-Q-{current_time.strftime('%Y%m%d%H%M')}"
-        
-        # Save PDF to Firestore
-        document_metadata = {
-            'document_name': pdf_path,
-            'document_type': 'quotation',
-            'document_number': doc_number,
-            'customer_name': pdf_data.get('customer_name', 'Unknown Customer'),
-            'quote_number': doc_number,
-            'grand_total': float(pdf_data.get('grand_total', 0)),
-            'items_count': len(pdf_data.get('items', [])),
-            'file_path': pdf_path,
-            'customer_address': pdf_data.get('customer_address', ''),
-            'customer_email': pdf_data.get('customer_email', ''),
-            'customer_gstin': pdf_data.get('customer_gstin', ''),
-            'items_summary': _get_items_summary(pdf_data.get('items', [])),
-            'creation_source': 'aiba_phase5'
-        }
+        template_data = build_template_data(pdf_data, user_profile, 'quotation')
         
-        doc_id = firestore_service.save_document(user_id, document_metadata, pdf_bytes)
+        def render():
+            # Generate PDF using template-based generator
+            return handle_template_generation(pdf_data, user_profile, 'quotation', template_data)
+        
+        def save(pdf_path, pdf_bytes):
+            # Generate document metadata
+            current_time = datetime.now()
+            doc_number = f"AIBA-Q-{current_time.strftime('%Y%m%d%H%M')}"
+            
+            # Save PDF to Firestore
+            document_metadata = {
+                'document_name': pdf_path,
+                'document_type': 'quotation',
+                'document_number': doc_number,
+                'customer_name': pdf_data.get('customer_name', 'Unknown Customer'),
+                'quote_number': doc_number,
+                'grand_total': float(pdf_data.get('grand_total', 0)),
+                'items_count': len(pdf_data.get('items', [])),
+                'file_path': pdf_path,
+                'customer_address': pdf_data.get('customer_address', ''),
+                'customer_email': pdf_data.get('customer_email', ''),
+                'customer_gstin': pdf_data.get('customer_gstin', ''),
+                'items_summary': _get_items_summary(pdf_data.get('items', [])),
+                'creation_source': 'aiba_phase5'
+            }
+            return firestore_service.save_document(user_id, document_metadata, pdf_bytes)
+        
+        pdf_path, doc_id, reused = generate_document_once(
+            user_id, 'quotation', pdf_data, template_data,
+            template_pdf_generator.template_version('quotation'), render, save, user_profile
+        )
         
         # Reset quote state after successful PDF generation
         quote_state.reset()
@@ -850,6 +1093,7 @@ def generate_pdf(quote_state):
             'success': True,
             'pdf_path': pdf_path,
             'document_id': doc_id,
+            'reused': reused,
             'message': f'✅ Phase 5: Professional Quotation PDF created successfully!',
             'type': 'pdf_generated'
         }
@@ -861,9 +1105,15 @@ def generate_pdf(quote_state):
             'type': 'error'
         }
 
-if __name__ == '__main__':
+def run_server():
+    """Development server (`python app.py`)"""
     # Ensure data directory exists
     os.makedirs('data', exist_ok=True)
     
+    init_app()
+    
     # Run the app
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
+
+if __name__ == '__main__':
+    run_server() 
\ No newline at end of file
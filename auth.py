@@ -4,8 +4,9 @@ Handles user registration, login, and session management with Firebase Authentic
 Now using Firestore for scalable data storage.
 """
 
-from flask import Blueprint, request, jsonify, session, redirect, url_for
+from flask import Blueprint, request, jsonify, session, redirect, url_for, g, has_request_context
 from werkzeug.security import generate_password_hash, check_password_hash
+import copy
 import json
 import os
 from datetime import datetime
@@ -15,6 +16,8 @@ import firebase_admin
 from firebase_admin import credentials, auth as firebase_auth
 from firebase_config import firebaseConfig
 from auth_firestore import AuthManagerFirestore
+from utils.ttl_cache import TTLCache
+from utils.pdf_result_cache import pdf_result_cache
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -33,6 +36,11 @@ except Exception as e:
 class AuthManager:
     def __init__(self):
         self.firestore_auth = AuthManagerFirestore()
+        # Profiles are read on every protected request; keep recent ones in memory
+        self.profile_cache = TTLCache(
+            max_entries=int(os.getenv('AIBA_PROFILE_CACHE_SIZE', '2048')),
+            ttl_seconds=float(os.getenv('AIBA_PROFILE_CACHE_TTL_SECONDS', '300'))
+        )
         
     def register_firebase_user(self, firebase_uid: str, email: str, name: str = None) -> dict:
         """Register or login a user via Firebase Authentication."""
@@ -44,19 +52,55 @@ class AuthManager:
         
     def save_user_profile(self, user_id: str, profile_data: dict) -> dict:
         """Save or update user business profile."""
-        return self.firestore_auth.save_user_profile(user_id, profile_data)
+        try:
+            return self.firestore_auth.save_user_profile(user_id, profile_data)
+        finally:
+            self.invalidate_profile(user_id)
             
     def get_user_profile(self, user_id: str) -> dict:
-        """Get user business profile."""
-        return self.firestore_auth.get_user_profile(user_id)
+        """Get user business profile (cached per user)."""
+        profile = self.profile_cache.get(user_id)
+        if profile is None:
+            profile = self.firestore_auth.get_user_profile(user_id)
+            if not profile:
+                # Don't cache misses - the user may be mid profile setup
+                return profile
+            self.profile_cache.set(user_id, profile)
+        # Callers get their own copy so they can't alter the cached profile
+        return copy.deepcopy(profile)
         
     def update_user_profile(self, user_id: str, updates: dict) -> dict:
         """Update specific fields in user profile."""
-        return self.firestore_auth.update_user_profile(user_id, updates)
+        try:
+            return self.firestore_auth.update_user_profile(user_id, updates)
+        finally:
+            self.invalidate_profile(user_id)
+    
+    def invalidate_profile(self, user_id: str):
+        """Drop a cached profile so the next read goes to Firestore."""
+        self.profile_cache.pop(user_id)
+        # PDFs rendered with the old business/bank details must not be reused
+        pdf_result_cache.forget_user(user_id)
+    
+    def get_profile_cache_stats(self) -> dict:
+        """Get profile cache hit/miss metrics."""
+        return self.profile_cache.stats()
 
 # Initialize auth manager
 auth_manager = AuthManager()
 
+def get_current_profile(user_id: str = None) -> dict:
+    """
+    Get a user's profile, reusing the one profile_required loaded for this request.
+    Falls back to the (cached) auth_manager lookup outside a request or for another user.
+    """
+    user_id = user_id or (session.get('user_id') if has_request_context() else None)
+    if not user_id:
+        return None
+    if has_request_context() and g.get('user_profile') and g.get('profile_user_id') == user_id:
+        return g.user_profile
+    return auth_manager.get_user_profile(user_id)
+
 def login_required(f):
     """Decorator to require login for routes."""
     @wraps(f)
@@ -102,6 +146,10 @@ def profile_required(f):
                 'message': 'Profile setup required',
                 'redirect': '/profile-setup'
             }), 403
+        
+        # Share the loaded profile with the view for the rest of this request
+        g.user_profile = profile
+        g.profile_user_id = user_id
             
         return f(*args, **kwargs)
     return decorated_function
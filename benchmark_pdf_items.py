@@ -0,0 +1,91 @@
+"""
+Items-table rendering benchmark for AIBA
+Renders ReportLab quotations with growing item counts and reports render
+time, page count and time per item, so non-linear growth shows up.
+
+    python benchmark_pdf_items.py
+    python benchmark_pdf_items.py --sizes 10 100 1000 5000 --repeat 3 --compare-single
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from reportlab.lib.units import inch
+from reportlab.platypus import Table
+
+from utils.enhanced_reportlab_generator import EnhancedReportLabGenerator
+from utils.reportlab_styles import TABLE_STYLES
+
+SELLER = {'name': 'AIBA Steel Solutions', 'address': 'Industrial Area, Chennai',
+          'gstin': '33AAKFI5034N1Z6', 'email': 'sales@example.com'}
+BUYER = {'name': 'Benchmark Fabricators', 'address': 'Plot 7, Guindy, Chennai',
+         'gstin': '33ABCDE1234F1Z5', 'email': 'purchase@example.com'}
+BANK = {'account_name': 'AIBA Steel Solutions', 'account_number': '1234567890',
+        'ifsc': 'SBIN0001234', 'branch': 'Main Branch'}
+
+
+def make_items(count: int, seed: int = 7) -> List[Dict]:
+    """Plate line items like a large BOM enquiry"""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        thk = rng.choice([6, 8, 10, 12, 16, 20, 25])
+        w = rng.choice([1250, 1500, 2000, 2500])
+        l = rng.choice([2500, 5000, 6300])
+        nos = rng.randint(1, 12)
+        items.append({'desc': f"{thk}mm x {w} x {l} - {nos} Nos", 'thk': thk, 'w': w, 'l': l,
+                      'nos': nos, 'rate': rng.choice([58.0, 60.5, 62.0, 65.0])})
+    return items
+
+
+def _single_table(build_paged, items: List[Dict]) -> List:
+    """Baseline: every row in one Table that ReportLab splits itself"""
+    paged = build_paged(items)[0]
+    table = Table([paged.header] + paged.rows + paged.summary_rows,
+                  colWidths=[0.6*inch, 2.8*inch, 1*inch, 1*inch, 1.3*inch], repeatRows=1)
+    table.setStyle(TABLE_STYLES['proforma_items'])
+    return [table]
+
+
+def run(sizes: List[int], repeat: int, compare_single: bool):
+    generator = EnhancedReportLabGenerator()
+    layouts = [('paged', None)]
+    if compare_single:
+        layouts.append(('single', _single_table))
+
+    print(f"{'items':>7} {'layout':>7} {'pages':>6} {'best ms':>10} {'ms/item':>9} {'KB':>8}")
+    for size in sizes:
+        items = make_items(size)
+        for layout, build_table in layouts:
+            original = generator._build_modern_items_table
+            if build_table:
+                generator._build_modern_items_table = lambda rows: build_table(original, rows)
+            try:
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    _, pdf_bytes = generator.render_quotation_pdf(SELLER, BUYER, BANK, items)
+                    timings.append(time.perf_counter() - started)
+            finally:
+                generator._build_modern_items_table = original
+            best_ms = min(timings) * 1000
+            pages = len(re.findall(rb'/Type /Page\b', pdf_bytes))
+            print(f"{size:>7} {layout:>7} {pages:>6} {best_ms:>10.1f} {best_ms / size:>9.3f} "
+                  f"{len(pdf_bytes) / 1024:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark quotation rendering for large item lists')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000], help='Item counts')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size (best is reported)')
+    parser.add_argument('--compare-single', action='store_true',
+                        help='Also time the old single-Table layout (slow for large lists)')
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.compare_single)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Steel description parsing benchmark for AIBA
+Times the shared single-pass tokenizer against the per-call-site regex
+chains it replaced (enrich_items, split_items_from_prompt,
+_extract_steel_dimensions and parse_dimensions each scanning every
+description separately) over a corpus of typical enquiry lines.
+
+    python benchmark_steel_parser.py
+    python benchmark_steel_parser.py --repeat 2000 --corpus enquiries.txt
+"""
+
+import argparse
+import re
+import time
+from typing import Callable, List
+
+from utils.steel_tokenizer import _parse, parse_steel_description
+
+CORPUS = [
+    "10x1500x3000 - 2 Nos",
+    "12x1250×2500 – 4 Nos",
+    "10mm x 1500 x 3000 - 2 Nos",
+    "12mm x 1250mm x 2500mm - 2 Nos",
+    "10mm x 2.5m x 6m - 4 pieces",
+    "10x1250x6300- 4nos @84",
+    "4nos 10x1250x6300 @ ₹84",
+    "MS Plate – 10x1250x6300 – 4 Nos",
+    "sail hard plate 8x1500x6000 2 plates @ ₹72.5",
+    "SA 515 Grade 70 plate 25x2000x6300 - 1 nos @ 96",
+    "ISMB 150 - 45 Nos",
+    "ISMC 100 - 20 pcs @ 62",
+    "ISA 50x50x6 - 10 nos @ 64",
+    "MS angle 65x65x6 - 24 nos",
+    "32mm round - 5 pcs @ 70",
+    "Round 25 dia 10 nos",
+    "25mm dia round 10 nos @ 68",
+    "Ø20 x 6m - 3 nos",
+    "TMT 12mm - 2 tons @ 58",
+    "Need quote for 16 x 2000 x 6300 plates, 6 nos, delivery Chennai",
+    "chequered plate 6x1250x2500 - 12 Nos @ 71",
+    "Please send best rate for hr sheet 3 x 1250 x 2500 qty 40 pcs",
+]
+
+
+def _legacy_enrich(desc: str):
+    for pattern in (r"(\d+)[x×](\d+)[x×](\d+).*?(\d+)\s*Nos",
+                    r"(\d+)mm\s*[x×]\s*(\d+)\s*[x×]\s*(\d+).*?(\d+)\s*Nos",
+                    r"(\d+)\s*[x×]\s*(\d+)\s*[x×]\s*(\d+).*?(\d+)\s*(?:nos|pcs|plates?)"):
+        match = re.search(pattern, desc, re.IGNORECASE)
+        if match:
+            return match.groups()
+    return None
+
+
+def _legacy_split(part: str):
+    if not re.search(r'@ ?₹?(\d+)', part):
+        return None
+    match = re.search(r'(\d+)[x×](\d+)[x×](\d+)\s*-?\s*(\d+)\s*(?:nos|pcs|plates?)', part, re.IGNORECASE)
+    if not match:
+        match = re.search(r'(\d+)\s*(?:nos|pcs|plates?)\s*(\d+)[x×](\d+)[x×](\d+)', part, re.IGNORECASE)
+    return match.groups() if match else None
+
+
+def _legacy_extract(desc: str):
+    match = re.search(r'(\d+(?:\.\d+)?)\s*mm\s*x\s*(\d+(?:\.\d+)?)\s*(?:mm|m)\s*x\s*(\d+(?:\.\d+)?)\s*(?:mm|m)'
+                      r'.*?(\d+)\s*(?:nos|pcs|pieces)', desc.lower())
+    if match:
+        return match.groups()
+    match = re.search(r'(ismb|ismc|isa|rsj)\s*(\d+).*?(\d+)\s*(?:nos|pcs|pieces)', desc.lower())
+    return match.groups() if match else None
+
+
+def _legacy_dimensions(desc: str):
+    match = re.search(r'(\d+)[x×](\d+)[x×](\d+)', desc)
+    return match.groups() if match else None
+
+
+def legacy(desc: str):
+    """Every call site scanning the description with its own patterns"""
+    return _legacy_enrich(desc), _legacy_split(desc), _legacy_extract(desc), _legacy_dimensions(desc)
+
+
+def tokenized(desc: str):
+    """One tokenizer pass (memo bypassed) shared by every call site"""
+    return _parse.__wrapped__(desc)
+
+
+def memoised(desc: str):
+    """What every call site after the first pays"""
+    return parse_steel_description(desc)
+
+
+def _time(parse: Callable, corpus: List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for desc in corpus:
+                parse(desc)
+        best = min(best, time.perf_counter() - started)
+    return best / (repeat * len(corpus)) * 1_000_000
+
+
+def run(corpus: List[str], repeat: int, show: bool):
+    if show:
+        for desc in corpus:
+            print(f"{desc!r:70} -> {parse_steel_description(desc)}")
+        print()
+
+    parsed = sum(1 for desc in corpus if tokenized(desc))
+    print(f"{len(corpus)} descriptions ({parsed} recognised), {repeat} rounds, best of 3")
+    print(f"{'parser':>10} {'µs/desc':>9}")
+    legacy_us = _time(legacy, corpus, repeat)
+    print(f"{'legacy':>10} {legacy_us:>9.2f}")
+    for name, parse in (('tokenizer', tokenized), ('memoised', memoised)):
+        parse_us = _time(parse, corpus, repeat)
+        print(f"{name:>10} {parse_us:>9.2f}   ({legacy_us / parse_us:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark steel description parsing')
+    parser.add_argument('--repeat', type=int, default=1000, help='Passes over the corpus')
+    parser.add_argument('--corpus', default=None, help='Text file with one enquiry line per row')
+    parser.add_argument('--show', action='store_true', help='Print what the tokenizer parsed per line')
+    args = parser.parse_args()
+
+    corpus = CORPUS
+    if args.corpus:
+        with open(args.corpus, 'r', encoding='utf-8') as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    run(corpus, args.repeat, args.show)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+Bulk Quotation Generation for AIBA
+Issues one price list (shared items and terms) to many customers at once:
+PDFs render in parallel on the PDF render pool, all documents are stored
+with batched Firestore commits, and the result is a zip of the PDFs.
+Large batches run as background jobs with pollable progress.
+
+    python bulk_quotations.py --user-id USER --customers customers.csv --items items.json --out quotes.zip
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import secrets
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pdf_render_pool import PDFRenderPool
+from utils.line_items import LineItems
+from utils.quote_utils import summarize_items
+from utils.template_pdf_generator import build_template_data
+from utils.ttl_cache import TTLCache
+
+CUSTOMER_FIELDS = ('customer_name', 'customer_address', 'customer_email', 'customer_gstin')
+SHARED_TERMS = ('loading_charges', 'transport_charges', 'payment_terms')
+GST_RATE = 18
+
+UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def safe_filename_part(text: str) -> str:
+    """``text`` reduced to [A-Za-z0-9._-] for zip entries and stored document names"""
+    return UNSAFE_FILENAME_CHARS.sub('_', str(text)).strip('._') or 'Customer'
+
+
+def grand_total(items: List[Dict]) -> float:
+    """Quotation total (quantity x rate plus 18% GST), as the template computes it"""
+    return LineItems.from_items(items).totals(gst_rate=GST_RATE)['grand_total']
+
+
+def validate_request(customers: List[Dict], items: List[Dict], max_customers: int) -> Optional[str]:
+    """Error message for an unusable bulk request, or None"""
+    if not customers:
+        return 'At least one customer is required'
+    if len(customers) > max_customers:
+        return f'At most {max_customers} customers per batch'
+    if not items:
+        return 'At least one item is required'
+    for position, customer in enumerate(customers, start=1):
+        if not isinstance(customer, dict) or not str(customer.get('customer_name', '')).strip():
+            return f'Customer {position} has no customer_name'
+    for position, item in enumerate(items, start=1):
+        if not isinstance(item, dict) or not item.get('description'):
+            return f'Item {position} has no description'
+    return None
+
+
+class BulkQuotationJob:
+    """Progress and results of one bulk run"""
+
+    def __init__(self, job_id: str, user_id: str, total: int):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.total = total
+        self.status = 'queued'  # queued, rendering, saving, completed, failed
+        self.rendered = 0
+        self.saved = 0
+        self.failed = 0
+        self.results: List[Dict] = []
+        self.zip_bytes: Optional[bytes] = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.seconds = None
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            finished = self.rendered + self.failed
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'total': self.total,
+                'rendered': self.rendered,
+                'saved': self.saved,
+                'failed': self.failed,
+                'progress': round(100 * finished / self.total, 1) if self.total else 100.0,
+                'results': list(self.results) if self.done else [],
+                'has_zip': self.zip_bytes is not None,
+                'error': self.error,
+                'seconds': self.seconds,
+                'created_at': self.created_at
+            }
+
+
+class BulkQuotationService:
+    """Render, store and package quotations for many customers"""
+
+    def __init__(self, fs, render_pool: PDFRenderPool, max_customers: int = 500,
+                 max_running_jobs: int = 2, job_ttl_seconds: float = 1800):
+        """
+        Args:
+            fs: FirestoreService (None renders without saving, e.g. CLI --no-save)
+            render_pool: Pool the PDFs are rendered on
+            max_customers: Largest accepted batch
+            max_running_jobs: Bulk jobs processed at once (each fans out to the render pool)
+            job_ttl_seconds: How long finished jobs (and their zips) stay downloadable
+        """
+        self.fs = fs
+        self.render_pool = render_pool
+        self.max_customers = max_customers
+        self.executor = ThreadPoolExecutor(max_workers=max_running_jobs, thread_name_prefix='aiba-bulk')
+        self.jobs = TTLCache(max_entries=256, ttl_seconds=job_ttl_seconds)
+
+    def build_documents(self, customers: List[Dict], shared: Dict, user_profile: Dict,
+                        batch_id: Optional[str] = None) -> List[Dict]:
+        """Per-customer template data: shared items/terms plus the customer's own details"""
+        batch_stamp = datetime.now().strftime('%Y%m%d%H%M')
+        # Two batches in the same minute must not hand out the same quote numbers
+        batch_id = batch_id or secrets.token_hex(3).upper()
+        documents = []
+        for position, customer in enumerate(customers, start=1):
+            document_data = {field: shared[field] for field in SHARED_TERMS if shared.get(field)}
+            document_data['items'] = shared.get('items', [])
+            document_data.update({field: customer[field] for field in CUSTOMER_FIELDS if customer.get(field)})
+            template_data = build_template_data(document_data, user_profile, 'quotation')
+            # The whole batch shares a minute and batch id, so each quotation gets a sequence suffix
+            template_data['quote_number'] = f"AIBA-Q-{batch_stamp}-{batch_id}-{position:03d}"
+            documents.append(template_data)
+        return documents
+
+    def submit(self, user_id: str, customers: List[Dict], shared: Dict, user_profile: Dict,
+               save: bool = True, include_zip: bool = True) -> BulkQuotationJob:
+        """Queue a bulk run in the background; poll with get()"""
+        job = BulkQuotationJob(secrets.token_urlsafe(12), user_id, len(customers))
+        self.jobs.set(job.job_id, job)
+        self.executor.submit(self.run, job, customers, shared, user_profile, save, include_zip)
+        return job
+
+    def generate(self, user_id: str, customers: List[Dict], shared: Dict, user_profile: Dict,
+                 save: bool = True, include_zip: bool = True) -> BulkQuotationJob:
+        """Run a bulk job in the calling thread"""
+        job = BulkQuotationJob(secrets.token_urlsafe(12), user_id, len(customers))
+        self.jobs.set(job.job_id, job)
+        self.run(job, customers, shared, user_profile, save, include_zip)
+        return job
+
+    def run(self, job: BulkQuotationJob, customers: List[Dict], shared: Dict, user_profile: Dict,
+            save: bool = True, include_zip: bool = True):
+        started = time.monotonic()
+        try:
+            documents = self.build_documents(customers, shared, user_profile)
+
+            def rendered(index, result):
+                with job._lock:
+                    if isinstance(result, Exception):
+                        job.failed += 1
+                    else:
+                        job.rendered += 1
+
+            job.status = 'rendering'
+            pdfs = self.render_pool.render_many(
+                'template_quotation', [(document,) for document in documents], on_done=rendered
+            )
+
+            results, to_save = [], []
+            for template_data, pdf in zip(documents, pdfs):
+                filename = f"Quotation_{safe_filename_part(template_data['customer_name'])}_{template_data['quote_number']}.pdf"
+                result = {
+                    'customer_name': template_data['customer_name'],
+                    'quote_number': template_data['quote_number'],
+                    'filename': filename,
+                    'document_id': None
+                }
+                if isinstance(pdf, Exception):
+                    result['error'] = str(pdf)
+                else:
+                    to_save.append((len(results), self._document_metadata(template_data, filename), pdf))
+                results.append(result)
+
+            if save and self.fs is not None and to_save:
+                job.status = 'saving'
+                doc_ids = self.fs.save_documents_batch(
+                    job.user_id, [(metadata, pdf) for _, metadata, pdf in to_save]
+                )
+                for (position, _, _), doc_id in zip(to_save, doc_ids):
+                    results[position]['document_id'] = doc_id
+                    if doc_id is None:
+                        results[position]['error'] = 'Failed to save document'
+                with job._lock:
+                    job.saved = sum(1 for doc_id in doc_ids if doc_id)
+
+            if include_zip and to_save:
+                job.zip_bytes = self._zip(results, to_save)
+
+            job.results = results
+            job.status = 'completed'
+        except Exception as e:
+            print(f"❌ Bulk quotation job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.seconds = round(time.monotonic() - started, 2)
+            # Finished jobs stay downloadable for a full TTL from completion
+            self.jobs.touch(job.job_id)
+
+    @staticmethod
+    def _document_metadata(template_data: Dict, filename: str) -> Dict:
+        items = template_data.get('items', [])
+        return {
+            'document_name': filename,
+            'document_type': 'quotation',
+            'document_number': template_data['quote_number'],
+            'customer_name': template_data.get('customer_name', 'Unknown Customer'),
+            'customer_address': template_data.get('customer_address', ''),
+            'customer_email': template_data.get('customer_email', ''),
+            'customer_gstin': template_data.get('customer_gstin', ''),
+            'quote_number': template_data['quote_number'],
+            'grand_total': grand_total(items),
+            'items_count': len(items),
+            'items_summary': summarize_items(items),
+            'file_path': filename,
+            'creation_source': 'aiba_bulk'
+        }
+
+    @staticmethod
+    def _zip(results: List[Dict], to_save: List[tuple]) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for position, _, pdf in to_save:
+                archive.writestr(results[position]['filename'], pdf)
+            archive.writestr('manifest.json', json.dumps(results, indent=2))
+        return buffer.getvalue()
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[BulkQuotationJob]:
+        """Look up a job; when ``user_id`` is given, only that user's jobs are visible"""
+        job = self.jobs.get(job_id)
+        if job and user_id is not None and job.user_id != user_id:
+            return None
+        return job
+
+
+def _load_customers(path: str) -> List[Dict]:
+    """Customers from a CSV (header row with customer_* columns) or a JSON list"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            return [{key: (value or '').strip() for key, value in row.items() if key}
+                    for row in csv.DictReader(f)]
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate one quotation per customer from a shared price list')
+    parser.add_argument('--user-id', required=True, help='Seller account (profile and document owner)')
+    parser.add_argument('--customers', required=True, help='customers.csv or customers.json')
+    parser.add_argument('--items', required=True,
+                        help='JSON list of items, or an object with items plus loading/transport/payment terms')
+    parser.add_argument('--out', default=None, help='Zip file to write (default: bulk_quotations_<time>.zip)')
+    parser.add_argument('--workers', type=int, default=None, help='Render processes')
+    parser.add_argument('--no-save', action='store_true', help="Don't store the documents in Firestore")
+    args = parser.parse_args()
+
+    customers = _load_customers(args.customers)
+    with open(args.items, 'r', encoding='utf-8') as f:
+        shared = json.load(f)
+    if isinstance(shared, list):
+        shared = {'items': shared}
+
+    error = validate_request(customers, shared.get('items', []), max_customers=100000)
+    if error:
+        raise SystemExit(f"❌ {error}")
+
+    from firestore_service import firestore_service
+    user_profile = firestore_service.get_user_profile(args.user_id) or {}
+
+    from pdf_render_pool import pdf_render_pool
+    render_pool = pdf_render_pool
+    if args.workers is not None:
+        render_pool = PDFRenderPool(max_workers=args.workers, max_pending=max(args.workers * 4, 1))
+
+    service = BulkQuotationService(None if args.no_save else firestore_service, render_pool,
+                                   max_customers=len(customers))
+    job = service.generate(args.user_id, customers, shared, user_profile, save=not args.no_save)
+    render_pool.shutdown()
+
+    status = job.to_dict()
+    out = args.out or f"bulk_quotations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    if job.zip_bytes:
+        with open(out, 'wb') as f:
+            f.write(job.zip_bytes)
+        print(f"📦 Wrote {out}")
+    print(f"🏁 {status['rendered']} rendered, {status['saved']} saved, {status['failed']} failed "
+          f"in {status['seconds']}s")
+    if job.status == 'failed' or status['failed']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
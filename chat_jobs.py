@@ -0,0 +1,158 @@
+"""
+Background Chat Jobs for AIBA
+Runs slow chat turns (AI extraction) on a bounded thread pool so web
+workers return immediately; clients poll or stream job status via SSE.
+"""
+
+import json
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional
+
+from utils.ttl_cache import TTLCache
+
+
+class ChatJob:
+    """State of one queued chat turn"""
+
+    def __init__(self, job_id: str, session_id: str, user_id: Optional[str] = None):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.user_id = user_id
+        self.status = 'queued'  # queued, processing, completed, failed
+        self.events = []
+        self.result = None
+        self.created_at = datetime.now().isoformat()
+        self._changed = threading.Condition()
+        self.add_event('queued', 'Message received')
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def add_event(self, status: str, message: str, result: Optional[Dict] = None):
+        """Record a status change and wake any streaming clients"""
+        with self._changed:
+            self.status = status
+            if result is not None:
+                self.result = result
+            self.events.append({
+                'status': status,
+                'message': message,
+                'timestamp': datetime.now().isoformat()
+            })
+            self._changed.notify_all()
+
+    def wait_for_event(self, seen: int, timeout: float) -> int:
+        """Block until more than ``seen`` events exist (or timeout); return the event count"""
+        with self._changed:
+            if len(self.events) <= seen and not self.done:
+                self._changed.wait(timeout)
+            return len(self.events)
+
+    def to_dict(self) -> Dict:
+        with self._changed:
+            return {
+                'job_id': self.job_id,
+                'session_id': self.session_id,
+                'status': self.status,
+                'events': list(self.events),
+                'result': self.result,
+                'created_at': self.created_at
+            }
+
+
+class ChatJobManager:
+    """Bounded executor plus a TTL-bounded registry of recent jobs"""
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64, job_ttl_seconds: float = 600):
+        """
+        Args:
+            max_workers: Concurrent AI extractions (caps outbound model calls)
+            max_pending: Queued + running jobs accepted before new ones are rejected
+            job_ttl_seconds: How long finished jobs remain pollable
+        """
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='aiba-chat')
+        self.jobs = TTLCache(max_entries=max(max_pending * 16, 256), ttl_seconds=job_ttl_seconds)
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, session_id: str, handler: Callable[[], Dict],
+               user_id: Optional[str] = None) -> Optional[ChatJob]:
+        """
+        Queue ``handler`` (a zero-argument callable returning the chat response dict)
+
+        Returns:
+            The new ChatJob, or None when the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        job = ChatJob(secrets.token_urlsafe(12), session_id, user_id)
+        self.jobs.set(job.job_id, job)
+
+        try:
+            self.executor.submit(self._run, job, handler)
+        except Exception:
+            self._slots.release()
+            raise
+        return job
+
+    def _run(self, job: ChatJob, handler: Callable[[], Dict]):
+        try:
+            job.add_event('processing', 'Extracting quotation details...')
+            result = handler()
+            job.add_event('completed', 'Done', result=result)
+        except Exception as e:
+            print(f"❌ Chat job {job.job_id} failed: {e}")
+            job.add_event('failed', str(e), result={
+                'response': f'❌ Sorry, I encountered an error: {str(e)}',
+                'type': 'error'
+            })
+        finally:
+            # Finished jobs stay pollable for a full TTL from completion
+            self.jobs.touch(job.job_id)
+            self._slots.release()
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[ChatJob]:
+        """Look up a job; when ``user_id`` is given, only that user's jobs are visible"""
+        job = self.jobs.get(job_id)
+        if job and user_id is not None and job.user_id != user_id:
+            return None
+        return job
+
+    def stream(self, job: ChatJob, heartbeat_seconds: float = 15, max_seconds: float = 300) -> Iterator[str]:
+        """Yield Server-Sent Events for a job until it finishes"""
+        sent = 0
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            snapshot = job.to_dict()
+            for event in snapshot['events'][sent:]:
+                payload = dict(event)
+                if event['status'] in ('completed', 'failed'):
+                    payload['result'] = snapshot['result']
+                yield f"event: {event['status']}\ndata: {json.dumps(payload, default=str)}\n\n"
+            sent = len(snapshot['events'])
+
+            if snapshot['status'] in ('completed', 'failed'):
+                return
+
+            if job.wait_for_event(sent, heartbeat_seconds) == sent:
+                # Keep proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+
+        yield f"event: timeout\ndata: {json.dumps({'job_id': job.job_id})}\n\n"
+
+    def get_stats(self) -> Dict:
+        jobs = self.jobs.values()
+        return {
+            'tracked_jobs': len(jobs),
+            'running_or_queued': sum(1 for job in jobs if not job.done),
+            'max_pending': self.max_pending
+        }
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -6,12 +6,157 @@ Maintains exact same interface as original ChatMemory
 from firestore_service import firestore_service
 from typing import Dict, Optional, Any, List
 from datetime import datetime, timedelta
+import atexit
+import json
+import os
+import threading
+from utils.ttl_cache import TTLCache
+
+def _estimate_session_bytes(state: Dict) -> int:
+    """Approximate memory footprint of a session state (serialized size)."""
+    try:
+        return len(json.dumps(state, default=str))
+    except Exception:
+        return 1024
+
+class SessionWriteBehind:
+    """
+    Write-behind queue for chat session persistence.
+    Coalesces updates per session and flushes them to Firestore in
+    WriteBatches on an interval or once enough sessions are pending.
+    """
+    
+    def __init__(self, fs, flush_interval_seconds: float = 2.0, flush_threshold: int = 100):
+        self.fs = fs
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_threshold = flush_threshold
+        
+        self._pending = {}
+        # States being written by the current flush; reads fall back to them
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self.stats = {'enqueued': 0, 'coalesced': 0, 'flushed': 0, 'batches': 0, 'requeued': 0}
+        
+        self._thread = threading.Thread(target=self._run, name='session-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+    
+    def enqueue(self, session_id: str, state: Dict):
+        """Queue the latest state for a session (replaces any queued one)."""
+        with self._lock:
+            if session_id in self._pending:
+                self.stats['coalesced'] += 1
+            # Snapshot so later in-memory edits and SERVER_TIMESTAMP don't race the flush
+            self._pending[session_id] = dict(state)
+            self.stats['enqueued'] += 1
+            pending_count = len(self._pending)
+        
+        if pending_count >= self.flush_threshold:
+            self._wakeup.set()
+    
+    def get_pending(self, session_id: str) -> Optional[Dict]:
+        """Return a queued-but-unflushed (or currently flushing) state, if any."""
+        with self._lock:
+            state = self._pending.get(session_id)
+            if state is None:
+                state = self._in_flight.get(session_id)
+            return dict(state) if state is not None else None
+    
+    def discard(self, session_id: str):
+        """Drop a queued write (the session is being deleted)."""
+        with self._lock:
+            self._pending.pop(session_id, None)
+            # A flush already writing it deletes it again once its batch lands
+            self._in_flight.pop(session_id, None)
+    
+    def flush(self) -> int:
+        """Write all pending sessions now; returns how many were saved."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._in_flight = dict(pending)
+            if not pending:
+                return 0
+            
+            try:
+                failed = set(self.fs.save_chat_sessions_batch(pending))
+            except Exception:
+                failed = set(pending)
+                raise
+            finally:
+                with self._lock:
+                    discarded = [session_id for session_id in pending if session_id not in self._in_flight]
+                    # Failed states go back in the queue unless a newer one arrived meanwhile
+                    for session_id in failed:
+                        if session_id in self._in_flight and session_id not in self._pending:
+                            self._pending[session_id] = pending[session_id]
+                            self.stats['requeued'] += 1
+                    self._in_flight = {}
+                
+                for session_id in discarded:
+                    if session_id not in failed:
+                        self.fs.delete_chat_session(session_id)
+            
+            saved = len(pending) - len(failed)
+            self.stats['flushed'] += saved
+            self.stats['batches'] += (len(pending) + 499) // 500
+            return saved
+    
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing chat sessions: {e}")
+    
+    def shutdown(self):
+        """Flush-on-shutdown hook (also registered with atexit)."""
+        self._stopped = True
+        self._wakeup.set()
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Error flushing chat sessions on shutdown: {e}")
 
 class ChatMemoryFirestore:
-    def __init__(self):
+    def __init__(self, max_sessions: int = None, max_bytes: int = None,
+                 ttl_hours: float = None, expiry_interval_seconds: float = 300,
+                 write_behind: bool = None):
+        """
+        Args:
+            max_sessions: Most sessions kept in memory (LRU beyond that)
+            max_bytes: Approximate memory budget for cached session states
+            ttl_hours: Idle time after which a cached session is dropped from memory
+            expiry_interval_seconds: How often the background sweeper drops idle sessions
+            write_behind: Batch session writes in the background instead of on the request path
+        """
         self.fs = firestore_service
-        # In-memory cache for active sessions (maintains original behavior)
-        self.active_sessions = {}
+        
+        if write_behind is None:
+            write_behind = os.getenv('AIBA_SESSION_WRITE_BEHIND', '1') != '0'
+        self.writer = SessionWriteBehind(
+            self.fs,
+            flush_interval_seconds=float(os.getenv('AIBA_SESSION_FLUSH_SECONDS', '2')),
+            flush_threshold=int(os.getenv('AIBA_SESSION_FLUSH_THRESHOLD', '100'))
+        ) if write_behind else None
+        
+        max_sessions = max_sessions or int(os.getenv('AIBA_SESSION_CACHE_MAX', '5000'))
+        max_bytes = max_bytes or int(os.getenv('AIBA_SESSION_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+        ttl_hours = ttl_hours or float(os.getenv('AIBA_SESSION_CACHE_TTL_HOURS', '24'))
+        
+        # Bounded in-memory cache for active sessions; Firestore stays the source of truth
+        self.active_sessions = TTLCache(
+            max_entries=max_sessions,
+            ttl_seconds=ttl_hours * 3600,
+            max_bytes=max_bytes,
+            sizeof=_estimate_session_bytes
+        )
+        self.active_sessions.start_background_expiry(expiry_interval_seconds)
     
     def get_state(self, session_id: str) -> Dict:
         """
@@ -24,14 +169,19 @@ class ChatMemoryFirestore:
             Dictionary containing session state
         """
         # Check in-memory cache first (maintains original behavior)
-        if session_id in self.active_sessions:
-            return self.active_sessions[session_id]
+        cached = self.active_sessions.get(session_id)
+        if cached is not None:
+            return cached
+        
+        # A queued write is newer than whatever Firestore holds
+        session_data = self.writer.get_pending(session_id) if self.writer else None
         
         # Get from Firestore
-        session_data = self.fs.get_chat_session(session_id)
+        if session_data is None:
+            session_data = self.fs.get_chat_session(session_id)
         if session_data:
             # Load into memory for faster access (maintains original behavior)
-            self.active_sessions[session_id] = session_data
+            self.active_sessions.set(session_id, session_data)
             return session_data
         
         return {}
@@ -51,12 +201,15 @@ class ChatMemoryFirestore:
         current_state.update(state_updates)
         current_state['last_updated'] = datetime.now().isoformat()
         
-        # Update in-memory storage (maintains original behavior)
-        self.active_sessions[session_id] = current_state
+        # Update in-memory storage (re-set so size accounting and TTL are refreshed)
+        self.active_sessions.set(session_id, current_state)
         
         # Persist to Firestore if important (maintains original logic)
         if self._should_persist_state(current_state):
-            self.fs.save_chat_session(session_id, current_state)
+            if self.writer:
+                self.writer.enqueue(session_id, current_state)
+            else:
+                self.fs.save_chat_session(session_id, dict(current_state))
     
     def clear_state(self, session_id: str):
         """
@@ -65,9 +218,10 @@ class ChatMemoryFirestore:
         Args:
             session_id: Unique session identifier
         """
-        # Clear from memory
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
+        # Clear from memory (and any write still queued for it)
+        self.active_sessions.pop(session_id)
+        if self.writer:
+            self.writer.discard(session_id)
         
         # Clear from Firestore
         self.fs.delete_chat_session(session_id)
@@ -175,16 +329,19 @@ class ChatMemoryFirestore:
             print(f"Error deleting customer: {e}")
             return False
     
-    def cleanup_old_sessions(self, hours: int = 24):
+    def cleanup_old_sessions(self, hours: int = 24, page_size: int = 500, max_workers: int = 4):
         """
         Clean up old inactive sessions.
         
         Args:
             hours: Hours after which to consider a session old
+            page_size: Firestore sessions deleted per WriteBatch
+            max_workers: Batches committed concurrently
         """
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
         # Clean memory (maintains original behavior)
+        self.active_sessions.purge_expired()
         sessions_to_remove = []
         for session_id, session_data in self.active_sessions.items():
             last_updated_str = session_data.get('last_updated')
@@ -198,10 +355,10 @@ class ChatMemoryFirestore:
                     sessions_to_remove.append(session_id)
         
         for session_id in sessions_to_remove:
-            del self.active_sessions[session_id]
+            self.active_sessions.pop(session_id)
         
         # Clean Firestore
-        return self.fs.cleanup_old_sessions(hours)
+        return self.fs.cleanup_old_sessions(hours, page_size=page_size, max_workers=max_workers)
     
     def get_session_stats(self) -> Dict:
         """
@@ -229,9 +386,31 @@ class ChatMemoryFirestore:
             'active_sessions': active_count,
             'quotation_sessions': quotation_sessions,
             'po_sessions': po_sessions,
-            'saved_customers': customers_count
+            'saved_customers': customers_count,
+            'session_cache': self.get_cache_stats()
         }
     
+    def get_cache_stats(self) -> Dict:
+        """
+        Get in-memory session cache metrics (hit rate, evictions, bytes).
+        
+        Returns:
+            Dictionary with cache statistics
+        """
+        stats = self.active_sessions.stats()
+        if self.writer:
+            stats['write_behind'] = dict(self.writer.stats)
+        return stats
+    
+    def flush(self) -> int:
+        """
+        Persist any queued session writes immediately.
+        
+        Returns:
+            Number of sessions written
+        """
+        return self.writer.flush() if self.writer else 0
+    
     def _should_persist_state(self, state: Dict) -> bool:
         """
         Determine if a session state should be persisted to disk.
@@ -20,6 +20,9 @@ class Config:
     # Application URL
     APP_URL = os.environ.get('APP_URL') or 'http://127.0.0.1:5000'
     
+    # Keep a copy of generated PDFs under data/ (set to 0 on read-only/ephemeral filesystems)
+    PDF_SAVE_TO_DISK = os.environ.get('AIBA_PDF_SAVE_TO_DISK', '1') != '0'
+    
     # OAuth Settings
     GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
     
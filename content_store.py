@@ -0,0 +1,229 @@
+"""
+Content Store for AIBA
+Content-addressed storage for generated PDF bytes. Firestore keeps only a
+pointer (store name + SHA-256 key); the bytes live on the local filesystem
+or in an S3-compatible bucket (AWS S3, GCS interop, MinIO, ...).
+
+Opt-in via AIBA_CONTENT_STORE; unset, PDFs stay inline in Firestore.
+
+    python content_store.py            # check LocalContentStore in a temp dir
+    python content_store.py --env      # check the store AIBA_CONTENT_STORE selects
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+
+class ContentStore(ABC):
+    """Interface for content-addressed blob storage"""
+
+    name = 'base'
+
+    @staticmethod
+    def make_key(data: bytes) -> str:
+        """Content address for a blob"""
+        return hashlib.sha256(data).hexdigest()
+
+    @abstractmethod
+    def put(self, data: bytes, content_type: str = 'application/pdf') -> str:
+        """Store ``data`` (idempotently) and return its key"""
+
+    @abstractmethod
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open a readable stream for ``key``, or None if it is missing"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Read the full blob for ``key``"""
+        stream = self.open(key)
+        if stream is None:
+            return None
+        try:
+            return stream.read()
+        finally:
+            stream.close()
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """True when a blob is stored under ``key``"""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove the blob under ``key``; False if it wasn't there"""
+
+
+class LocalContentStore(ContentStore):
+    """Blobs as files under ``root_dir``, sharded by the first two hex digits"""
+
+    name = 'local'
+
+    def __init__(self, root_dir: str = 'data/content'):
+        self.root_dir = root_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, key[:2], key)
+
+    def put(self, data: bytes, content_type: str = 'application/pdf') -> str:
+        key = self.make_key(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            return key
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        try:
+            return open(self._path(key), 'rb')
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class S3ContentStore(ContentStore):
+    """Blobs in an S3-compatible bucket (requires boto3)"""
+
+    name = 's3'
+
+    def __init__(self, bucket: str, prefix: str = 'documents/', endpoint_url: str = None,
+                 region_name: str = None, client=None):
+        """
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix inside the bucket
+            endpoint_url: Custom endpoint for non-AWS stores (MinIO, GCS interop, local stand-ins)
+            region_name: Bucket region
+            client: Pre-built boto3 S3 client (optional)
+        """
+        if client is None:
+            import boto3
+            client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region_name)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key[:2]}/{key}"
+
+    def put(self, data: bytes, content_type: str = 'application/pdf') -> str:
+        key = self.make_key(data)
+        if not self.exists(key):
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=self._object_key(key),
+                Body=data,
+                ContentType=content_type
+            )
+        return key
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+            return response['Body']
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception:
+            return False
+
+    def delete(self, key: str) -> bool:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception as e:
+            print(f"Error deleting content {key}: {e}")
+            return False
+
+
+def create_content_store() -> Optional[ContentStore]:
+    """
+    Build the content store selected by the environment.
+
+    Unset (or AIBA_CONTENT_STORE=firestore): None - PDFs stay inline in Firestore.
+    AIBA_CONTENT_STORE=s3 uses AIBA_S3_BUCKET, AIBA_S3_PREFIX, AIBA_S3_ENDPOINT_URL, AIBA_S3_REGION.
+    AIBA_CONTENT_STORE=local uses AIBA_CONTENT_DIR (data/content). Instance-local disk,
+    so only for development or single-instance hosts with a persistent volume.
+    """
+    backend = os.getenv('AIBA_CONTENT_STORE', '').strip().lower()
+    if backend in ('', 'firestore'):
+        return None
+    if backend == 's3':
+        return S3ContentStore(
+            bucket=os.environ['AIBA_S3_BUCKET'],
+            prefix=os.getenv('AIBA_S3_PREFIX', 'documents/'),
+            endpoint_url=os.getenv('AIBA_S3_ENDPOINT_URL') or None,
+            region_name=os.getenv('AIBA_S3_REGION') or None
+        )
+    if backend == 'local':
+        return LocalContentStore(os.getenv('AIBA_CONTENT_DIR', os.path.join('data', 'content')))
+    raise ValueError(f"Unknown AIBA_CONTENT_STORE: {backend!r} (use firestore, local or s3)")
+
+
+def check_content_store(store: ContentStore) -> bool:
+    """Round-trip a blob through ``store``: put, read back, idempotent key, delete"""
+    data = b'%PDF-1.4\n% AIBA content store check ' + os.urandom(16)
+    key = store.put(data)
+    checks = {
+        'key is the SHA-256 of the bytes': key == ContentStore.make_key(data),
+        'exists after put': store.exists(key),
+        'open returns the same bytes': store.get(key) == data,
+        'second put returns the same key': store.put(data) == key,
+        'delete removes the blob': store.delete(key) and not store.exists(key),
+        'open of a missing key is None': store.open(key) is None
+    }
+    for name, passed in checks.items():
+        print(f"{'✅' if passed else '❌'} {store.name}: {name}")
+    return all(checks.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a PDF content store round-trip')
+    parser.add_argument('--env', action='store_true',
+                        help='Check the store AIBA_CONTENT_STORE selects instead of a temp-dir LocalContentStore')
+    args = parser.parse_args()
+
+    if args.env:
+        store = create_content_store()
+        if store is None:
+            print('AIBA_CONTENT_STORE is not set - PDFs are stored inline in Firestore')
+            return
+        raise SystemExit(0 if check_content_store(store) else 1)
+
+    root_dir = tempfile.mkdtemp(prefix='aiba-content-')
+    try:
+        passed = check_content_store(LocalContentStore(root_dir))
+    finally:
+        shutil.rmtree(root_dir, ignore_errors=True)
+    raise SystemExit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
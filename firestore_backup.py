@@ -0,0 +1,168 @@
+"""
+Streaming Firestore Backup for AIBA
+Exports every collection to gzip-compressed newline-delimited JSON
+(<collection>.ndjson.gz, one {"id", "data"} object per line), paging
+through each collection with cursors and exporting collections in
+parallel. Memory use is bounded by one page per worker.
+
+    python firestore_backup.py --backup-dir backup
+    python firestore_backup.py --collections users user_documents --page-size 1000
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from typing import Dict, List
+
+from google.cloud.firestore_v1.field_path import FieldPath
+
+
+def _json_default(value):
+    """Serialize Firestore value types that json can't handle natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if hasattr(value, 'path'):  # DocumentReference
+        return {'__ref__': value.path}
+    if hasattr(value, 'latitude') and hasattr(value, 'longitude'):  # GeoPoint
+        return {'__geo__': [value.latitude, value.longitude]}
+    return str(value)
+
+
+class StreamingBackup:
+    """Parallel, cursor-paged NDJSON+gzip export of Firestore collections"""
+
+    def __init__(self, fs, backup_dir: str = 'backup', page_size: int = 500,
+                 max_workers: int = 4, collections: List[str] = None):
+        """
+        Args:
+            fs: FirestoreService providing ``db`` and collection names
+            backup_dir: Output directory (created if missing)
+            page_size: Documents fetched per cursor page
+            max_workers: Collections exported concurrently
+            collections: Collection names to export (default: all AIBA collections)
+        """
+        self.fs = fs
+        self.backup_dir = backup_dir
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.collections = collections or [
+            fs.USERS_COLLECTION,
+            fs.PROFILES_COLLECTION,
+            fs.CUSTOMERS_COLLECTION,
+            fs.CHAT_SESSIONS_COLLECTION,
+            fs.QUOTATIONS_COLLECTION,
+            fs.PURCHASE_ORDERS_COLLECTION,
+            fs.BUSINESS_PROFILES_COLLECTION,
+            fs.DOCUMENTS_COLLECTION,
+            fs.DOCUMENTS_CONTENT_COLLECTION,
+            fs.USER_STATS_COLLECTION,
+        ]
+
+    def export_collection(self, collection: str) -> Dict:
+        """Write one collection to <collection>.ndjson.gz; returns its count and timing"""
+        started = time.monotonic()
+        final_path = os.path.join(self.backup_dir, f"{collection}.ndjson.gz")
+        tmp_path = final_path + '.tmp'
+
+        query = (self.fs.db.collection(collection)
+                 .order_by(FieldPath.document_id())
+                 .limit(self.page_size))
+
+        count = 0
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as out:
+                last_doc = None
+                while True:
+                    page_query = query.start_after(last_doc) if last_doc else query
+                    page = list(page_query.stream())
+                    for doc in page:
+                        out.write(json.dumps({'id': doc.id, 'data': doc.to_dict()},
+                                             default=_json_default, ensure_ascii=False))
+                        out.write('\n')
+                    count += len(page)
+                    if len(page) < self.page_size:
+                        break
+                    last_doc = page[-1]
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Only a finished export replaces the previous file
+        os.replace(tmp_path, final_path)
+
+        elapsed = time.monotonic() - started
+        return {
+            'file': os.path.basename(final_path),
+            'documents': count,
+            'seconds': round(elapsed, 2),
+            'docs_per_second': round(count / elapsed, 1) if elapsed > 0 else 0.0
+        }
+
+    def run(self) -> Dict:
+        """Export all collections in parallel and write manifest.json; returns the manifest"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        started = time.monotonic()
+        manifest = {
+            'started_at': datetime.now().isoformat(),
+            'format': 'ndjson+gzip',
+            'collections': {},
+            'errors': {}
+        }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='firestore-backup') as executor:
+            futures = {executor.submit(self.export_collection, name): name for name in self.collections}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    manifest['collections'][name] = future.result()
+                    result = manifest['collections'][name]
+                    print(f"  ✅ {name}: {result['documents']} docs ({result['docs_per_second']} docs/sec)")
+                except Exception as e:
+                    manifest['errors'][name] = str(e)
+                    print(f"  ❌ {name}: {e}")
+
+        elapsed = time.monotonic() - started
+        total = sum(result['documents'] for result in manifest['collections'].values())
+        manifest['finished_at'] = datetime.now().isoformat()
+        manifest['documents'] = total
+        manifest['seconds'] = round(elapsed, 2)
+
+        with open(os.path.join(self.backup_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        print(f"💾 Backed up {total} documents in {elapsed:.1f}s to {self.backup_dir}")
+        return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export AIBA Firestore collections to NDJSON.gz')
+    parser.add_argument('--backup-dir', default=f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                        help='Output directory')
+    parser.add_argument('--page-size', type=int, default=500, help='Documents per cursor page')
+    parser.add_argument('--workers', type=int, default=4, help='Collections exported in parallel')
+    parser.add_argument('--collections', nargs='*', help='Only export these collections')
+    args = parser.parse_args()
+
+    from firestore_service import firestore_service
+
+    manifest = StreamingBackup(
+        firestore_service,
+        backup_dir=args.backup_dir,
+        page_size=args.page_size,
+        max_workers=args.workers,
+        collections=args.collections
+    ).run()
+    if manifest['errors']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+Streaming JSON -> Firestore Migration Engine for AIBA
+Parses the legacy JSON files incrementally, writes records in batched
+commits on a worker pool, and checkpoints progress so an interrupted run
+resumes where it stopped.
+
+    python firestore_migration.py --data-dir data --workers 8
+    python firestore_migration.py --reset          # ignore the checkpoint
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from firebase_admin import firestore
+
+from utils.search_index import build_search_tokens
+
+# Firestore caps a WriteBatch at 500 operations
+MAX_BATCH_SIZE = 500
+
+
+def iter_json_object(file_path: str, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, object]]:
+    """
+    Yield (key, value) pairs of a top-level JSON object without loading the whole file.
+    Only one value (plus one read chunk) is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    return
+
+        def decode():
+            nonlocal pos
+            while True:
+                skip_whitespace()
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # A number at the end of the buffer may continue in the next chunk
+                    if end == len(buffer) and not eof and fill():
+                        continue
+                    pos = end
+                    return value
+                except json.JSONDecodeError:
+                    if eof or not fill():
+                        raise
+
+        def expect(char: str) -> bool:
+            nonlocal pos
+            skip_whitespace()
+            if pos < len(buffer) and buffer[pos] == char:
+                pos += 1
+                return True
+            return False
+
+        if not expect('{'):
+            raise ValueError(f"{file_path}: expected a JSON object at the top level")
+        if expect('}'):
+            return
+
+        while True:
+            key = decode()
+            if not expect(':'):
+                raise ValueError(f"{file_path}: expected ':' after key {key!r}")
+            yield key, decode()
+            if expect(','):
+                continue
+            if expect('}'):
+                return
+            raise ValueError(f"{file_path}: expected ',' or '}}' after key {key!r}")
+
+
+def _user_record(email: str, data: Dict) -> Optional[Tuple[str, Dict]]:
+    record = dict(data)
+    record['created_at'] = firestore.SERVER_TIMESTAMP
+    record['updated_at'] = firestore.SERVER_TIMESTAMP
+    return email, record
+
+
+def _profile_record(user_id: str, data: Dict) -> Optional[Tuple[str, Dict]]:
+    record = dict(data)
+    record['user_id'] = user_id
+    record['created_at'] = firestore.SERVER_TIMESTAMP
+    record['updated_at'] = firestore.SERVER_TIMESTAMP
+    return user_id, record
+
+
+def _customer_record(customer_name: str, data: Dict) -> Optional[Tuple[str, Dict]]:
+    # Customers without an owner can't be placed; they need a manual mapping
+    user_id = data.get('user_id', 'unknown')
+    name = (data.get('customer_name') or customer_name or '').lower()
+    if user_id == 'unknown' or not name:
+        return None
+    record = dict(data)
+    record['user_id'] = user_id
+    record['saved_date'] = firestore.SERVER_TIMESTAMP
+    record['search_tokens'] = build_search_tokens(data.get('customer_name') or customer_name)
+    # Same document id scheme as FirestoreService.save_customer
+    return f"{user_id}_{name}", record
+
+
+class StreamingMigration:
+    """Batched, parallel, resumable import of the legacy JSON files"""
+
+    def __init__(self, fs, data_dir: str = 'data', batch_size: int = 400, max_workers: int = 8,
+                 checkpoint_path: str = None, progress_every: float = 2.0):
+        """
+        Args:
+            fs: FirestoreService providing ``db`` and collection names
+            data_dir: Directory holding users.json, user_profiles.json, saved_customers.json
+            batch_size: Documents per WriteBatch commit (max 500)
+            max_workers: Concurrent batch commits
+            checkpoint_path: Progress file (default: <data_dir>/.migration_checkpoint.json)
+            progress_every: Seconds between throughput lines
+        """
+        self.fs = fs
+        self.data_dir = data_dir
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.max_workers = max_workers
+        self.checkpoint_path = checkpoint_path or os.path.join(data_dir, '.migration_checkpoint.json')
+        self.progress_every = progress_every
+
+        # (results key, file name, collection, record builder)
+        self.sources: List[Tuple[str, str, str, Callable]] = [
+            ('users', 'users.json', fs.USERS_COLLECTION, _user_record),
+            ('profiles', 'user_profiles.json', fs.PROFILES_COLLECTION, _profile_record),
+            ('customers', 'saved_customers.json', fs.CUSTOMERS_COLLECTION, _customer_record),
+        ]
+
+        self._lock = threading.Lock()
+        self._checkpoint = {}
+
+    # ---- checkpoints -------------------------------------------------
+
+    def load_checkpoint(self) -> Dict:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                self._checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._checkpoint = {}
+        return self._checkpoint
+
+    def reset_checkpoint(self):
+        self._checkpoint = {}
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # ---- migration ---------------------------------------------------
+
+    def run(self) -> Dict:
+        """Migrate every source file; returns counts per source plus errors and throughput"""
+        self.load_checkpoint()
+        results = {'users': 0, 'profiles': 0, 'customers': 0, 'skipped': 0, 'resumed_from': {}, 'errors': []}
+        started = time.monotonic()
+
+        for name, filename, collection, build in self.sources:
+            file_path = os.path.join(self.data_dir, filename)
+            if not os.path.exists(file_path):
+                continue
+            try:
+                self._migrate_source(name, file_path, collection, build, results)
+            except Exception as e:
+                results['errors'].append(f"{filename}: {e}")
+                print(f"❌ {filename}: {e} (progress saved, rerun to resume)")
+
+        # A clean run needs no resume point; a later run starts fresh
+        if not results['errors']:
+            self.reset_checkpoint()
+
+        elapsed = time.monotonic() - started
+        written = results['users'] + results['profiles'] + results['customers']
+        results['seconds'] = round(elapsed, 2)
+        results['docs_per_second'] = round(written / elapsed, 1) if elapsed > 0 else 0.0
+        print(f"🏁 Migrated {written} documents in {elapsed:.1f}s ({results['docs_per_second']} docs/sec)")
+        return results
+
+    def _migrate_source(self, name: str, file_path: str, collection: str, build: Callable, results: Dict):
+        state = self._checkpoint.setdefault(name, {'committed': 0, 'done': False})
+        if state.get('done'):
+            print(f"⏭️  {name}: already migrated (checkpoint)")
+            return
+        resume_from = state.get('committed', 0)
+        if resume_from:
+            results['resumed_from'][name] = resume_from
+            print(f"↩️  {name}: resuming after {resume_from} records")
+
+        collection_ref = self.fs.db.collection(collection)
+        # Batch ranges finished out of order, waiting for the committed prefix to reach them
+        finished: Dict[int, int] = {}
+        in_flight = threading.BoundedSemaphore(self.max_workers * 2)
+        failures = []
+        counters = {'written': 0, 'skipped': 0}
+        started = time.monotonic()
+        last_report = [started]
+
+        def commit(start: int, end: int, docs: List[Tuple[str, Dict]], skipped: int):
+            try:
+                if docs:
+                    batch = self.fs.db.batch()
+                    for doc_id, record in docs:
+                        batch.set(collection_ref.document(doc_id), record)
+                    batch.commit()
+                with self._lock:
+                    counters['written'] += len(docs)
+                    counters['skipped'] += skipped
+                    finished[start] = end
+                    # Advance the checkpoint over the contiguous committed prefix only
+                    advanced = False
+                    while state['committed'] in finished:
+                        state['committed'] = finished.pop(state['committed'])
+                        advanced = True
+                    if advanced:
+                        self._save_checkpoint()
+                    self._report(name, counters, started, last_report)
+            except Exception as e:
+                failures.append(f"records {start}-{end}: {e}")
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f'migrate-{name}') as executor:
+            docs, skipped, batch_start, seen = [], 0, resume_from, resume_from
+            for position, (key, value) in enumerate(iter_json_object(file_path)):
+                if position < resume_from:
+                    continue
+                seen = position + 1
+                built = build(key, value) if isinstance(value, dict) else None
+                if built is None:
+                    skipped += 1
+                else:
+                    docs.append(built)
+                if len(docs) + skipped >= self.batch_size:
+                    in_flight.acquire()
+                    executor.submit(commit, batch_start, seen, docs, skipped)
+                    docs, skipped, batch_start = [], 0, seen
+            if docs or skipped:
+                in_flight.acquire()
+                executor.submit(commit, batch_start, seen, docs, skipped)
+
+        results[name] += counters['written']
+        results['skipped'] += counters['skipped']
+        if failures:
+            results['errors'].extend(f"{name} {failure}" for failure in failures)
+            self._save_checkpoint()
+            raise RuntimeError(f"{len(failures)} batch(es) failed")
+
+        state['done'] = True
+        self._save_checkpoint()
+        elapsed = time.monotonic() - started
+        rate = counters['written'] / elapsed if elapsed > 0 else 0.0
+        print(f"✅ {name}: {counters['written']} written, {counters['skipped']} skipped ({rate:.1f} docs/sec)")
+
+    def _report(self, name: str, counters: Dict, started: float, last_report: List[float]):
+        now = time.monotonic()
+        if now - last_report[0] < self.progress_every:
+            return
+        last_report[0] = now
+        rate = counters['written'] / (now - started) if now > started else 0.0
+        print(f"   {name}: {counters['written']} docs written ({rate:.1f} docs/sec)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream AIBA JSON data into Firestore')
+    parser.add_argument('--data-dir', default='data', help='Directory with the JSON files')
+    parser.add_argument('--batch-size', type=int, default=400, help='Documents per commit (max 500)')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent batch commits')
+    parser.add_argument('--checkpoint', default=None, help='Checkpoint file path')
+    parser.add_argument('--reset', action='store_true', help='Start over, ignoring any checkpoint')
+    args = parser.parse_args()
+
+    from firestore_service import firestore_service
+
+    migration = StreamingMigration(
+        firestore_service,
+        data_dir=args.data_dir,
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        checkpoint_path=args.checkpoint
+    )
+    if args.reset:
+        migration.reset_checkpoint()
+
+    results = migration.run()
+    if results['errors']:
+        print("⚠️  Errors encountered:")
+        for error in results['errors']:
+            print(f"     - {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,12 +6,18 @@ Replaces JSON file storage with scalable Firestore database
 import firebase_admin
 from firebase_admin import credentials, firestore
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+import base64
 import json
 import os
+import time
+from content_store import ContentStore, create_content_store
+from utils.ttl_cache import TTLCache
+from utils.search_index import SearchIndexCache, build_search_tokens, query_tokens, matches_all
 
 class FirestoreService:
-    def __init__(self):
+    def __init__(self, content_store: ContentStore = None):
         """Initialize Firestore service."""
         # Initialize Firebase if not already done
         if not firebase_admin._apps:
@@ -23,6 +29,7 @@ class FirestoreService:
                 raise
         
         self.db = firestore.client()
+        self.last_session_cleanup = None
         
         # Collection names
         self.USERS_COLLECTION = 'users'
@@ -34,6 +41,35 @@ class FirestoreService:
         self.BUSINESS_PROFILES_COLLECTION = 'business_profiles'
         self.DOCUMENTS_COLLECTION = 'user_documents'
         self.DOCUMENTS_CONTENT_COLLECTION = 'document_content'
+        self.USER_STATS_COLLECTION = 'user_stats'
+        
+        # Counter fields kept in each user_stats document
+        self.STAT_COUNTERS = ['total_quotations', 'total_purchase_orders', 'total_customers', 'total_documents']
+        # Written only by rebuild_user_stats; bump to recount every user's stats
+        self.STATS_VERSION = 1
+        
+        # Fields returned by document listings (content pointers and internals stay server-side)
+        self.DOCUMENT_LIST_FIELDS = [
+            'document_id', 'user_id', 'document_type', 'document_name', 'document_number',
+            'customer_name', 'quote_number', 'po_number', 'grand_total', 'items_count',
+            'items_summary', 'file_size', 'creation_source', 'status', 'created_at'
+        ]
+        
+        # With a content store (AIBA_CONTENT_STORE) Firestore only keeps a pointer to the
+        # PDF bytes; without one they stay inline in document_content as base64
+        self.content_store = content_store or create_content_store()
+        
+        # Per-user inverted index over the stored search tokens
+        self.search_index = SearchIndexCache(
+            max_users=int(os.getenv('AIBA_SEARCH_CACHE_USERS', '512')),
+            ttl_seconds=float(os.getenv('AIBA_SEARCH_CACHE_TTL_SECONDS', '600'))
+        )
+        
+        # Recently listed document pages, keyed by (user_id, cursor, limit)
+        self.document_list_cache = TTLCache(
+            max_entries=int(os.getenv('AIBA_DOCUMENT_LIST_CACHE_SIZE', '1024')),
+            ttl_seconds=float(os.getenv('AIBA_DOCUMENT_LIST_CACHE_TTL_SECONDS', '120'))
+        )
     
     # ========================================
     # USER MANAGEMENT
@@ -141,7 +177,11 @@ class FirestoreService:
             
             customer_data['user_id'] = user_id
             customer_data['saved_date'] = firestore.SERVER_TIMESTAMP
-            customer_ref.set(customer_data)
+            customer_data['search_tokens'] = build_search_tokens(customer_data.get('customer_name', ''))
+            self._set_and_count(customer_ref, customer_data, user_id, 'total_customers')
+            
+            cached = {k: v for k, v in customer_data.items() if k != 'saved_date'}
+            self.search_index.upsert('customers', user_id, doc_id, cached)
             return True
         except Exception as e:
             print(f"Error saving customer: {e}")
@@ -174,20 +214,17 @@ class FirestoreService:
             return []
     
     def search_customers(self, user_id: str, search_term: str) -> List[Dict]:
-        """Search customers by name."""
+        """Search customers by word prefixes of the name."""
         try:
-            customers_ref = self.db.collection(self.CUSTOMERS_COLLECTION)
-            # Note: Firestore doesn't support full-text search natively
-            # This is a simple prefix search
-            query = customers_ref.where('user_id', '==', user_id)
-            docs = query.stream()
+            tokens = query_tokens(search_term)
+            if not tokens:
+                return []
             
+            candidates = self._search_candidates('customers', self.CUSTOMERS_COLLECTION, user_id, tokens[0])
             results = []
-            search_lower = search_term.lower()
-            for doc in docs:
-                data = doc.to_dict()
-                customer_name = data.get('customer_name', '').lower()
-                if search_lower in customer_name:
+            for data in candidates:
+                if matches_all(data, tokens[1:]):
+                    data.pop('search_tokens', None)
                     results.append(data)
             
             return results
@@ -195,6 +232,47 @@ class FirestoreService:
             print(f"Error searching customers: {e}")
             return []
     
+    def _search_candidates(self, scope: str, collection: str, user_id: str, token: str) -> List[Dict]:
+        """Records of a user carrying ``token`` - from the local index, else one array_contains query."""
+        records = self.search_index.lookup(scope, user_id, token)
+        if records is not None:
+            return records
+        
+        query = (self.db.collection(collection)
+                 .where('user_id', '==', user_id)
+                 .where('search_tokens', 'array_contains', token))
+        loaded = {doc.id: doc.to_dict() for doc in query.stream()}
+        self.search_index.store(scope, user_id, token, loaded)
+        return [dict(data) for data in loaded.values()]
+    
+    def backfill_search_tokens(self) -> Dict[str, int]:
+        """One-off: add search tokens to documents and customers saved before the search index."""
+        updated = {'documents': 0, 'customers': 0}
+        sources = [
+            ('documents', self.DOCUMENTS_COLLECTION,
+             lambda d: (d.get('document_name'), d.get('customer_name'), d.get('quote_number'), d.get('po_number'))),
+            ('customers', self.CUSTOMERS_COLLECTION, lambda d: (d.get('customer_name'),))
+        ]
+        for scope, collection, fields in sources:
+            batch = self.db.batch()
+            pending = 0
+            for doc in self.db.collection(collection).stream():
+                data = doc.to_dict()
+                if data.get('search_tokens'):
+                    continue
+                batch.update(doc.reference, {'search_tokens': build_search_tokens(*fields(data))})
+                pending += 1
+                updated[scope] += 1
+                if pending == 500:
+                    batch.commit()
+                    batch = self.db.batch()
+                    pending = 0
+            if pending:
+                batch.commit()
+        
+        self.search_index.invalidate()
+        return updated
+    
     # ========================================
     # CHAT SESSIONS
     # ========================================
@@ -210,6 +288,29 @@ class FirestoreService:
             print(f"Error saving chat session: {e}")
             return False
     
+    def save_chat_sessions_batch(self, sessions: Dict[str, Dict]) -> List[str]:
+        """
+        Save many chat sessions with batched merge writes (max 500 per commit).
+        
+        Returns:
+            Session ids whose batch failed to commit (empty when all were saved)
+        """
+        failed = []
+        items = list(sessions.items())
+        for start in range(0, len(items), 500):
+            chunk = items[start:start + 500]
+            try:
+                batch = self.db.batch()
+                for session_id, session_data in chunk:
+                    session_ref = self.db.collection(self.CHAT_SESSIONS_COLLECTION).document(session_id)
+                    # Copy, so callers can re-queue the state without the server sentinel
+                    batch.set(session_ref, {**session_data, 'last_updated': firestore.SERVER_TIMESTAMP}, merge=True)
+                batch.commit()
+            except Exception as e:
+                print(f"Error saving chat session batch: {e}")
+                failed.extend(session_id for session_id, _ in chunk)
+        return failed
+    
     def get_chat_session(self, session_id: str) -> Optional[Dict]:
         """Get chat session data."""
         try:
@@ -241,25 +342,71 @@ class FirestoreService:
             print(f"Error deleting chat session: {e}")
             return False
     
-    def cleanup_old_sessions(self, hours: int = 24) -> int:
-        """Clean up old chat sessions."""
+    def cleanup_old_sessions(self, hours: int = 24, page_size: int = 500, max_workers: int = 4) -> int:
+        """
+        Delete chat sessions idle for more than ``hours``.
+        
+        Pages through expired sessions (ids only) and deletes each page as one
+        WriteBatch (Firestore's 500-write limit), committing pages concurrently.
+        
+        Returns:
+            Number of sessions deleted
+        """
+        started = time.monotonic()
+        deleted_count = 0
+        failed_batches = 0
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
-            sessions_ref = self.db.collection(self.CHAT_SESSIONS_COLLECTION)
+            page_size = max(1, min(page_size, 500))
             
             # Firestore timestamp comparison
-            query = sessions_ref.where('last_updated', '<', cutoff_time)
-            docs = query.stream()
+            query = (self.db.collection(self.CHAT_SESSIONS_COLLECTION)
+                     .where('last_updated', '<', cutoff_time)
+                     .order_by('last_updated')
+                     .select(['last_updated'])
+                     .limit(page_size))
             
-            deleted_count = 0
-            for doc in docs:
-                doc.reference.delete()
-                deleted_count += 1
+            def delete_page(refs) -> int:
+                batch = self.db.batch()
+                for ref in refs:
+                    batch.delete(ref)
+                batch.commit()
+                return len(refs)
             
-            return deleted_count
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='session-cleanup') as executor:
+                futures = []
+                last_doc = None
+                while True:
+                    page_query = query.start_after(last_doc) if last_doc else query
+                    page = list(page_query.stream())
+                    if not page:
+                        break
+                    futures.append(executor.submit(delete_page, [doc.reference for doc in page]))
+                    if len(page) < page_size:
+                        break
+                    last_doc = page[-1]
+                
+                for future in as_completed(futures):
+                    try:
+                        deleted_count += future.result()
+                    except Exception as e:
+                        failed_batches += 1
+                        print(f"Error deleting session batch: {e}")
         except Exception as e:
             print(f"Error cleaning up sessions: {e}")
-            return 0
+        
+        elapsed = time.monotonic() - started
+        self.last_session_cleanup = {
+            'deleted': deleted_count,
+            'failed_batches': failed_batches,
+            'seconds': round(elapsed, 3),
+            'sessions_per_second': round(deleted_count / elapsed, 1) if elapsed > 0 else 0.0,
+            'finished_at': datetime.now().isoformat()
+        }
+        if deleted_count or failed_batches:
+            print(f"🧹 Deleted {deleted_count} chat sessions in {elapsed:.2f}s "
+                  f"({self.last_session_cleanup['sessions_per_second']}/s, {failed_batches} failed batches)")
+        return deleted_count
     
     # ========================================
     # QUOTATIONS
@@ -278,7 +425,7 @@ class FirestoreService:
                 'created_date': firestore.SERVER_TIMESTAMP,
                 'status': 'created'
             })
-            quotation_ref.set(quotation_data)
+            self._set_and_count(quotation_ref, quotation_data, user_id, 'total_quotations')
             return quote_id
         except Exception as e:
             print(f"Error saving quotation: {e}")
@@ -341,7 +488,7 @@ class FirestoreService:
                 'created_date': firestore.SERVER_TIMESTAMP,
                 'status': 'created'
             })
-            po_ref.set(po_data)
+            self._set_and_count(po_ref, po_data, user_id, 'total_purchase_orders')
             return po_id
         except Exception as e:
             print(f"Error saving purchase order: {e}")
@@ -391,58 +538,93 @@ class FirestoreService:
     # DOCUMENT MANAGEMENT
     # ========================================
     
+    def _document_metadata(self, doc_id: str, user_id: str, document_data: Dict,
+                           pdf_content: bytes = None, content_key: str = None) -> Dict:
+        """Firestore metadata record for a saved PDF document."""
+        return {
+            'document_id': doc_id,
+            'user_id': user_id,
+            'document_type': document_data.get('document_type', 'unknown'),
+            'document_name': document_data.get('document_name', 'Untitled'),
+            'document_number': document_data.get('document_number', ''),
+            'customer_name': document_data.get('customer_name', ''),
+            'customer_address': document_data.get('customer_address', ''),
+            'customer_email': document_data.get('customer_email', ''),
+            'customer_gstin': document_data.get('customer_gstin', ''),
+            'quote_number': document_data.get('quote_number', ''),
+            'po_number': document_data.get('po_number', ''),
+            'grand_total': document_data.get('grand_total', 0),
+            'items_count': document_data.get('items_count', 0),
+            'items_summary': document_data.get('items_summary', ''),
+            'file_path': document_data.get('file_path', ''),
+            'file_size': len(pdf_content) if pdf_content else 0,
+            'content_key': content_key,
+            'content_store': self.content_store.name if content_key else None,
+            'creation_source': document_data.get('creation_source', 'aiba'),
+            'search_tokens': build_search_tokens(
+                document_data.get('document_name', 'Untitled'),
+                document_data.get('customer_name', ''),
+                document_data.get('quote_number', ''),
+                document_data.get('po_number', '')
+            ),
+            'status': 'active',
+            'created_at': firestore.SERVER_TIMESTAMP,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }
+    
+    def _store_content(self, pdf_content: bytes) -> Optional[str]:
+        """Put PDF bytes in the content store; None when there is no store (or no content)."""
+        if not pdf_content or self.content_store is None:
+            return None
+        return self.content_store.put(pdf_content)
+    
+    def _content_record(self, doc_id: str, user_id: str, pdf_content: bytes, content_key: str = None) -> Dict:
+        """document_content record: a pointer to the stored PDF bytes, or the bytes inline as base64."""
+        record = {
+            'document_id': doc_id,
+            'user_id': user_id,  # Add user_id for security
+            'content_type': 'application/pdf',
+            'size': len(pdf_content),
+            'created_at': firestore.SERVER_TIMESTAMP
+        }
+        if content_key:
+            record.update({'content_key': content_key, 'content_store': self.content_store.name})
+        else:
+            record.update({'content': base64.b64encode(pdf_content).decode('utf-8'), 'encoding': 'base64'})
+        return record
+    
+    def _cache_saved_document(self, user_id: str, doc_id: str, metadata: Dict):
+        """Make a just-saved document visible to list and search caches."""
+        cached = {k: v for k, v in metadata.items() if k not in ('created_at', 'updated_at')}
+        cached['created_at'] = datetime.now(timezone.utc)  # stand-in for the server timestamp
+        self.search_index.upsert('documents', user_id, doc_id, cached)
+    
     def save_document(self, user_id: str, document_data: Dict, pdf_content: bytes = None) -> str:
         """Save a PDF document to Firestore with improved structure."""
         try:
-            # Generate a unique document ID with timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            doc_type_prefix = document_data.get('document_type', 'doc')[:3].upper()
-            doc_id = f"{user_id}_{doc_type_prefix}_{timestamp}_{firestore.SERVER_TIMESTAMP}"
-            
             # Use the generated ID as document ID for better organization
             doc_ref = self.db.collection(self.DOCUMENTS_COLLECTION).document()
             actual_doc_id = doc_ref.id  # Firestore auto-generated ID
             
-            # Prepare document metadata with proper structure
-            metadata = {
-                'document_id': actual_doc_id,
-                'user_id': user_id,
-                'document_type': document_data.get('document_type', 'unknown'),
-                'document_name': document_data.get('document_name', 'Untitled'),
-                'document_number': document_data.get('document_number', ''),
-                'customer_name': document_data.get('customer_name', ''),
-                'customer_address': document_data.get('customer_address', ''),
-                'customer_email': document_data.get('customer_email', ''),
-                'customer_gstin': document_data.get('customer_gstin', ''),
-                'quote_number': document_data.get('quote_number', ''),
-                'po_number': document_data.get('po_number', ''),
-                'grand_total': document_data.get('grand_total', 0),
-                'items_count': document_data.get('items_count', 0),
-                'items_summary': document_data.get('items_summary', ''),
-                'file_path': document_data.get('file_path', ''),
-                'file_size': len(pdf_content) if pdf_content else 0,
-                'creation_source': document_data.get('creation_source', 'aiba'),
-                'status': 'active',
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            }
+            # Store the PDF bytes first so metadata never points at missing content
+            content_key = self._store_content(pdf_content)
             
-            # Save metadata to main documents collection
-            doc_ref.set(metadata)
+            # Prepare document metadata with proper structure
+            metadata = self._document_metadata(actual_doc_id, user_id, document_data, pdf_content, content_key)
             
-            # Save PDF content separately for better performance
+            # Save metadata, its content record and the user's document counter atomically
+            batch = self.db.batch()
+            batch.set(doc_ref, metadata)
             if pdf_content:
-                import base64
-                pdf_b64 = base64.b64encode(pdf_content).decode('utf-8')
                 content_ref = self.db.collection(self.DOCUMENTS_CONTENT_COLLECTION).document(actual_doc_id)
-                content_ref.set({
-                    'document_id': actual_doc_id,
-                    'user_id': user_id,  # Add user_id for security
-                    'content': pdf_b64,
-                    'content_type': 'application/pdf',
-                    'encoding': 'base64',
-                    'created_at': firestore.SERVER_TIMESTAMP
-                })
+                batch.set(content_ref, self._content_record(actual_doc_id, user_id, pdf_content, content_key))
+            batch.set(self._stats_ref(user_id), {
+                'total_documents': firestore.Increment(1),
+                'updated_at': firestore.SERVER_TIMESTAMP
+            }, merge=True)
+            batch.commit()
+            self.invalidate_user_documents(user_id)
+            self._cache_saved_document(user_id, actual_doc_id, metadata)
             
             return actual_doc_id
             
@@ -450,6 +632,81 @@ class FirestoreService:
             print(f"Error saving document to Firestore: {e}")
             return None
     
+    @staticmethod
+    def _batch_chunks(documents: List[tuple], content_keys: List[Optional[str]],
+                      max_documents: int = (500 - 1) // 2, max_inline_bytes: int = 8 * 1024 * 1024):
+        """Split document indexes into WriteBatch-sized runs (write count and inline payload)."""
+        chunk, inline_bytes = [], 0
+        for i, (_, pdf_content) in enumerate(documents):
+            size = len(pdf_content) * 4 // 3 if pdf_content and not content_keys[i] else 0
+            if chunk and (len(chunk) >= max_documents or inline_bytes + size > max_inline_bytes):
+                yield chunk
+                chunk, inline_bytes = [], 0
+            chunk.append(i)
+            inline_bytes += size
+        if chunk:
+            yield chunk
+    
+    def save_documents_batch(self, user_id: str, documents: List[tuple], max_workers: int = 8) -> List[Optional[str]]:
+        """
+        Save many PDF documents for one user with batched commits.
+        
+        Content is uploaded in parallel; metadata, content records and the
+        document counter go out in WriteBatches of up to 249 documents
+        (2 writes each plus the counter, within Firestore's 500-write cap).
+        Without a content store the PDFs travel inline as base64, so batches
+        are also cut at about 8 MB to stay under the 10 MiB request limit.
+        
+        Args:
+            user_id: Owner of the documents
+            documents: List of (document_data, pdf_content) tuples
+            max_workers: Concurrent content uploads
+            
+        Returns:
+            List[Optional[str]]: Document ids in input order (None where saving failed)
+        """
+        doc_ids: List[Optional[str]] = [None] * len(documents)
+        if not documents:
+            return doc_ids
+        
+        try:
+            # Store the PDF bytes first so metadata never points at missing content
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                content_keys = list(executor.map(lambda document: self._store_content(document[1]), documents))
+        except Exception as e:
+            print(f"Error storing document contents: {e}")
+            return doc_ids
+        
+        for indexes in self._batch_chunks(documents, content_keys):
+            try:
+                batch = self.db.batch()
+                saved = []
+                for i in indexes:
+                    document_data, pdf_content = documents[i]
+                    doc_ref = self.db.collection(self.DOCUMENTS_COLLECTION).document()
+                    metadata = self._document_metadata(doc_ref.id, user_id, document_data,
+                                                       pdf_content, content_keys[i])
+                    batch.set(doc_ref, metadata)
+                    if pdf_content:
+                        content_ref = self.db.collection(self.DOCUMENTS_CONTENT_COLLECTION).document(doc_ref.id)
+                        batch.set(content_ref, self._content_record(doc_ref.id, user_id, pdf_content,
+                                                                    content_keys[i]))
+                    saved.append((i, doc_ref.id, metadata))
+                batch.set(self._stats_ref(user_id), {
+                    'total_documents': firestore.Increment(len(saved)),
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                }, merge=True)
+                batch.commit()
+                
+                for i, doc_id, metadata in saved:
+                    doc_ids[i] = doc_id
+                    self._cache_saved_document(user_id, doc_id, metadata)
+            except Exception as e:
+                print(f"Error saving document batch to Firestore: {e}")
+        
+        self.invalidate_user_documents(user_id)
+        return doc_ids
+    
     def get_document(self, doc_id: str) -> Optional[Dict]:
         """Get document metadata by ID."""
         try:
@@ -462,35 +719,89 @@ class FirestoreService:
     
     def get_document_content(self, doc_id: str) -> Optional[bytes]:
         """Get PDF content by document ID."""
+        stream = self.open_document_content(doc_id)
+        if stream is None:
+            return None
+        try:
+            return stream.read()
+        finally:
+            stream.close()
+    
+    def open_document_content(self, doc_id: str, document: Dict = None):
+        """
+        Open a readable stream of a document's PDF content.
+        Pass the already-loaded metadata as ``document`` to skip the pointer lookup.
+        """
         try:
-            content_ref = self.db.collection(self.DOCUMENTS_CONTENT_COLLECTION).document(doc_id)
-            doc = content_ref.get()
-            if doc.exists:
-                import base64
+            content_key = (document or {}).get('content_key')
+            if not content_key:
+                content_ref = self.db.collection(self.DOCUMENTS_CONTENT_COLLECTION).document(doc_id)
+                doc = content_ref.get()
+                if not doc.exists:
+                    return None
                 content_data = doc.to_dict()
-                pdf_b64 = content_data.get('content', '')
-                return base64.b64decode(pdf_b64) if pdf_b64 else None
-            return None
+                content_key = content_data.get('content_key')
+                
+                # Without a content store (and for older documents) the PDF is inline as base64
+                if not content_key:
+                    from io import BytesIO
+                    pdf_b64 = content_data.get('content', '')
+                    return BytesIO(base64.b64decode(pdf_b64)) if pdf_b64 else None
+            
+            if self.content_store is None:
+                print(f"Document {doc_id} content is in a content store, but AIBA_CONTENT_STORE is not set")
+                return None
+            return self.content_store.open(content_key)
         except Exception as e:
             print(f"Error getting document content: {e}")
             return None
     
     def get_user_documents(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """Get all documents for a user."""
+        """Get the newest active documents for a user."""
+        return self.get_user_documents_page(user_id, limit)['documents']
+    
+    def get_user_documents_page(self, user_id: str, limit: int = 50, cursor: str = None) -> Dict:
+        """
+        Get one page of a user's active documents, newest first.
+        
+        Uses the composite index (user_id, status, created_at desc) - see
+        firestore.indexes.json - and only reads the listing fields.
+        
+        Args:
+            user_id: Owner of the documents
+            limit: Page size
+            cursor: ``next_cursor`` from the previous page (None for the first page)
+            
+        Returns:
+            Dict with 'documents' and 'next_cursor' (None on the last page)
+        """
+        cache_key = (user_id, cursor, limit)
+        cached = self.document_list_cache.get(cache_key)
+        if cached is not None:
+            return {'documents': [dict(doc) for doc in cached['documents']], 'next_cursor': cached['next_cursor']}
+        
         try:
             docs_ref = self.db.collection(self.DOCUMENTS_COLLECTION)
+            query = (docs_ref
+                     .where('user_id', '==', user_id)
+                     .where('status', '==', 'active')
+                     .order_by('created_at', direction=firestore.Query.DESCENDING)
+                     .select(self.DOCUMENT_LIST_FIELDS))
             
-            # Simplified query to avoid index requirement - filter by user_id only
-            query = docs_ref.where('user_id', '==', user_id).limit(limit * 2)  # Get more to filter locally
-            docs = query.stream()
+            if cursor:
+                # Cursors are document IDs; only resume from the caller's own documents
+                cursor_doc = docs_ref.document(cursor).get()
+                if not cursor_doc.exists or cursor_doc.get('user_id') != user_id:
+                    return {'documents': [], 'next_cursor': None}
+                query = query.start_after(cursor_doc)
+            
+            # Fetch one extra row to know whether another page exists
+            docs = list(query.limit(limit + 1).stream())
             
             documents = []
-            for doc in docs:
+            for doc in docs[:limit]:
                 doc_data = doc.to_dict()
-                
-                # Filter out deleted documents locally
-                if doc_data.get('status') != 'active':
-                    continue
+                doc_data.setdefault('document_id', doc.id)
                 
                 # Convert timestamp to string for JSON serialization
                 if 'created_at' in doc_data and doc_data['created_at']:
@@ -502,58 +813,74 @@ class FirestoreService:
                     doc_data['created_at_str'] = 'Unknown date'
                     
                 documents.append(doc_data)
-                
-                # Stop when we have enough documents
-                if len(documents) >= limit:
-                    break
-            
-            # Sort by created_at locally (newest first)
-            documents.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
             
-            return documents
+            page = {
+                'documents': documents,
+                'next_cursor': docs[limit - 1].id if len(docs) > limit else None
+            }
+            self.document_list_cache.set(cache_key, page)
+            return {'documents': [dict(doc) for doc in documents], 'next_cursor': page['next_cursor']}
             
         except Exception as e:
             print(f"Error getting user documents: {e}")
-            return []
+            return {'documents': [], 'next_cursor': None}
+    
+    def invalidate_user_documents(self, user_id: str):
+        """Drop cached document listings for a user (after a save or delete)."""
+        for key in self.document_list_cache.keys():
+            if key[0] == user_id:
+                self.document_list_cache.pop(key)
     
     def delete_document(self, doc_id: str, user_id: str) -> bool:
         """Soft delete a document (mark as deleted)."""
         try:
-            # Verify ownership
             doc_ref = self.db.collection(self.DOCUMENTS_COLLECTION).document(doc_id)
-            doc = doc_ref.get()
-            if not doc.exists:
-                return False
+            stats_ref = self._stats_ref(user_id)
             
-            doc_data = doc.to_dict()
-            if doc_data.get('user_id') != user_id:
-                return False  # User doesn't own this document
+            @firestore.transactional
+            def soft_delete(transaction) -> bool:
+                # Verify ownership
+                doc = doc_ref.get(transaction=transaction)
+                if not doc.exists:
+                    return False
+                
+                doc_data = doc.to_dict()
+                if doc_data.get('user_id') != user_id:
+                    return False  # User doesn't own this document
+                
+                # Soft delete (only an active document decrements the counter)
+                transaction.update(doc_ref, {
+                    'status': 'deleted',
+                    'deleted_at': firestore.SERVER_TIMESTAMP,
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                })
+                if doc_data.get('status') == 'active':
+                    transaction.set(stats_ref, {
+                        'total_documents': firestore.Increment(-1),
+                        'updated_at': firestore.SERVER_TIMESTAMP
+                    }, merge=True)
+                return True
             
-            # Soft delete
-            doc_ref.update({
-                'status': 'deleted',
-                'deleted_at': firestore.SERVER_TIMESTAMP,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            })
+            if not soft_delete(self.db.transaction()):
+                return False
+            self.invalidate_user_documents(user_id)
+            self.search_index.update_fields('documents', user_id, doc_id, {'status': 'deleted'})
             return True
         except Exception as e:
             print(f"Error deleting document: {e}")
             return False
     
     def search_user_documents(self, user_id: str, search_term: str, doc_type: str = None) -> List[Dict]:
-        """Search user documents by name or customer."""
+        """Search user documents by word prefixes of name, customer, or quote/PO number."""
         try:
-            docs_ref = self.db.collection(self.DOCUMENTS_COLLECTION)
-            # Simple query to avoid index requirements
-            query = docs_ref.where('user_id', '==', user_id)
+            tokens = query_tokens(search_term)
+            if not tokens:
+                return []
             
-            docs = query.stream()
+            candidates = self._search_candidates('documents', self.DOCUMENTS_COLLECTION, user_id, tokens[0])
             
             results = []
-            search_lower = search_term.lower()
-            for doc in docs:
-                data = doc.to_dict()
-                
+            for data in candidates:
                 # Filter out deleted documents
                 if data.get('status') != 'active':
                     continue
@@ -562,20 +889,22 @@ class FirestoreService:
                 if doc_type and data.get('document_type') != doc_type:
                     continue
                 
-                # Search in document name, customer name, or quote/PO number
-                searchable_text = f"{data.get('document_name', '')} {data.get('customer_name', '')} {data.get('quote_number', '')} {data.get('po_number', '')}".lower()
-                if search_lower in searchable_text:
-                    if 'created_at' in data and data['created_at']:
-                        try:
-                            data['created_at_str'] = data['created_at'].strftime('%Y-%m-%d %H:%M:%S')
-                        except:
-                            data['created_at_str'] = 'Unknown date'
-                    else:
+                # Every other query word must prefix-match too
+                if not matches_all(data, tokens[1:]):
+                    continue
+                
+                data.pop('search_tokens', None)
+                if 'created_at' in data and data['created_at']:
+                    try:
+                        data['created_at_str'] = data['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+                    except:
                         data['created_at_str'] = 'Unknown date'
-                    results.append(data)
+                else:
+                    data['created_at_str'] = 'Unknown date'
+                results.append(data)
             
             # Sort by created_at (newest first)
-            results.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
+            results.sort(key=lambda x: x.get('created_at') or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
             
             return results
         except Exception as e:
@@ -586,8 +915,62 @@ class FirestoreService:
     # ANALYTICS & REPORTING
     # ========================================
     
+    def _stats_ref(self, user_id: str):
+        return self.db.collection(self.USER_STATS_COLLECTION).document(user_id)
+    
+    def _set_and_count(self, ref, data: Dict, user_id: str, counter: str):
+        """Write ``data`` to ``ref`` and, if the document is new, increment the user's counter in one transaction."""
+        stats_ref = self._stats_ref(user_id)
+        
+        @firestore.transactional
+        def write(transaction):
+            is_new = not ref.get(transaction=transaction).exists
+            transaction.set(ref, data)
+            if is_new:
+                transaction.set(stats_ref, {
+                    counter: firestore.Increment(1),
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                }, merge=True)
+        
+        write(self.db.transaction())
+    
+    def _count(self, query, transaction=None) -> int:
+        """Server-side count aggregation, streaming only on clients without it."""
+        try:
+            result = query.count().get(transaction=transaction)
+            return int(result[0][0].value)
+        except AttributeError:
+            return len(list(query.select([]).stream(transaction=transaction)))
+    
+    def rebuild_user_stats(self, user_id: str) -> Dict:
+        """Recount a user's totals with aggregation queries and store them as the counter document."""
+        stats_ref = self._stats_ref(user_id)
+        queries = {
+            'total_quotations': self.db.collection(self.QUOTATIONS_COLLECTION).where('user_id', '==', user_id),
+            'total_purchase_orders': self.db.collection(self.PURCHASE_ORDERS_COLLECTION).where('user_id', '==', user_id),
+            'total_customers': self.db.collection(self.CUSTOMERS_COLLECTION).where('user_id', '==', user_id),
+            'total_documents': (self.db.collection(self.DOCUMENTS_COLLECTION)
+                                .where('user_id', '==', user_id).where('status', '==', 'active'))
+        }
+        
+        # Count and write in one transaction, so increments that land meanwhile
+        # conflict and retry instead of being overwritten by the recount
+        @firestore.transactional
+        def recount(transaction) -> Dict:
+            stats_ref.get(transaction=transaction)
+            counts = {field: self._count(query, transaction) for field, query in queries.items()}
+            transaction.set(stats_ref, dict(
+                counts,
+                stats_version=self.STATS_VERSION,
+                seeded_at=firestore.SERVER_TIMESTAMP,
+                updated_at=firestore.SERVER_TIMESTAMP
+            ), merge=True)
+            return counts
+        
+        return recount(self.db.transaction())
+    
     def get_user_stats(self, user_id: str) -> Dict:
-        """Get user statistics."""
+        """Get user statistics (one read of the user's counter document)."""
         try:
             stats = {
                 'total_quotations': 0,
@@ -597,25 +980,16 @@ class FirestoreService:
                 'active_sessions': 0
             }
             
-            # Count quotations
-            quotes_ref = self.db.collection(self.QUOTATIONS_COLLECTION)
-            quotes_query = quotes_ref.where('user_id', '==', user_id)
-            stats['total_quotations'] = len(list(quotes_query.stream()))
-            
-            # Count purchase orders
-            pos_ref = self.db.collection(self.PURCHASE_ORDERS_COLLECTION)
-            pos_query = pos_ref.where('user_id', '==', user_id)
-            stats['total_purchase_orders'] = len(list(pos_query.stream()))
+            counters = self._stats_ref(user_id).get()
+            counter_data = counters.to_dict() if counters.exists else {}
             
-            # Count customers
-            customers_ref = self.db.collection(self.CUSTOMERS_COLLECTION)
-            customers_query = customers_ref.where('user_id', '==', user_id)
-            stats['total_customers'] = len(list(customers_query.stream()))
+            # Counters are only trusted once rebuild_user_stats has seeded them; Increment
+            # writes alone (users from before the counters) hold just the later deltas
+            if counter_data.get('stats_version') != self.STATS_VERSION:
+                counter_data = self.rebuild_user_stats(user_id)
             
-            # Count documents
-            docs_ref = self.db.collection(self.DOCUMENTS_COLLECTION)
-            docs_query = docs_ref.where('user_id', '==', user_id).where('status', '==', 'active')
-            stats['total_documents'] = len(list(docs_query.stream()))
+            for field in self.STAT_COUNTERS:
+                stats[field] = max(int(counter_data.get(field, 0)), 0)
             
             return stats
         except Exception as e:
@@ -626,75 +1000,28 @@ class FirestoreService:
     # MIGRATION UTILITIES
     # ========================================
     
-    def migrate_from_json(self, json_data_dir: str = 'data') -> Dict:
-        """Migrate existing JSON data to Firestore."""
-        migration_results = {
-            'users': 0,
-            'profiles': 0,
-            'customers': 0,
-            'errors': []
-        }
+    def migrate_from_json(self, json_data_dir: str = 'data', batch_size: int = 400,
+                          max_workers: int = 8) -> Dict:
+        """Migrate existing JSON data to Firestore (streamed, batched, resumable)."""
+        from firestore_migration import StreamingMigration
         
         try:
-            # Migrate users
-            users_file = os.path.join(json_data_dir, 'users.json')
-            if os.path.exists(users_file):
-                with open(users_file, 'r') as f:
-                    users_data = json.load(f)
-                    for email, user_data in users_data.items():
-                        if self.save_user(email, user_data):
-                            migration_results['users'] += 1
-            
-            # Migrate profiles
-            profiles_file = os.path.join(json_data_dir, 'user_profiles.json')
-            if os.path.exists(profiles_file):
-                with open(profiles_file, 'r') as f:
-                    profiles_data = json.load(f)
-                    for user_id, profile_data in profiles_data.items():
-                        if self.save_user_profile(user_id, profile_data):
-                            migration_results['profiles'] += 1
-            
-            # Migrate customers (if any exist)
-            customers_file = os.path.join(json_data_dir, 'saved_customers.json')
-            if os.path.exists(customers_file):
-                with open(customers_file, 'r') as f:
-                    customers_data = json.load(f)
-                    for customer_name, customer_data in customers_data.items():
-                        # For existing customers, we'll need to associate them with the first user
-                        # This is a simplified migration - in reality you might need manual mapping
-                        user_id = customer_data.get('user_id', 'unknown')
-                        if user_id != 'unknown' and self.save_customer(user_id, customer_data):
-                            migration_results['customers'] += 1
-            
-        except Exception as e:
-            migration_results['errors'].append(str(e))
-        
-        return migration_results
+            return StreamingMigration(
+                self, data_dir=json_data_dir, batch_size=batch_size, max_workers=max_workers
+            ).run()
+        except Exception as e:
+            return {'users': 0, 'profiles': 0, 'customers': 0, 'errors': [str(e)]}
     
-    def backup_to_json(self, backup_dir: str = 'backup') -> bool:
-        """Backup Firestore data to JSON files."""
+    def backup_to_json(self, backup_dir: str = 'backup', page_size: int = 500,
+                       max_workers: int = 4) -> bool:
+        """Backup all Firestore collections to gzip NDJSON files (streamed, one page per worker in memory)."""
+        from firestore_backup import StreamingBackup
+        
         try:
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Backup users
-            users_ref = self.db.collection(self.USERS_COLLECTION)
-            users_data = {}
-            for doc in users_ref.stream():
-                users_data[doc.id] = doc.to_dict()
-            
-            with open(os.path.join(backup_dir, 'users_backup.json'), 'w') as f:
-                json.dump(users_data, f, indent=2, default=str)
-            
-            # Backup profiles
-            profiles_ref = self.db.collection(self.PROFILES_COLLECTION)
-            profiles_data = {}
-            for doc in profiles_ref.stream():
-                profiles_data[doc.id] = doc.to_dict()
-            
-            with open(os.path.join(backup_dir, 'profiles_backup.json'), 'w') as f:
-                json.dump(profiles_data, f, indent=2, default=str)
-            
-            return True
+            manifest = StreamingBackup(
+                self, backup_dir=backup_dir, page_size=page_size, max_workers=max_workers
+            ).run()
+            return not manifest['errors']
         except Exception as e:
             print(f"Error backing up data: {e}")
             return False
@@ -3,25 +3,31 @@ AIBA Main - Phase 3: Smart Flow Implementation
 Ultra-simplified chatbot logic with single function handling
 """
 
-from quote_brain import extract_quote_fields, quote_draft_state
+from quote_brain import quote_brain, extract_quote_fields, get_quote_draft, quote_draft_registry
 import json
 
-# Track which field we're currently asking for
-current_asking_field = None
-
-def handle_user_input(user_input):
+def handle_user_input(user_input, session_id='default'):
     """
     Phase 3: Ultra-smart flow - single function handles everything
     Every user input goes through this one function
-    """
-    global current_asking_field
     
+    Each chat session gets its own quote draft (including which field we're
+    currently asking for), so concurrent users never share state.
+    """
+    draft = get_quote_draft(session_id)
+    quote_brain.begin_turn()
+    with draft.lock:
+        response = _handle_turn(user_input, draft)
+    quote_draft_registry.touch(session_id)
+    return response
+
+def _handle_turn(user_input, quote_draft_state):
+    """Run one chat turn against a single session's draft."""
     # Handle special commands first
     user_input_lower = user_input.lower().strip()
     
     if user_input_lower in ['reset', 'clear', 'start over']:
         quote_draft_state.reset()
-        current_asking_field = None
         return "🔄 **Quote draft cleared!** Please provide your quotation request."
     
     if user_input_lower in ['help', '?']:
@@ -45,18 +51,18 @@ def handle_user_input(user_input):
             if not quote_draft_state.state['terms'].get(term):
                 quote_draft_state.update_term(term, 'Included')
         
-        return f"✅ **Default terms applied!**\n\n{get_current_status()}\n\n💬 Type 'generate' to create PDF or provide any corrections."
+        return f"✅ **Default terms applied!**\n\n{get_current_status(quote_draft_state)}\n\n💬 Type 'generate' to create PDF or provide any corrections."
     
     if user_input_lower in ['standard terms', 'default terms']:
         # Set all terms to "Included"
         for term in ['loading', 'transport', 'payment']:
             quote_draft_state.update_term(term, 'Included')
         
-        return f"✅ **Standard terms applied!**\n\n{get_current_status()}\n\n💬 Type 'generate' to create PDF."
+        return f"✅ **Standard terms applied!**\n\n{get_current_status(quote_draft_state)}\n\n💬 Type 'generate' to create PDF."
     
     if user_input_lower == 'manual':
         # Customer details are optional now, just show current status
-        return f"✅ **Quote ready!**\n\n{get_current_status()}\n\n💬 Type 'generate' to create PDF or add more details."
+        return f"✅ **Quote ready!**\n\n{get_current_status(quote_draft_state)}\n\n💬 Type 'generate' to create PDF or add more details."
     
     if user_input_lower in ['generate', 'create pdf', 'yes']:
         # Auto-set missing terms to defaults
@@ -70,35 +76,35 @@ def handle_user_input(user_input):
         missing_required = [f for f in required_fields if not quote_draft_state.state.get(f)]
         
         if missing_required:
-            return f"⚠️ **Still missing required fields:** {', '.join(missing_required)}\n\n{get_current_status()}"
+            return f"⚠️ **Still missing required fields:** {', '.join(missing_required)}\n\n{get_current_status(quote_draft_state)}"
         
         if quote_draft_state.is_ready_for_pdf():
-            current_asking_field = None
-            return generate_pdf_response()
+            quote_draft_state.asking_field = None
+            return generate_pdf_response(quote_draft_state)
         else:
-            return f"⚠️ **Not ready yet!**\n\n{get_current_status()}"
+            return f"⚠️ **Not ready yet!**\n\n{get_current_status(quote_draft_state)}"
     
     # 🔧 Handle SKIP - simplified since customer fields are optional
-    if user_input_lower == 'skip' and current_asking_field:
+    if user_input_lower == 'skip' and quote_draft_state.asking_field:
         # Handle terms fields
-        if current_asking_field.startswith('terms_'):
-            term_type = current_asking_field.replace('terms_', '')
+        if quote_draft_state.asking_field.startswith('terms_'):
+            term_type = quote_draft_state.asking_field.replace('terms_', '')
             quote_draft_state.update_term(term_type, 'Included')
         
-        current_asking_field = None
+        quote_draft_state.asking_field = None
         
         # Check for remaining terms that need setting
         terms_fields = ["loading", "transport", "payment"]
         for term_field in terms_fields:
             if not quote_draft_state.state["terms"].get(term_field):
-                current_asking_field = f"terms_{term_field}"
+                quote_draft_state.asking_field = f"terms_{term_field}"
                 term_prompts = {
                     'loading': '🚛 Loading charges (e.g., "Included", "₹500 extra", "As per actual")?',
                     'transport': '🚚 Transport charges (e.g., "Included", "₹2000 extra", "FOB")?',
                     'payment': '💳 Payment terms (e.g., "Advance", "30 days credit", "Against delivery")?'
                 }
                 
-                status = get_current_status()
+                status = get_current_status(quote_draft_state)
                 prompt = term_prompts.get(term_field, f'Please specify {term_field} terms:')
                 
                 return f"✅ **Field skipped!**\n\n{status}\n\n{prompt}\n*(Type 'skip' for 'Included')*"
@@ -108,7 +114,7 @@ def handle_user_input(user_input):
             return f"""
 ✅ **All information collected!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 🎯 **Ready to generate PDF!** Type 'generate' to create your quotation.
             """
@@ -116,32 +122,32 @@ def handle_user_input(user_input):
             return f"""
 📝 **Quote updated!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 💬 **Please provide any additional details or type 'generate' if ready.**
             """
     
     # 🔧 Handle responses to terms field questions
-    if current_asking_field and user_input_lower not in ['skip']:
+    if quote_draft_state.asking_field and user_input_lower not in ['skip']:
         # Handle terms fields
-        if current_asking_field.startswith('terms_'):
-            term_type = current_asking_field.replace('terms_', '')
+        if quote_draft_state.asking_field.startswith('terms_'):
+            term_type = quote_draft_state.asking_field.replace('terms_', '')
             quote_draft_state.update_term(term_type, user_input)
         
-        current_asking_field = None
+        quote_draft_state.asking_field = None
         
         # Check for remaining terms
         terms_fields = ["loading", "transport", "payment"]
         for term_field in terms_fields:
             if not quote_draft_state.state["terms"].get(term_field):
-                current_asking_field = f"terms_{term_field}"
+                quote_draft_state.asking_field = f"terms_{term_field}"
                 term_prompts = {
                     'loading': '🚛 Loading charges (e.g., "Included", "₹500 extra", "As per actual")?',
                     'transport': '🚚 Transport charges (e.g., "Included", "₹2000 extra", "FOB")?',
                     'payment': '💳 Payment terms (e.g., "Advance", "30 days credit", "Against delivery")?'
                 }
                 
-                status = get_current_status()
+                status = get_current_status(quote_draft_state)
                 prompt = term_prompts.get(term_field, f'Please specify {term_field} terms:')
                 
                 return f"✅ **Field updated!**\n\n{status}\n\n{prompt}\n*(Type 'skip' for 'Included')*"
@@ -151,7 +157,7 @@ def handle_user_input(user_input):
             return f"""
 ✅ **All information collected!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 🎯 **Ready to generate PDF!** Type 'generate' to create your quotation.
             """
@@ -159,7 +165,7 @@ def handle_user_input(user_input):
             return f"""
 📝 **Quote updated!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 💬 **Please provide any additional details or type 'generate' if ready.**
             """
@@ -175,7 +181,7 @@ def handle_user_input(user_input):
     missing_terms = [field for field in terms_fields if not quote_draft_state.state["terms"].get(field)]
     
     if missing_terms:
-        status = get_current_status()
+        status = get_current_status(quote_draft_state)
         
         return f"""{status}
 
@@ -192,7 +198,7 @@ def handle_user_input(user_input):
         return f"""
 ✅ **All information collected!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 🎯 **Ready to generate PDF!** Type 'generate' to create your quotation.
         """
@@ -201,14 +207,15 @@ def handle_user_input(user_input):
     return f"""
 📝 **Quote updated!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 💬 **Please provide any additional details or type 'generate' if ready.**
     """
 
-def get_current_status():
+def get_current_status(quote_draft_state=None):
     """Get a clean status summary of the current quote draft."""
     
+    quote_draft_state = quote_draft_state or get_quote_draft()
     state = quote_draft_state.state
     
     if state['status'] == 'empty':
@@ -246,9 +253,10 @@ def get_current_status():
     
     return status
 
-def generate_pdf_response():
+def generate_pdf_response(quote_draft_state=None):
     """Generate the final PDF confirmation response."""
     
+    quote_draft_state = quote_draft_state or get_quote_draft()
     pdf_data = quote_draft_state.to_pdf_format()
     
     response = "📋 **QUOTATION READY FOR GENERATION**\n\n"
@@ -286,9 +294,10 @@ def generate_pdf_response():
     
     return response
 
-def handle_field_update(field, value):
+def handle_field_update(field, value, session_id='default'):
     """Handle updating a specific customer field (now optional)."""
     
+    quote_draft_state = get_quote_draft(session_id)
     if value.lower().strip() == 'skip':
         value = ''
     
@@ -299,7 +308,7 @@ def handle_field_update(field, value):
         return f"""
 ✅ **{field.title()} updated!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 🎯 **Ready to generate PDF!** Type 'generate' to create your quotation.
         """
@@ -307,31 +316,32 @@ def handle_field_update(field, value):
         return f"""
 ✅ **{field.title()} updated!**
 
-{get_current_status()}
+{get_current_status(quote_draft_state)}
 
 📝 **Please provide more details to complete the quotation.**
         """
 
 # Convenience functions for integration
-def process_message(user_input):
+def process_message(user_input, session_id='default'):
     """Main entry point for processing user messages."""
-    return handle_user_input(user_input)
+    return handle_user_input(user_input, session_id)
 
-def get_quote_status():
+def get_quote_status(session_id='default'):
     """Get current quote status."""
-    return get_current_status()
+    return get_current_status(get_quote_draft(session_id))
 
-def is_ready_for_pdf():
+def is_ready_for_pdf(session_id='default'):
     """Check if quote is ready for PDF generation."""
-    return quote_draft_state.is_ready_for_pdf()
+    return get_quote_draft(session_id).is_ready_for_pdf()
 
-def get_pdf_data():
+def get_pdf_data(session_id='default'):
     """Get PDF-ready data."""
-    return quote_draft_state.to_pdf_format() if is_ready_for_pdf() else None
+    quote_draft_state = get_quote_draft(session_id)
+    return quote_draft_state.to_pdf_format() if quote_draft_state.is_ready_for_pdf() else None
 
-def reset_quote():
+def reset_quote(session_id='default'):
     """Reset the quote draft."""
-    quote_draft_state.reset()
+    get_quote_draft(session_id).reset()
     return "🔄 **Quote draft cleared!** Please provide your quotation request."
 
 # Demo function for testing
@@ -342,6 +352,7 @@ def demo():
     print("=" * 50)
     
     # Reset state
+    quote_draft_state = get_quote_draft('demo')
     quote_draft_state.reset()
     
     print("\n🎯 **Demonstrating the ultra-smart single-function flow**")
@@ -374,7 +385,7 @@ def demo():
     }
     
     quote_draft_state.update_from_ai_extraction(mock_ai_data)
-    response = handle_user_input("dummy")  # Trigger the flow logic
+    response = handle_user_input("dummy", 'demo')  # Trigger the flow logic
     print(f"AIBA: {response}")
     
     # Step 2: Address
@@ -382,7 +393,7 @@ def demo():
     user_input = "123 Steel Street, Mumbai"
     print(f"User: {user_input}")
     quote_draft_state.update_customer_detail('address', user_input)
-    response = handle_field_update('address', user_input)
+    response = handle_field_update('address', user_input, 'demo')
     print(f"AIBA: {response}")
     
     # Step 3: GSTIN
@@ -390,7 +401,7 @@ def demo():
     user_input = "27ABCDE1234F1Z5"
     print(f"User: {user_input}")
     quote_draft_state.update_customer_detail('gstin', user_input)
-    response = handle_field_update('gstin', user_input)
+    response = handle_field_update('gstin', user_input, 'demo')
     print(f"AIBA: {response}")
     
     # Step 4: Email
@@ -398,14 +409,14 @@ def demo():
     user_input = "contact@abccompany.com"
     print(f"User: {user_input}")
     quote_draft_state.update_customer_detail('email', user_input)
-    response = handle_field_update('email', user_input)
+    response = handle_field_update('email', user_input, 'demo')
     print(f"AIBA: {response}")
     
     # Step 5: Generate
     print(f"\n--- Step 5: Generate PDF ---")
     user_input = "generate"
     print(f"User: {user_input}")
-    response = handle_user_input(user_input)
+    response = handle_user_input(user_input, 'demo')
     print(f"AIBA: {response}")
     
     print("\n" + "=" * 80)
@@ -425,6 +436,7 @@ def simple_demo():
     print("-" * 50)
     
     # Reset state
+    quote_draft_state = get_quote_draft('demo')
     quote_draft_state.reset()
     
     # The exact function structure you requested
@@ -4,6 +4,7 @@ Maintains data integrity and creates backups
 """
 
 from firestore_service import firestore_service
+from firestore_migration import iter_json_object
 import json
 import os
 import shutil
@@ -51,14 +52,14 @@ def verify_json_data():
     for file_path in files_to_check:
         if os.path.exists(file_path):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    verification_results[file_path] = {
-                        'status': 'valid',
-                        'records': len(data) if isinstance(data, dict) else 0
-                    }
-                    print(f"  ✅ {file_path}: {verification_results[file_path]['records']} records")
-            except json.JSONDecodeError as e:
+                # Stream the file so large tenants don't have to fit in memory
+                records = sum(1 for _ in iter_json_object(file_path))
+                verification_results[file_path] = {
+                    'status': 'valid',
+                    'records': records
+                }
+                print(f"  ✅ {file_path}: {records} records")
+            except (json.JSONDecodeError, ValueError) as e:
                 verification_results[file_path] = {
                     'status': 'error',
                     'error': str(e)
@@ -104,11 +105,13 @@ def migrate_data():
         print(f"   📊 Users migrated: {results['users']}")
         print(f"   👤 Profiles migrated: {results['profiles']}")
         print(f"   🏢 Customers migrated: {results['customers']}")
+        print(f"   ⚡ Throughput: {results.get('docs_per_second', 0)} docs/sec in {results.get('seconds', 0)}s")
         
         if results['errors']:
             print(f"⚠️  Errors encountered:")
             for error in results['errors']:
                 print(f"     - {error}")
+            print(f"💡 Progress was checkpointed - run the migration again to resume.")
         
         # Verify migration
         print("\n🔍 Verifying migration...")
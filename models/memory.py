@@ -47,13 +47,21 @@ class ChatMemory:
         """Delete a saved customer."""
         return self.firestore_memory.delete_customer(customer_name)
             
-    def cleanup_old_sessions(self, hours: int = 24):
+    def cleanup_old_sessions(self, hours: int = 24, page_size: int = 500, max_workers: int = 4):
         """Clean up old inactive sessions."""
-        return self.firestore_memory.cleanup_old_sessions(hours)
+        return self.firestore_memory.cleanup_old_sessions(hours, page_size=page_size, max_workers=max_workers)
         
     def get_session_stats(self) -> Dict:
         """Get statistics about current sessions."""
         return self.firestore_memory.get_session_stats()
+    
+    def get_cache_stats(self) -> Dict:
+        """Get in-memory session cache metrics."""
+        return self.firestore_memory.get_cache_stats()
+    
+    def flush(self) -> int:
+        """Persist queued chat session writes immediately."""
+        return self.firestore_memory.flush()
         
     def export_customer_data(self) -> str:
         """Export customer data to JSON string for backup."""
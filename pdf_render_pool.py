@@ -0,0 +1,373 @@
+"""
+PDF Render Pool for AIBA
+Runs CPU-bound WeasyPrint/ReportLab layout in worker processes so PDF
+rendering uses every core instead of holding the GIL in the web worker.
+Each worker imports the generators once and keeps its template, stylesheet
+and font caches warm across jobs.
+
+    job = pdf_render_pool.submit('template_quotation', template_data)
+    pdf_bytes = pdf_render_pool.wait(job)
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+
+class RenderPoolBusy(RuntimeError):
+    """Raised when the render queue is full"""
+
+
+class RenderTimeout(RuntimeError):
+    """Raised when a render job doesn't finish in time"""
+
+
+# ---- worker side -----------------------------------------------------
+
+_worker_generators: Dict[str, object] = {}
+
+
+def in_render_worker() -> bool:
+    """
+    True inside a render worker. Workers re-run the launching script when it
+    is a file (`python some_script.py`), so start-up side effects belong in
+    an explicit init step (as app.py's init_app()) or should check this.
+    """
+    return multiprocessing.parent_process() is not None
+
+
+def _worker_context():
+    """
+    forkserver where available: workers fork from a small server process that
+    has only this module preloaded, so they start fast and never inherit the
+    web process's gRPC/Firebase threads. spawn elsewhere (e.g. Windows).
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _init_worker(template_dir: str):
+    """Import the generators once per worker process and warm their caches"""
+    from utils.pdf_integration import AIBAPDFIntegration
+    from utils.template_pdf_generator import TemplatePDFGenerator
+
+    template_generator = TemplatePDFGenerator(template_dir)
+    template_generator.warm_up()
+    _worker_generators['template'] = template_generator
+    _worker_generators['aiba'] = AIBAPDFIntegration()
+
+
+def _render(job_name: str, args: tuple):
+    """Dispatch one render job; returns the job result"""
+    if job_name == 'ping':
+        return os.getpid()
+    if job_name == 'template_quotation':
+        return _worker_generators['template'].generate_quotation_pdf(*args)
+    if job_name == 'template_purchase_order':
+        return _worker_generators['template'].generate_purchase_order_pdf(*args)
+    if job_name == 'aiba_quotation':
+        return _worker_generators['aiba'].render_quotation_from_aiba_data(*args)
+    if job_name == 'aiba_purchase_order':
+        return _worker_generators['aiba'].render_po_from_aiba_data(*args)
+    raise ValueError(f"Unknown render job: {job_name}")
+
+
+def _run_job(job_name: str, args: tuple) -> tuple:
+    """Worker entry point; returns (result, render seconds, worker pid)"""
+    started = time.perf_counter()
+    result = _render(job_name, args)
+    return result, time.perf_counter() - started, os.getpid()
+
+
+# ---- parent side -----------------------------------------------------
+
+def _plain(value):
+    """Copy of job arguments safe to pickle (Firestore timestamps become ISO strings)"""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(item) for item in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class RenderJob:
+    """Handle for one submitted render"""
+
+    def __init__(self, job_id: int, job_name: str, future: Optional[Future]):
+        self.job_id = job_id
+        self.job_name = job_name
+        self.future = future
+        self.submitted_at = time.monotonic()
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+
+class PDFRenderPool:
+    """Bounded process pool for PDF rendering with per-job metrics"""
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, timeout_seconds: float = 60.0,
+                 template_dir: str = 'templates/pdf', history_size: int = 200):
+        """
+        Args:
+            max_workers: Render processes (0 renders inline in the calling thread)
+            max_pending: Queued + running jobs accepted before new ones are rejected
+            timeout_seconds: Default wait for a job result
+            template_dir: Template directory used by the workers' TemplatePDFGenerator
+            history_size: Finished jobs kept for metrics
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self.template_dir = template_dir
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._ids = itertools.count(1)
+        self._metrics_lock = threading.Lock()
+        self.history = deque(maxlen=history_size)
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'timeouts': 0,
+                         'pool_restarts': 0}
+        self._in_flight = 0
+
+    @property
+    def enabled(self) -> bool:
+        # Workers render inline; they never start pools of their own
+        return self.max_workers > 0 and not in_render_worker()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Not plain fork: forking a process that already runs gRPC/Firebase threads isn't safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=_worker_context(),
+                    initializer=_init_worker,
+                    initargs=(self.template_dir,)
+                )
+            return self._executor
+
+    def _restart_executor(self, broken: ProcessPoolExecutor):
+        """Replace a pool whose worker died (e.g. crashed inside a native library)"""
+        with self._executor_lock:
+            if self._executor is broken:
+                self._executor = None
+                self.counters['pool_restarts'] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """Spawn and warm every worker up front instead of on the first PDF"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        for _ in range(self.max_workers):
+            executor.submit(_run_job, 'ping', ())
+
+    def submit(self, job_name: str, *args) -> RenderJob:
+        """
+        Queue a render job
+
+        Args:
+            job_name: 'template_quotation', 'template_purchase_order',
+                'aiba_quotation' or 'aiba_purchase_order'
+            *args: Arguments for the generator method (must be picklable)
+
+        Raises:
+            RenderPoolBusy: When ``max_pending`` jobs are already queued or running
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._metrics_lock:
+                self.counters['rejected'] += 1
+            raise RenderPoolBusy('PDF renderer is busy, please try again shortly')
+
+        job = RenderJob(next(self._ids), job_name, None)
+        with self._metrics_lock:
+            self.counters['submitted'] += 1
+            self._in_flight += 1
+
+        # Workers and inline renders get the same plain copy, so both modes render alike
+        args = _plain(args)
+        try:
+            if self.enabled:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(_run_job, job_name, args)
+                except BrokenProcessPool:
+                    self._restart_executor(executor)
+                    future = self._get_executor().submit(_run_job, job_name, args)
+            else:
+                future = Future()
+                try:
+                    future.set_result(self._run_inline(job_name, args))
+                except Exception as e:
+                    future.set_exception(e)
+        except Exception:
+            self._finish(None)
+            raise
+
+        job.future = future
+        future.add_done_callback(lambda f: self._finish(job))
+        return job
+
+    def _run_inline(self, job_name: str, args: tuple) -> tuple:
+        """Inline mode: render in the calling thread with this process's generators"""
+        with self._executor_lock:
+            if not _worker_generators:
+                _init_worker(self.template_dir)
+        return _run_job(job_name, args)
+
+    def wait(self, job: RenderJob, timeout: float = None):
+        """
+        Block until a job finishes and return its result
+
+        Raises:
+            RenderTimeout: When the job isn't done within ``timeout`` (default: pool timeout)
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        try:
+            result, _, _ = job.future.result(timeout=timeout)
+            return result
+        except FutureTimeoutError:
+            # A queued job is dropped; one already running finishes in its worker and is discarded
+            job.future.cancel()
+            with self._metrics_lock:
+                self.counters['timeouts'] += 1
+            raise RenderTimeout(f"PDF render {job.job_name} timed out after {timeout:.0f}s")
+        except BrokenProcessPool:
+            executor = self._executor
+            if executor is not None:
+                self._restart_executor(executor)
+            raise
+
+    def render(self, job_name: str, *args, timeout: float = None):
+        """submit() and wait() in one call"""
+        return self.wait(self.submit(job_name, *args), timeout=timeout)
+
+    def render_many(self, job_name: str, args_list: List[tuple], window: int = None,
+                    timeout: float = None, on_done: Callable[[int, object], None] = None) -> List:
+        """
+        Render many jobs of one kind while keeping at most ``window`` of them queued,
+        so a large batch doesn't crowd interactive renders out of the pool
+
+        Args:
+            job_name: Render job name (see submit)
+            args_list: One argument tuple per job
+            window: Jobs in flight at once (default: half the pool's queue)
+            timeout: Per-job wait (default: pool timeout)
+            on_done: Called as on_done(index, result_or_exception) as jobs finish
+
+        Returns:
+            List: Result or exception per job, in input order
+        """
+        window = window or max(1, self.max_pending // 2)
+        results: List = [None] * len(args_list)
+        pending = deque()
+
+        def collect():
+            index, job = pending.popleft()
+            try:
+                results[index] = self.wait(job, timeout=timeout)
+            except Exception as e:
+                results[index] = e
+            if on_done:
+                on_done(index, results[index])
+
+        for index, args in enumerate(args_list):
+            while len(pending) >= window:
+                collect()
+            deadline = time.monotonic() + (self.timeout_seconds if timeout is None else timeout)
+            while True:
+                try:
+                    pending.append((index, self.submit(job_name, *args)))
+                    break
+                except RenderPoolBusy as e:
+                    if pending:
+                        collect()
+                    elif time.monotonic() < deadline:
+                        # Other requests hold every slot; wait for one to free up
+                        time.sleep(0.05)
+                    else:
+                        results[index] = e
+                        if on_done:
+                            on_done(index, e)
+                        break
+        while pending:
+            collect()
+        return results
+
+    def _finish(self, job: Optional[RenderJob]):
+        self._slots.release()
+        with self._metrics_lock:
+            self._in_flight -= 1
+            if job is None:
+                return
+            future = job.future
+            if future.cancelled():
+                return
+            error = future.exception()
+            total_seconds = time.monotonic() - job.submitted_at
+            record = {
+                'job_id': job.job_id,
+                'job': job.job_name,
+                'status': 'failed' if error else 'completed',
+                'total_ms': round(total_seconds * 1000, 1)
+            }
+            if error:
+                self.counters['failed'] += 1
+                record['error'] = str(error)
+            else:
+                result, render_seconds, pid = future.result()
+                self.counters['completed'] += 1
+                record['render_ms'] = round(render_seconds * 1000, 1)
+                record['queue_ms'] = round(max(total_seconds - render_seconds, 0) * 1000, 1)
+                record['worker_pid'] = pid
+            self.history.append(record)
+
+    def stats(self) -> Dict:
+        with self._metrics_lock:
+            finished = [job for job in self.history if job['status'] == 'completed']
+            render_ms = sorted(job['render_ms'] for job in finished)
+            stats = dict(self.counters)
+            stats.update({
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'in_flight': self._in_flight,
+                'avg_render_ms': round(sum(render_ms) / len(render_ms), 1) if render_ms else 0.0,
+                'p95_render_ms': render_ms[min(len(render_ms) - 1, int(len(render_ms) * 0.95))] if render_ms else 0.0,
+                'avg_queue_ms': (round(sum(job['queue_ms'] for job in finished) / len(finished), 1)
+                                 if finished else 0.0),
+                'recent_jobs': list(self.history)[-10:]
+            })
+            return stats
+
+    def shutdown(self, wait: bool = True):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _default_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+# Shared instance (AIBA_PDF_RENDER_WORKERS=0 renders inline in the request thread)
+pdf_render_pool = PDFRenderPool(
+    max_workers=int(os.environ.get('AIBA_PDF_RENDER_WORKERS', str(_default_workers()))),
+    max_pending=int(os.environ.get('AIBA_PDF_RENDER_MAX_PENDING', '32')),
+    timeout_seconds=float(os.environ.get('AIBA_PDF_RENDER_TIMEOUT_SECONDS', '60'))
+)
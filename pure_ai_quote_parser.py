@@ -2,9 +2,21 @@ import openai
 import os
 import json
 from dotenv import load_dotenv
+from utils.extraction_cache import ExtractionCache
 
 load_dotenv()
 
+MODEL = "gpt-4"
+
+# Repeated enquiries (re-pastes, retries) are answered from cache instead of GPT-4.
+# Set AIBA_EXTRACTION_CACHE_DB to a file path to keep results across restarts.
+extraction_cache = ExtractionCache(
+    max_entries=int(os.getenv("AIBA_EXTRACTION_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("AIBA_EXTRACTION_CACHE_TTL", str(24 * 3600))),
+    db_path=os.getenv("AIBA_EXTRACTION_CACHE_DB") or None,
+    max_disk_entries=int(os.getenv("AIBA_EXTRACTION_CACHE_DISK_SIZE", "20000"))
+)
+
 def get_client():
     """Get OpenAI client with proper error handling."""
     api_key = os.getenv("OPENAI_API_KEY")
@@ -34,11 +46,17 @@ IMPORTANT: Do NOT include address, gstin, or email in missing_fields - these are
 ALWAYS include ALL calculated fields in your response.
 """
 
-def extract_quote_with_ai(user_input):
+def extract_quote_with_ai(user_input, use_cache=True):
+    cache_key = extraction_cache.make_key(user_input, MODEL, system_prompt)
+    if use_cache:
+        cached = extraction_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
     try:
         client = get_client()
         response = client.chat.completions.create(
-            model="gpt-4",
+            model=MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_input}
@@ -48,7 +66,13 @@ def extract_quote_with_ai(user_input):
         content = response.choices[0].message.content
         if content is None:
             return None
-        return json.loads(content)
+        result = json.loads(content)
+        extraction_cache.set(cache_key, result)
+        return result
     except Exception as e:
         print("AI failed:", e)
-        return None 
\ No newline at end of file
+        return None
+
+def get_extraction_cache_stats():
+    """Get hit/miss counters for the extraction cache."""
+    return extraction_cache.stats()
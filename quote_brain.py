@@ -8,10 +8,16 @@ from dotenv import load_dotenv
 import os
 import json
 import re
+import threading
 from typing import Dict, Optional, List
 from datetime import datetime
 from openai import OpenAI
 from pure_ai_quote_parser import extract_quote_with_ai
+from utils.ttl_cache import TTLCache
+from utils.intent_classifier import intent_classifier
+from utils.prompt_parser import PromptParser
+from utils.quote_utils import parse_quote_locally
+from utils.line_items import LineItems
 
 # ✅ Load environment variables from .env file
 load_dotenv()
@@ -22,10 +28,16 @@ class QuoteDraftState:
     """
     
     def __init__(self):
+        # Serializes turns for one session when workers are multi-threaded
+        self.lock = threading.RLock()
         self.reset()
     
     def reset(self):
         """Reset to initial state"""
+        # Which terms field the chat flow is currently asking for (e.g. 'terms_loading')
+        self.asking_field = None
+        # (enriched items, LineItems) from the last enrich_items, reused by recalculate_totals
+        self._line_items = None
         self.state = {
             "customer_name": None,
             "material": None,
@@ -182,65 +194,22 @@ class QuoteDraftState:
         """
         Enrich items with correct steel weight calculations and amounts
         """
-        import re
+        # Weights and amounts for all items in one batch; plate dimensions
+        # come from the descriptions, e.g. "10x1500x3000 - 2 Nos", "4 nos 10x1250x6300"
+        line_items = LineItems.from_items(items, parse_descriptions=True)
+        weights, amounts = line_items.weights, line_items.amounts
         
         enriched_items = []
-        for item in items:
-            try:
-                # Make a copy of the item
-                enriched_item = item.copy()
-                
-                # Look for steel plate dimensions in description
-                # Patterns: "10x1500x3000 - 2 Nos", "12x1250×2500 – 4 Nos", etc.
-                desc = item.get("description", "")
-                
-                # Try multiple patterns for steel dimensions
-                patterns = [
-                    r"(\d+)[x×](\d+)[x×](\d+).*?(\d+)\s*Nos",  # "10x1500x3000 - 2 Nos"
-                    r"(\d+)mm\s*[x×]\s*(\d+)\s*[x×]\s*(\d+).*?(\d+)\s*Nos",  # "10mm x 1500 x 3000 - 2 Nos"
-                    r"(\d+)\s*[x×]\s*(\d+)\s*[x×]\s*(\d+).*?(\d+)\s*(?:nos|pcs|plates?)",  # More flexible
-                ]
-                
-                match = None
-                for pattern in patterns:
-                    match = re.search(pattern, desc, re.IGNORECASE)
-                    if match:
-                        break
-                
-                if match:
-                    thk = int(match.group(1))
-                    width = int(match.group(2))
-                    length = int(match.group(3))
-                    nos = int(match.group(4))
-
-                    # Calculate correct weight using steel formula
-                    weight = round((thk * width * length * 7.85 * nos) / 1_000_000, 2)
-                    
-                    # Get rate from item
-                    rate = float(item.get("rate", 0)) or float(item.get("rate_per_kg", 0))
-                    
-                    # Update item with correct values
-                    enriched_item["quantity"] = weight
-                    enriched_item["rate"] = rate
-                    enriched_item["amount"] = round(weight * rate, 2)
-                    
-                    print(f"✅ Enriched: {desc} -> {weight} kg @ ₹{rate}/kg = ₹{enriched_item['amount']}")
-                else:
-                    # No steel dimensions found, use original values
-                    quantity = float(item.get("quantity", 0)) or float(item.get("quantity_kg", 0))
-                    rate = float(item.get("rate", 0)) or float(item.get("rate_per_kg", 0))
-                    
-                    enriched_item["quantity"] = quantity
-                    enriched_item["rate"] = rate
-                    enriched_item["amount"] = round(quantity * rate, 2)
-                
-                enriched_items.append(enriched_item)
-                
-            except Exception as e:
-                print(f"⚠️ Error enriching item {item}: {e}")
-                # Keep original item if enrichment fails
-                enriched_items.append(item)
-        
+        for index, item in enumerate(items):
+            enriched_item = item.copy()
+            # Plates are weighed from their dimensions; other items keep their quantity
+            enriched_item["quantity"] = weights[index] if line_items.has_dims[index] else line_items.quantity[index]
+            enriched_item["rate"] = line_items.rate[index]
+            enriched_item["amount"] = amounts[index]
+            enriched_items.append(enriched_item)
+        
+        print(f"✅ Enriched {len(enriched_items)} items ({sum(line_items.has_dims)} weighed from plate dimensions)")
+        self._line_items = (enriched_items, line_items)
         return enriched_items
     
     def recalculate_totals(self):
@@ -248,14 +217,16 @@ class QuoteDraftState:
         if not self.state.get('items'):
             return
         
-        # Calculate subtotal from all items
-        subtotal = sum(float(item.get('amount', 0)) for item in self.state['items'])
-        
-        # Calculate GST (18%)
-        gst = round(subtotal * 0.18, 2)
+        # Reuse the batch computed by enrich_items while its items are current
+        items = self.state['items']
+        if self._line_items and self._line_items[0] is items:
+            line_items = self._line_items[1]
+        else:
+            line_items = LineItems.from_items(items)
         
-        # Calculate grand total
-        grand_total = round(subtotal + gst, 2)
+        # Subtotal, GST (18%) and grand total, rounded to the paisa
+        totals = line_items.totals(gst_rate=18)
+        subtotal, gst, grand_total = totals['subtotal'], totals['gst'], totals['grand_total']
         
         # Update state
         self.state['subtotal'] = subtotal
@@ -355,11 +326,114 @@ class QuoteDraftState:
         
         return summary
 
+    def to_dict(self) -> Dict:
+        """Snapshot of the draft for a backing store"""
+        return {
+            'state': json.loads(json.dumps(self.state, default=str)),
+            'asking_field': self.asking_field
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuoteDraftState':
+        """Rebuild a draft from a ``to_dict`` snapshot"""
+        draft = cls()
+        if data:
+            draft.state.update(data.get('state') or {})
+            draft.asking_field = data.get('asking_field')
+        return draft
+
+
+class DraftStore:
+    """
+    Backing store interface for QuoteDraftRegistry.
+    The default keeps nothing, so evicted drafts simply start over;
+    subclass it to spill drafts to Firestore, Redis, etc.
+    """
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        """Return a ``QuoteDraftState.to_dict`` snapshot or None"""
+        return None
+
+    def save(self, session_id: str, snapshot: Dict):
+        """Persist a snapshot of a draft that is leaving memory"""
+        pass
+
+    def delete(self, session_id: str):
+        """Forget a session's draft"""
+        pass
+
+
+class QuoteDraftRegistry:
+    """
+    Session-keyed QuoteDraftState registry - replaces the process-wide singleton.
+    Live drafts sit in a bounded LRU with TTL eviction; evicted drafts are
+    handed to the backing store and rehydrated on the next request.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: Optional[float] = 3600,
+                 store: Optional[DraftStore] = None):
+        self.store = store or DraftStore()
+        self._drafts = TTLCache(
+            max_entries=max_sessions,
+            ttl_seconds=ttl_seconds,
+            on_evict=self._spill
+        )
+        self._lock = threading.Lock()
+
+    def _spill(self, session_id: str, draft: QuoteDraftState):
+        """Write an evicted draft to the backing store"""
+        if draft.state.get('status') != 'empty':
+            self.store.save(session_id, draft.to_dict())
+
+    def get(self, session_id: str = 'default') -> QuoteDraftState:
+        """Get (or create) the draft for a session"""
+        session_id = session_id or 'default'
+        draft = self._drafts.get(session_id)
+        if draft is not None:
+            return draft
+
+        # Creation is serialized so two threads never build rival drafts for one session
+        with self._lock:
+            draft = self._drafts.get(session_id)
+            if draft is None:
+                draft = QuoteDraftState.from_dict(self.store.load(session_id))
+                self._drafts.set(session_id, draft)
+        return draft
+
+    def touch(self, session_id: str = 'default'):
+        """Refresh a session's TTL after a turn updated its draft"""
+        self._drafts.touch(session_id or 'default')
+
+    def discard(self, session_id: str = 'default'):
+        """Drop a session's draft from memory and the backing store"""
+        session_id = session_id or 'default'
+        self._drafts.pop(session_id)
+        self.store.delete(session_id)
+
+    def cleanup_expired(self) -> int:
+        """Evict drafts idle for longer than the TTL"""
+        return self._drafts.purge_expired()
+
+    def __len__(self) -> int:
+        return len(self._drafts)
+
+    def get_stats(self) -> Dict:
+        """Get registry statistics"""
+        return self._drafts.stats()
+
 
 class QuoteBrain:
+    # Local parser results at or above this confidence skip the GPT-4 call
+    LOCAL_CONFIDENCE_THRESHOLD = 1.0
+    
     def __init__(self):
         """Initialize the AI-powered quote brain."""
         self.client = None  # Lazy load when needed
+        self.prompt_parser = PromptParser()
+        
+        # Last extraction per worker thread, so intent detection and field
+        # extraction in the same chat turn share one model call
+        self._turn = threading.local()
         
         # Steel industry knowledge for validation
         self.steel_weights = {
@@ -467,8 +541,47 @@ IMPORTANT:
 
     def extract_quote_fields(self, user_input: str, conversation_context: str = "") -> Dict:
         """
-        ✅ PURE AI EXTRACTION - Replace all rule-based parsing with GPT-4
+        ✅ TIERED EXTRACTION - deterministic local parser first, GPT-4 only
+        when the local result is incomplete
+        """
+        # Reuse this turn's extraction if intent detection already ran it
+        previous = getattr(self._turn, 'extraction', None)
+        if previous and previous[0] == user_input:
+            return previous[1]
+        
+        result = self._extract_locally(user_input) or self._extract_with_ai(user_input)
+        # Failed extractions are not remembered so a retry calls the model again
+        self._turn.extraction = (user_input, result) if result.get('success') else None
+        return result
+
+    def begin_turn(self):
+        """Forget the previous turn's extraction on this worker thread."""
+        self._turn.extraction = None
+
+    def _extract_locally(self, user_input: str) -> Optional[Dict]:
+        """
+        Tier 1: parse structured steel enquiries ("10x1250x6300 - 4nos @84")
+        without network I/O. Returns None unless every item has dimensions,
+        quantity and rate, a real customer name was found and the prompt
+        mentions no terms (transport, payment, GST) left for the AI to extract.
         """
+        try:
+            local_result = parse_quote_locally(user_input, self.prompt_parser)
+        except Exception as e:
+            print(f"⚠️ Local parser failed, escalating to AI: {e}")
+            return None
+        
+        if not local_result or local_result['confidence'] < self.LOCAL_CONFIDENCE_THRESHOLD:
+            return None
+        
+        local_result.update({
+            'original_input': user_input,
+            'timestamp': self._get_timestamp()
+        })
+        return local_result
+
+    def _extract_with_ai(self, user_input: str) -> Dict:
+        """Run the GPT-4 extraction and wrap it with metadata."""
         # Try pure AI extraction first
         ai_result = extract_quote_with_ai(user_input)
         if ai_result:
@@ -498,16 +611,25 @@ IMPORTANT:
 
     # ❌ REMOVED: _validate_and_enhance() and _fallback_extraction() - Pure AI handles all validation
 
-    def detect_intent(self, user_input: str) -> str:
+    def detect_intent(self, user_input: str, ai_result: Optional[Dict] = None) -> str:
         """
-        ✅ PURE AI INTENT DETECTION - Using GPT-4 for smarter intent understanding
+        ✅ LOCAL-FIRST INTENT DETECTION
+        Keyword/regex scoring settles obvious messages without a model call;
+        ambiguous ones reuse (or run) this turn's AI extraction.
         """
-        # Use the pure AI parser to detect intent
-        ai_result = extract_quote_with_ai(user_input)
+        intent, scores = intent_classifier.classify(user_input)
+        if intent:
+            return intent
         
-        if ai_result and ai_result.get('customer_name'):
+        # Ambiguous - fall back to the extraction, which the turn needs anyway
+        if ai_result is None:
+            ai_result = self.extract_quote_fields(user_input)
+        
+        if ai_result and ai_result.get('success') and ai_result.get('customer_name'):
             return 'quotation'
-        elif 'hello' in user_input.lower() or 'hi' in user_input.lower():
+        elif scores['purchase_order'] > scores['quotation']:
+            return 'purchase_order'
+        elif scores['greeting']:
             return 'greeting'
         else:
             return 'general'
@@ -519,18 +641,25 @@ IMPORTANT:
 
 # Global instances for easy import
 quote_brain = QuoteBrain()
-quote_draft_state = QuoteDraftState()
+quote_draft_registry = QuoteDraftRegistry(
+    max_sessions=int(os.getenv('QUOTE_DRAFT_MAX_SESSIONS', '1000')),
+    ttl_seconds=float(os.getenv('QUOTE_DRAFT_TTL_SECONDS', '3600'))
+)
+
+def get_quote_draft(session_id: str = 'default') -> QuoteDraftState:
+    """Resolve the quote draft for a chat session."""
+    return quote_draft_registry.get(session_id)
 
 # Convenience functions for backward compatibility
 def extract_quote_fields(user_input: str, context: str = "") -> Dict:
     """Main extraction function."""
     return quote_brain.extract_quote_fields(user_input, context)
 
-def detect_intent(user_input: str) -> str:
+def detect_intent(user_input: str, ai_result: Optional[Dict] = None) -> str:
     """Detect user intent."""
-    return quote_brain.detect_intent(user_input)
+    return quote_brain.detect_intent(user_input, ai_result)
 
-def update_quote_draft(user_input: str, context: str = "") -> Dict:
+def update_quote_draft(user_input: str, context: str = "", session_id: str = 'default') -> Dict:
     """
     Phase 2: Update quote draft state from user input
     Returns current state and next action
@@ -538,15 +667,18 @@ def update_quote_draft(user_input: str, context: str = "") -> Dict:
     # Extract data from user input
     ai_data = extract_quote_fields(user_input, context)
     
-    # Update the global state
-    quote_draft_state.update_from_ai_extraction(ai_data)
-    
-    # Return current state and suggested next action
-    return {
-        'state': quote_draft_state.state,
-        'summary': quote_draft_state.get_summary(),
-        'missing_fields': quote_draft_state.get_missing_customer_fields(),
-        'ready_for_pdf': quote_draft_state.is_ready_for_pdf(),
-        'pdf_format': quote_draft_state.to_pdf_format() if quote_draft_state.is_ready_for_pdf() else None,
-        'ai_data': ai_data
-    } 
\ No newline at end of file
+    # Update the session's draft
+    draft = get_quote_draft(session_id)
+    with draft.lock:
+        draft.update_from_ai_extraction(ai_data)
+        ready = draft.is_ready_for_pdf()
+        
+        # Return current state and suggested next action
+        return {
+            'state': draft.state,
+            'summary': draft.get_summary(),
+            'missing_fields': draft.get_missing_customer_fields(),
+            'ready_for_pdf': ready,
+            'pdf_format': draft.to_pdf_format() if ready else None,
+            'ai_data': ai_data
+        } 
\ No newline at end of file
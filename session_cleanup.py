@@ -0,0 +1,88 @@
+"""
+Session Cleanup Job for AIBA
+Removes idle chat sessions off the request path: either on a background
+thread inside the app (AIBA_SESSION_CLEANUP_INTERVAL_SECONDS) or as a
+standalone run from cron / Cloud Scheduler:
+
+    python session_cleanup.py --hours 24
+    python session_cleanup.py --hours 24 --interval 3600
+"""
+
+import argparse
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SessionCleanupScheduler:
+    """Runs ChatMemory.cleanup_old_sessions periodically on a daemon thread"""
+
+    def __init__(self, memory, hours: int = 24, interval_seconds: float = 3600,
+                 page_size: int = 500, max_workers: int = 4):
+        """
+        Args:
+            memory: ChatMemoryFirestore (or anything with cleanup_old_sessions and fs)
+            hours: Idle age after which sessions are deleted
+            interval_seconds: Time between cleanup runs
+            page_size: Sessions per WriteBatch (max 500)
+            max_workers: Batches committed concurrently
+        """
+        self.memory = memory
+        self.hours = hours
+        self.interval_seconds = interval_seconds
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> Optional[Dict]:
+        """Clean in-memory and Firestore sessions once; returns the run's throughput report"""
+        self.memory.cleanup_old_sessions(self.hours, page_size=self.page_size, max_workers=self.max_workers)
+        self.runs += 1
+        return self.memory.fs.last_session_cleanup
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.wait(self.interval_seconds):
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"⚠️ Session cleanup failed: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name='session-cleanup', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Delete idle AIBA chat sessions from Firestore')
+    parser.add_argument('--hours', type=int, default=24, help='Idle age in hours (default: 24)')
+    parser.add_argument('--page-size', type=int, default=500, help='Sessions per batch (max 500)')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent batch commits')
+    parser.add_argument('--interval', type=float, default=0,
+                        help='Repeat every N seconds (default: run once and exit)')
+    args = parser.parse_args()
+
+    from firestore_service import firestore_service
+
+    while True:
+        deleted = firestore_service.cleanup_old_sessions(
+            args.hours, page_size=args.page_size, max_workers=args.workers
+        )
+        report = firestore_service.last_session_cleanup or {}
+        print(f"✅ Removed {deleted} sessions older than {args.hours}h "
+              f"in {report.get('seconds', 0)}s ({report.get('sessions_per_second', 0)}/s)")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,79 +5,127 @@ Modern styling with ReportLab for Windows compatibility
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.platypus.flowables import HRFlowable
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+from reportlab.platypus.flowables import Flowable, HRFlowable
 from reportlab.graphics.shapes import Drawing, Rect
 from reportlab.graphics import renderPDF
 from datetime import datetime, timedelta
+from io import BytesIO
 import os
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from .line_items import LineItems
+from .reportlab_styles import BASE_STYLES, PARAGRAPH_STYLES, TABLE_STYLES
+
+# Items table cells: 12pt leading per text line plus 8pt top and bottom padding
+ITEM_LINE_HEIGHT = 12
+ITEM_ROW_PADDING = 16
+
+
+def _row_height(row: List) -> float:
+    lines = max(str(cell).count('\n') + 1 for cell in row)
+    return lines * ITEM_LINE_HEIGHT + ITEM_ROW_PADDING
+
+
+class PagedItemsTable(Flowable):
+    """
+    Items table laid out one page at a time. Each split emits a Table holding
+    just the rows that fit, with the header row repeated, so layout work grows
+    linearly with the item count instead of re-splitting one huge Table.
+    The summary rows always stay on the page with the last item.
+    """
+    
+    def __init__(self, header: List, rows: List[List], summary_rows: List[List], col_widths: List[float],
+                 row_heights: List[float] = None):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.summary_rows = summary_rows
+        self.col_widths = col_widths
+        self.row_heights = row_heights if row_heights is not None else [_row_height(row) for row in rows]
+        self.header_height = _row_height(header)
+        self.summary_height = sum(_row_height(row) for row in summary_rows)
+    
+    def _table(self, rows: List[List], row_heights: List[float], final: bool) -> Table:
+        table_rows = [self.header] + rows
+        heights = [self.header_height] + row_heights
+        if final:
+            table_rows += self.summary_rows
+            heights += [_row_height(row) for row in self.summary_rows]
+        table = Table(table_rows, colWidths=self.col_widths, rowHeights=heights, repeatRows=1)
+        table.setStyle(TABLE_STYLES['proforma_items'] if final else TABLE_STYLES['proforma_items_page'])
+        return table
+    
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(self.col_widths)
+        self.height = self.header_height + sum(self.row_heights) + self.summary_height
+        return self.width, self.height
+    
+    def split(self, availWidth, availHeight):
+        # Rows that fit below the header on this page
+        room = availHeight - self.header_height
+        fit = 0
+        for height in self.row_heights:
+            if height > room:
+                break
+            room -= height
+            fit += 1
+        
+        if fit == len(self.rows) and room >= self.summary_height:
+            return [self._table(self.rows, self.row_heights, final=True)]
+        if fit == len(self.rows):
+            # Carry the last item over so the totals don't start a page on their own
+            fit -= 1
+        if fit < 1:
+            return []
+        
+        return [
+            self._table(self.rows[:fit], self.row_heights[:fit], final=False),
+            PagedItemsTable(self.header, self.rows[fit:], self.summary_rows, self.col_widths,
+                            self.row_heights[fit:])
+        ]
+    
+    def draw(self):
+        table = self._table(self.rows, self.row_heights, final=True)
+        table.wrapOn(self.canv, self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
+
 
 class EnhancedReportLabGenerator:
     def __init__(self):
         self.page_width, self.page_height = A4
         self.margin = 20*mm
-        self.styles = getSampleStyleSheet()
-        
-        # Enhanced custom styles with modern colors
-        self.company_name_style = ParagraphStyle(
-            'CompanyName',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2c5282'),
-            spaceAfter=8,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        self.header_style = ParagraphStyle(
-            'ModernHeader',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#2d3748'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        )
-        
-        self.document_title_style = ParagraphStyle(
-            'DocumentTitle',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            textColor=colors.HexColor('#2d3748'),
-            spaceAfter=10,
-            alignment=TA_LEFT,
-            fontName='Helvetica-Bold'
-        )
-        
-        self.normal_style = ParagraphStyle(
-            'ModernNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#4a5568'),
-            spaceAfter=6,
-            fontName='Helvetica'
-        )
-        
-        self.meta_style = ParagraphStyle(
-            'MetaStyle',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#4a5568'),
-            alignment=TA_RIGHT,
-            fontName='Helvetica'
-        )
-        
-        self.customer_name_style = ParagraphStyle(
-            'CustomerName',
-            parent=self.styles['Normal'],
-            fontSize=16,
-            textColor=colors.HexColor('#1a202c'),
-            fontName='Helvetica-Bold',
-            spaceAfter=8
+        # Styles are built once per process and shared (see utils/reportlab_styles.py)
+        self.styles = BASE_STYLES
+        self.company_name_style = PARAGRAPH_STYLES['CompanyName']
+        self.header_style = PARAGRAPH_STYLES['ModernHeader']
+        self.document_title_style = PARAGRAPH_STYLES['DocumentTitle']
+        self.normal_style = PARAGRAPH_STYLES['ModernNormal']
+        self.meta_style = PARAGRAPH_STYLES['MetaStyle']
+        self.customer_name_style = PARAGRAPH_STYLES['CustomerName']
+    
+    def _build_pdf_bytes(self, story: List) -> bytes:
+        """Lay out a story into an in-memory A4 PDF"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=self.margin,
+            leftMargin=self.margin,
+            topMargin=self.margin,
+            bottomMargin=self.margin
         )
+        doc.build(story)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def save_pdf(output_filename: str, pdf_bytes: bytes, output_dir: str = 'data') -> str:
+        """Persist rendered PDF bytes and return the file path"""
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, output_filename)
+        with open(output_path, 'wb') as f:
+            f.write(pdf_bytes)
+        return output_path
     
     def generate_quotation_pdf(
         self,
@@ -88,35 +136,32 @@ class EnhancedReportLabGenerator:
         terms: dict = None,
         output_filename: str = None
     ) -> str:
-        """Generate professional quotation PDF with modern styling"""
+        """Generate professional quotation PDF with modern styling and save it under data/"""
+        output_filename, pdf_bytes = self.render_quotation_pdf(seller, buyer, bank, items, terms, output_filename)
+        self.save_pdf(output_filename, pdf_bytes)
+        return output_filename
+    
+    def render_quotation_pdf(
+        self,
+        seller: dict,
+        buyer: dict,
+        bank: dict,
+        items: list,
+        terms: dict = None,
+        output_filename: str = None
+    ) -> Tuple[str, bytes]:
+        """Render a quotation PDF in memory; returns (suggested filename, PDF bytes)"""
         
         if not output_filename:
             date_str = datetime.now().strftime('%Y%m%d')
             customer_name = buyer['name'].replace(' ', '_').replace('/', '_')
             output_filename = f"Quotation_{customer_name}_{date_str}.pdf"
         
-        output_path = os.path.join('data', output_filename)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=A4,
-            rightMargin=self.margin,
-            leftMargin=self.margin,
-            topMargin=self.margin,
-            bottomMargin=self.margin
-        )
-        
         # Build content with proforma invoice format
         story = []
         
         # Proforma invoice header
-        story.append(Paragraph("<b>PROFORMA INVOICE</b>", 
-                              ParagraphStyle('ProformaTitle',
-                                           parent=self.document_title_style,
-                                           fontSize=18,
-                                           alignment=TA_CENTER,
-                                           spaceAfter=30)))
+        story.append(Paragraph("<b>PROFORMA INVOICE</b>", PARAGRAPH_STYLES['ProformaTitle']))
         
         # From section
         story.append(Paragraph("<b>From:</b>", self.header_style))
@@ -146,9 +191,7 @@ class EnhancedReportLabGenerator:
         story.append(Paragraph(bank_text, self.normal_style))
         
         # Generate PDF
-        doc.build(story)
-        
-        return output_filename
+        return output_filename, self._build_pdf_bytes(story)
     
     def generate_purchase_order_pdf(
         self,
@@ -159,24 +202,29 @@ class EnhancedReportLabGenerator:
         reference: str = None,
         output_filename: str = None
     ) -> str:
-        """Generate professional purchase order PDF"""
+        """Generate professional purchase order PDF and save it under data/"""
+        output_filename, pdf_bytes = self.render_purchase_order_pdf(
+            seller, supplier, items, po_number, reference, output_filename
+        )
+        self.save_pdf(output_filename, pdf_bytes)
+        return output_filename
+    
+    def render_purchase_order_pdf(
+        self,
+        seller: dict,
+        supplier: dict,
+        items: list,
+        po_number: str = None,
+        reference: str = None,
+        output_filename: str = None
+    ) -> Tuple[str, bytes]:
+        """Render a purchase order PDF in memory; returns (suggested filename, PDF bytes)"""
         
         if not output_filename:
             date_str = datetime.now().strftime('%Y%m%d')
             po_num = po_number or f"AIBA-PO-{datetime.now().strftime('%Y%m%d%H%M')}"
             output_filename = f"PurchaseOrder_{po_num.replace('/', '_')}_{date_str}.pdf"
         
-        output_path = os.path.join('data', output_filename)
-        
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=A4,
-            rightMargin=self.margin,
-            leftMargin=self.margin,
-            topMargin=self.margin,
-            bottomMargin=self.margin
-        )
-        
         story = []
         
         # Header (green theme for PO)
@@ -202,9 +250,7 @@ class EnhancedReportLabGenerator:
         # Signature footer
         story.extend(self._build_signature_footer(seller))
         
-        doc.build(story)
-        
-        return output_filename
+        return output_filename, self._build_pdf_bytes(story)
     
     def _build_modern_header(self, seller: dict, color_theme: str = 'blue') -> List:
         """Build modern header with colored background effect"""
@@ -215,13 +261,7 @@ class EnhancedReportLabGenerator:
         elements.append(company_name)
         
         # Tagline
-        tagline = Paragraph("Professional Steel Solutions & Engineering Services", 
-                          ParagraphStyle('Tagline', 
-                                       parent=self.normal_style,
-                                       fontSize=12,
-                                       textColor=colors.HexColor('#718096'),
-                                       alignment=TA_CENTER,
-                                       spaceAfter=15))
+        tagline = Paragraph("Professional Steel Solutions & Engineering Services", PARAGRAPH_STYLES['Tagline'])
         elements.append(tagline)
         
         # Contact information in two columns
@@ -231,14 +271,7 @@ class EnhancedReportLabGenerator:
         ]
         
         contact_table = Table(contact_data, colWidths=[3.5*inch, 3.5*inch])
-        contact_table.setStyle(TableStyle([
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#4a5568')),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 5),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-        ]))
+        contact_table.setStyle(TABLE_STYLES['contact'])
         
         elements.append(contact_table)
         
@@ -268,11 +301,7 @@ class EnhancedReportLabGenerator:
         ]
         
         header_table = Table(header_data, colWidths=[4*inch, 3*inch])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ]))
+        header_table.setStyle(TABLE_STYLES['document_header'])
         
         elements.append(header_table)
         elements.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e2e8f0')))
@@ -285,26 +314,14 @@ class EnhancedReportLabGenerator:
         
         # Customer section with background color simulation
         customer_data = [
-            [Paragraph("Quotation Prepared For:", 
-                      ParagraphStyle('CustomerTitle', 
-                                   parent=self.normal_style,
-                                   fontSize=12,
-                                   textColor=colors.HexColor('#4a5568'),
-                                   fontName='Helvetica-Bold'))],
+            [Paragraph("Quotation Prepared For:", PARAGRAPH_STYLES['CustomerTitle'])],
             [Paragraph(buyer['name'], self.customer_name_style)],
             [Paragraph(buyer['address'], self.normal_style)],
             [Paragraph(f"Email: {buyer['email']} | GST: {buyer['gstin']}", self.normal_style)]
         ]
         
         customer_table = Table(customer_data, colWidths=[7*inch])
-        customer_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f7fafc')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
-        ]))
+        customer_table.setStyle(TABLE_STYLES['customer_card'])
         
         elements.append(customer_table)
         
@@ -316,100 +333,49 @@ class EnhancedReportLabGenerator:
         
         # Table headers matching proforma invoice format
         headers = ['S.No', 'Material Description (with Nos)', 'Qty (Kgs)', 'Rate (Rs/Kg)', 'Amount (Rs)']
-        table_data = [headers]
+        table_data = []
         
-        subtotal = 0
-        for i, item in enumerate(items, 1):
-            # Calculate weight and amount
-            if all(key in item for key in ['thk', 'w', 'l', 'nos']):
-                weight = round((item['thk'] * item['w'] * item['l'] * 7.85 * item['nos']) / 1_000_000, 2)
-                quantity_display = f"{weight:.2f}"
-            else:
-                weight = item.get('weight', item.get('quantity', 0))
-                quantity_display = f"{weight:.2f}"
-            
-            rate = item.get('rate', 0)
-            amount = round(float(weight) * float(rate), 2)
-            subtotal += amount
-            
+        # Weights, amounts and totals for all rows in one batch
+        line_items = LineItems.from_items(items)
+        weights, rates, amounts = line_items.weights, line_items.rates, line_items.amounts
+        for i, item in enumerate(items):
             table_data.append([
-                str(i),
+                str(i + 1),
                 item.get('desc', item.get('description', '')),
-                quantity_display,
-                f"{rate:.2f}",
-                f"{amount:,.2f}"
+                f"{weights[i]:.2f}",
+                f"{rates[i]:.2f}",
+                f"{amounts[i]:,.2f}"
             ])
         
         # Add summary rows
         gst_rate = 18
-        gst_amount = round(subtotal * (gst_rate / 100), 2)
-        grand_total = round(subtotal + gst_amount, 2)
+        totals = line_items.totals(gst_rate=gst_rate)
+        subtotal, gst_amount, grand_total = totals['subtotal'], totals['gst'], totals['grand_total']
         
-        table_data.extend([
+        summary_rows = [
             ['', '', '', 'Subtotal', f"{subtotal:,.2f}"],
             ['', '', '', f'GST @{gst_rate}%', f"{gst_amount:,.2f}"],
             ['', '', '', 'Grand Total', f"{grand_total:,.2f}"]
-        ])
-        
-        # Create table with clean styling
-        items_table = Table(table_data, colWidths=[0.6*inch, 2.8*inch, 1*inch, 1*inch, 1.3*inch])
-        
-        # Clean proforma invoice table styling
-        items_table.setStyle(TableStyle([
-            # Header row - light gray background
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            
-            # Data rows
-            ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -4), 9),
-            ('ALIGN', (0, 1), (0, -4), 'CENTER'),  # S.No
-            ('ALIGN', (1, 1), (1, -4), 'LEFT'),    # Description
-            ('ALIGN', (2, 1), (-1, -4), 'RIGHT'),  # Qty, Rate, Amount
-            
-            # Summary rows styling
-            ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, -3), (-1, -1), 10),
-            ('ALIGN', (3, -3), (-1, -1), 'RIGHT'),
-            ('ALIGN', (4, -3), (-1, -1), 'RIGHT'),
-            
-            # Grid - black borders like the image
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            
-            # Padding
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        
-        elements.append(items_table)
+        ]
+        
+        # Clean proforma invoice table, split page by page with the header repeated
+        elements.append(PagedItemsTable(
+            headers, table_data, summary_rows,
+            col_widths=[0.6*inch, 2.8*inch, 1*inch, 1*inch, 1.3*inch]
+        ))
         
         return elements
     
-    def _build_totals_section(self, items: list, terms: dict = None) -> List:
-        """Build totals section with modern styling"""
+    def _build_totals_section(self, items: list, terms: dict = None, line_items: LineItems = None) -> List:
+        """Build totals section with modern styling (pass ``line_items`` to reuse computed rows)"""
         elements = []
         
         # Calculate totals
-        subtotal = 0
-        for item in items:
-            if all(key in item for key in ['thk', 'w', 'l', 'nos']):
-                weight = round((item['thk'] * item['w'] * item['l'] * 7.85 * item['nos']) / 1_000_000, 2)
-            else:
-                weight = item.get('weight', item.get('quantity', 0))
-            
-            rate = item.get('rate', 0)
-            amount = round(float(weight) * float(rate), 2)
-            subtotal += amount
-        
         gst_rate = terms.get('gst_rate', 18) if terms else 18
-        gst_amount = round(subtotal * (gst_rate / 100), 2)
-        grand_total = round(subtotal + gst_amount, 2)
+        if line_items is None:
+            line_items = LineItems.from_items(items)
+        totals = line_items.totals(gst_rate=gst_rate)
+        subtotal, gst_amount, grand_total = totals['subtotal'], totals['gst'], totals['grand_total']
         
         # Totals table
         totals_data = [
@@ -419,29 +385,11 @@ class EnhancedReportLabGenerator:
         ]
         
         totals_table = Table(totals_data, colWidths=[1.5*inch, 1.5*inch])
-        totals_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -2), colors.HexColor('#f8fafc')),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#2c5282')),
-            ('TEXTCOLOR', (0, 0), (-1, -2), colors.HexColor('#4a5568')),
-            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -2), 12),
-            ('FONTSIZE', (0, -1), (-1, -1), 14),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        totals_table.setStyle(TABLE_STYLES['totals'])
         
         # Right align the totals table
         totals_wrapper = Table([[totals_table]], colWidths=[7*inch])
-        totals_wrapper.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        totals_wrapper.setStyle(TABLE_STYLES['right_wrapper'])
         
         elements.append(totals_wrapper)
         
@@ -467,23 +415,11 @@ class EnhancedReportLabGenerator:
         ]
         
         terms_text = '<br/>'.join(terms_list)
-        terms_para = Paragraph(terms_text, 
-                              ParagraphStyle('Terms',
-                                           parent=self.normal_style,
-                                           fontSize=10,
-                                           leftIndent=10,
-                                           bulletIndent=5))
+        terms_para = Paragraph(terms_text, PARAGRAPH_STYLES['Terms'])
         
         # Terms in a box
         terms_table = Table([[terms_para]], colWidths=[7*inch])
-        terms_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0fff4')),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#38a169')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-            ('TOPPADDING', (0, 0), (-1, -1), 15),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-        ]))
+        terms_table.setStyle(TABLE_STYLES['terms_box'])
         
         elements.append(terms_table)
         
@@ -510,18 +446,11 @@ _______________________<br/>
         
         footer_data = [
             [Paragraph(bank_details, self.normal_style),
-             Paragraph(signature_section, 
-                      ParagraphStyle('Signature',
-                                   parent=self.normal_style,
-                                   alignment=TA_CENTER))]
+             Paragraph(signature_section, PARAGRAPH_STYLES['Signature'])]
         ]
         
         footer_table = Table(footer_data, colWidths=[4*inch, 3*inch])
-        footer_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ]))
+        footer_table.setStyle(TABLE_STYLES['footer'])
         
         elements.append(footer_table)
         
@@ -546,9 +475,7 @@ _______________________<br/>
         ]
         
         header_table = Table(header_data, colWidths=[4*inch, 3*inch])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        header_table.setStyle(TABLE_STYLES['po_header'])
         
         elements.append(header_table)
         elements.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e2e8f0')))
@@ -560,25 +487,13 @@ _______________________<br/>
         elements = []
         
         supplier_data = [
-            [Paragraph("Purchase Order To:", 
-                      ParagraphStyle('SupplierTitle', 
-                                   parent=self.normal_style,
-                                   fontSize=12,
-                                   textColor=colors.HexColor('#4a5568'),
-                                   fontName='Helvetica-Bold'))],
+            [Paragraph("Purchase Order To:", PARAGRAPH_STYLES['SupplierTitle'])],
             [Paragraph(supplier['name'], self.customer_name_style)],
             [Paragraph(supplier.get('address', ''), self.normal_style)]
         ]
         
         supplier_table = Table(supplier_data, colWidths=[7*inch])
-        supplier_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0fff4')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#48bb78')),
-        ]))
+        supplier_table.setStyle(TABLE_STYLES['supplier_card'])
         
         elements.append(supplier_table)
         
@@ -606,28 +521,7 @@ _______________________<br/>
                 ])
         
         po_table = Table(table_data, colWidths=[0.5*inch, 3*inch, 1*inch, 0.8*inch, 1.7*inch])
-        po_table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#48bb78')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            
-            # Data
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-            ('ALIGN', (1, 1), (-1, -1), 'LEFT'),
-            
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
+        po_table.setStyle(TABLE_STYLES['po_items'])
         
         elements.append(po_table)
         
@@ -649,21 +543,10 @@ _______________________<br/>
         ]
         
         terms_text = '<br/>'.join(terms_list)
-        terms_para = Paragraph(terms_text, 
-                              ParagraphStyle('POTerms',
-                                           parent=self.normal_style,
-                                           fontSize=10,
-                                           leftIndent=10))
+        terms_para = Paragraph(terms_text, PARAGRAPH_STYLES['POTerms'])
         
         terms_table = Table([[terms_para]], colWidths=[7*inch])
-        terms_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0fff4')),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#38a169')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-            ('TOPPADDING', (0, 0), (-1, -1), 15),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-        ]))
+        terms_table.setStyle(TABLE_STYLES['po_terms_box'])
         
         elements.append(terms_table)
         
@@ -681,14 +564,9 @@ _______________________<br/>
 <b>Authorized Signatory</b><br/>
 <i>{seller['name']}</i>"""
         
-        signature_table = Table([[Paragraph(signature, 
-                                           ParagraphStyle('POSignature',
-                                                        parent=self.normal_style,
-                                                        alignment=TA_CENTER))]], 
+        signature_table = Table([[Paragraph(signature, PARAGRAPH_STYLES['POSignature'])]],
                                colWidths=[7*inch])
-        signature_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ]))
+        signature_table.setStyle(TABLE_STYLES['signature'])
         
         elements.append(signature_table)
         
@@ -0,0 +1,181 @@
+"""
+Extraction Cache for AIBA
+Content-addressed cache for AI quote extraction results:
+an in-memory LRU in front of an optional on-disk SQLite tier
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import closing
+from typing import Dict, Optional
+
+from .ttl_cache import TTLCache
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Normalize an enquiry so trivially different pastes share a cache key.
+    Case is kept because customer names are echoed back in the result.
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    return ' '.join(text.split())
+
+
+class ExtractionCache:
+    """Two-tier (memory + SQLite) cache keyed by a hash of model, prompt and input"""
+
+    # Rows written between disk size-cap checks
+    PRUNE_EVERY = 50
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 24 * 3600,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 20000
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: In-memory LRU capacity
+            ttl_seconds: Age after which cached extractions are ignored (both tiers)
+            db_path: SQLite file for the persistent tier (None = memory only)
+            max_disk_entries: Row cap for the SQLite tier, oldest-accessed rows go first
+        """
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+        self._db_lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.stats_counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+        if self.db_path:
+            try:
+                self._init_db()
+            except Exception as e:
+                print(f"⚠️ Extraction cache disk tier disabled: {e}")
+                self.db_path = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection's own `with` only commits or rolls back, so callers also wrap it in closing()
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._db_lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extractions ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_access ON extractions(last_access)")
+
+    @staticmethod
+    def make_key(user_input: str, model: str = '', system_prompt: str = '') -> str:
+        """Content address for an extraction request"""
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, normalize_prompt(user_input)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a private copy of the cached extraction, or None"""
+        result = self.memory.get(key)
+        if result is not None:
+            self.stats_counters['memory_hits'] += 1
+            return copy.deepcopy(result)
+
+        result = self._disk_get(key)
+        if result is not None:
+            self.stats_counters['disk_hits'] += 1
+            self.memory.set(key, result)
+            return copy.deepcopy(result)
+
+        self.stats_counters['misses'] += 1
+        return None
+
+    def set(self, key: str, result: Dict):
+        """Cache a successful extraction"""
+        if not result:
+            return
+        stored = copy.deepcopy(result)
+        self.memory.set(key, stored)
+        self._disk_set(key, stored)
+        self.stats_counters['stores'] += 1
+
+    def _disk_get(self, key: str) -> Optional[Dict]:
+        if not self.db_path:
+            return None
+        try:
+            now = time.time()
+            with self._db_lock, closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT payload, created_at FROM extractions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (now, key))
+                return json.loads(row[0])
+        except Exception as e:
+            print(f"⚠️ Extraction cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, result: Dict):
+        if not self.db_path:
+            return
+        try:
+            now = time.time()
+            payload = json.dumps(result, ensure_ascii=False, default=str)
+            with self._db_lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO extractions (key, payload, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, payload, now, now)
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= self.PRUNE_EVERY:
+                    self._writes_since_prune = 0
+                    self._prune(conn, now)
+        except Exception as e:
+            print(f"⚠️ Extraction cache write failed: {e}")
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        """Apply TTL and the row cap to the SQLite tier"""
+        if self.ttl_seconds is not None:
+            conn.execute("DELETE FROM extractions WHERE created_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM extractions WHERE key IN ("
+            "SELECT key FROM extractions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    def clear(self):
+        """Empty both tiers"""
+        self.memory.clear()
+        if self.db_path:
+            with self._db_lock, closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM extractions")
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters for both tiers"""
+        counters = dict(self.stats_counters)
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        counters['hit_rate'] = round((lookups - counters['misses']) / lookups, 4) if lookups else 0.0
+        counters['memory'] = self.memory.stats()
+        counters['disk_enabled'] = bool(self.db_path)
+        return counters
@@ -0,0 +1,81 @@
+"""
+Local Intent Classifier for AIBA
+Keyword/regex scoring that settles obvious intents without an AI call
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+from .prompt_parser import PromptParser
+
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    """Compile a whole-word alternation, longest phrases first"""
+    phrases = sorted(set(keywords), key=len, reverse=True)
+    return re.compile(r'\b(?:' + '|'.join(re.escape(p) for p in phrases) + r')\b', re.IGNORECASE)
+
+
+class IntentClassifier:
+    """Scores quotation / purchase order / greeting signals in a message"""
+
+    # Signals that a message carries quotation data even without a keyword
+    STEEL_SIGNALS = [
+        re.compile(r'\d+(?:\.\d+)?\s*(?:mm)?\s*[x×]\s*\d+(?:\.\d+)?', re.IGNORECASE),    # 10x1250x6300
+        re.compile(r'@\s*(?:₹|rs\.?)?\s*\d+', re.IGNORECASE),                            # @84, @ ₹56
+        re.compile(r'₹\s*\d+(?:\.\d+)?\s*/\s*kg', re.IGNORECASE),                        # ₹56/kg
+        re.compile(r'\b\d+(?:\.\d+)?\s*(?:mt|tons?|tonnes?|kgs?|nos|pcs)\b', re.IGNORECASE),
+        re.compile(r'\b(?:ismc|ismb|isa|rsj|tmt|ms plate|hr plate|sail)\b', re.IGNORECASE),
+    ]
+
+    GREETING = re.compile(
+        r'^\s*(?:hi+|hello|hey|namaste|good\s+(?:morning|afternoon|evening)|thanks?|thank\s+you)\b',
+        re.IGNORECASE
+    )
+
+    # Minimum score (and lead over the other intent) before we trust the local result
+    CONFIDENT_SCORE = 2
+
+    def __init__(self, parser: Optional[PromptParser] = None):
+        parser = parser or PromptParser()
+        # 'order' alone is too common in quotation enquiries to count as a PO signal
+        po_keywords = [k for k in parser.po_keywords if k != 'order']
+        self.quotation_pattern = _keyword_pattern(parser.quotation_keywords)
+        self.po_pattern = _keyword_pattern(po_keywords)
+
+    def score(self, text: str) -> Dict[str, int]:
+        """Raw signal counts for each intent"""
+        text = text or ''
+        steel = sum(1 for pattern in self.STEEL_SIGNALS if pattern.search(text))
+        return {
+            'quotation': len(self.quotation_pattern.findall(text)) + steel,
+            'purchase_order': len(self.po_pattern.findall(text)) * 2,
+            'greeting': 1 if self.GREETING.search(text) else 0,
+            'steel': steel
+        }
+
+    def classify(self, text: str) -> Tuple[Optional[str], Dict[str, int]]:
+        """
+        Classify a message locally
+
+        Returns:
+            (intent, scores) where intent is 'quotation', 'purchase_order',
+            'greeting', 'general', or None when the message is ambiguous
+            and needs the AI extraction to decide
+        """
+        scores = self.score(text)
+        quote, po = scores['quotation'], scores['purchase_order']
+
+        if quote >= self.CONFIDENT_SCORE and quote >= po + self.CONFIDENT_SCORE:
+            return 'quotation', scores
+        if po >= self.CONFIDENT_SCORE and po >= quote + self.CONFIDENT_SCORE:
+            return 'purchase_order', scores
+        if scores['greeting'] and quote == 0 and po == 0:
+            return 'greeting', scores
+        if quote == 0 and po == 0 and len((text or '').split()) <= 4:
+            return 'general', scores
+
+        return None, scores
+
+
+# Shared instance - patterns are compiled once per process
+intent_classifier = IntentClassifier()
@@ -0,0 +1,247 @@
+"""
+Columnar Line Items for AIBA
+Quote line items held as one array per field (thickness, width, length,
+nos, quantity, rate) so weights, amounts and totals for a whole quote are
+computed in one batch - vectorised with NumPy when it is installed - and
+rounded exactly to the paisa, half up.
+
+    line_items = LineItems.from_items(items)
+    line_items.weights, line_items.amounts, line_items.totals(gst_rate=18)
+"""
+
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional
+
+from .steel_tokenizer import parse_steel_description
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIMENSION_KEYS = ('thk', 'w', 'l', 'nos')
+GST_RATE = 18
+
+_CENT = Decimal('0.01')
+# Plate weight in hundredths of a kg: thk x w x l x nos x 7.85 / 1,000,000 kg
+_DENSITY_CENTS = 785
+_MM3_PER_CENT = 1_000_000
+# Beyond these the integer fast path could overflow int64; such rows take the Decimal path
+_MAX_EXACT_VOLUME = 10 ** 15
+_MAX_EXACT_PRODUCT = 10 ** 18
+
+
+def _number(value) -> float:
+    if value.__class__ is float:
+        return value
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _first(item: Dict, keys: tuple) -> float:
+    """First non-zero numeric value among ``keys``"""
+    for key in keys:
+        value = item.get(key)
+        if not value:
+            continue
+        value = _number(value)
+        if value:
+            return value
+    return 0.0
+
+
+def _cents(value: float) -> Optional[int]:
+    """value x 100 as an int when value has at most two decimals, else None"""
+    if value >= 0 and round(value, 2) == value:
+        return round(value * 100)
+    return None
+
+
+class LineItems:
+    """Array-backed line items with batch weight, amount and total computation"""
+
+    def __init__(self):
+        self.thk = array('d')
+        self.w = array('d')
+        self.l = array('d')
+        self.nos = array('d')
+        self.quantity = array('d')
+        self.rate = array('d')
+        self.has_dims = array('b')
+        self._weight_cents = None
+        self._amount_paise = None
+
+    @classmethod
+    def from_items(cls, items: List[Dict], parse_descriptions: bool = False) -> 'LineItems':
+        """
+        Build the columns from item dicts
+
+        Plate rows carry thk/w/l/nos keys (or, with ``parse_descriptions``, plate
+        dimensions in their description) and are weighed with the steel formula;
+        other rows use their weight/quantity. Rates fall back to rate_per_kg.
+        """
+        thk, w, l, nos, quantity, rate, has_dims = [], [], [], [], [], [], []
+        for item in items:
+            dims = None
+            if 'thk' in item and 'w' in item and 'l' in item and 'nos' in item:
+                dims = (_number(item['thk']), _number(item['w']), _number(item['l']), _number(item['nos']))
+            elif parse_descriptions:
+                spec = parse_steel_description(item.get('description') or item.get('desc') or '')
+                if spec and spec['kind'] == 'plate' and spec['nos']:
+                    dims = (float(spec['thk']), float(spec['w']), float(spec['l']), float(spec['nos']))
+            if dims:
+                thk.append(dims[0])
+                w.append(dims[1])
+                l.append(dims[2])
+                nos.append(dims[3])
+                quantity.append(0.0)
+            else:
+                thk.append(0.0)
+                w.append(0.0)
+                l.append(0.0)
+                nos.append(0.0)
+                quantity.append(_first(item, ('weight', 'quantity', 'quantity_kg')))
+            rate.append(_first(item, ('rate', 'rate_per_kg')))
+            has_dims.append(1 if dims else 0)
+
+        line_items = cls()
+        line_items.thk.fromlist(thk)
+        line_items.w.fromlist(w)
+        line_items.l.fromlist(l)
+        line_items.nos.fromlist(nos)
+        line_items.quantity.fromlist(quantity)
+        line_items.rate.fromlist(rate)
+        line_items.has_dims.fromlist(has_dims)
+        return line_items
+
+    def append(self, dims: Optional[tuple], quantity: float, rate: float):
+        """Add a row; ``dims`` is (thk, w, l, nos) for plates, else None"""
+        thk, w, l, nos = dims or (0.0, 0.0, 0.0, 0.0)
+        self.thk.append(thk)
+        self.w.append(w)
+        self.l.append(l)
+        self.nos.append(nos)
+        self.quantity.append(quantity)
+        self.rate.append(rate)
+        self.has_dims.append(1 if dims else 0)
+        self._weight_cents = self._amount_paise = None
+
+    def __len__(self) -> int:
+        return len(self.rate)
+
+    # ---- batch computation --------------------------------------------
+
+    def _compute(self):
+        if self._amount_paise is not None:
+            return
+        if np is not None and len(self):
+            weights, amounts, exact = self._compute_numpy()
+        else:
+            weights, amounts, exact = self._compute_python()
+        for index, is_exact in enumerate(exact):
+            if not is_exact:
+                weights[index], amounts[index] = self._compute_decimal(index)
+        self._weight_cents = weights
+        self._amount_paise = amounts
+
+    def _compute_python(self):
+        weights, amounts, exact = array('q'), array('q'), []
+        # A quote has few distinct rates
+        rate_cents = {}
+        for thk, w, l, nos, quantity, rate, has_dims in zip(
+                self.thk, self.w, self.l, self.nos, self.quantity, self.rate, self.has_dims):
+            weight = rate_paise = None
+            if has_dims:
+                volume = thk * w * l * nos
+                if (0 <= volume < _MAX_EXACT_VOLUME and min(thk, w, l, nos) >= 0
+                        and thk.is_integer() and w.is_integer() and l.is_integer() and nos.is_integer()):
+                    # Whole millimetres below 2**53: the float product is exact
+                    weight = (int(volume) * _DENSITY_CENTS + _MM3_PER_CENT // 2) // _MM3_PER_CENT
+            else:
+                weight = _cents(quantity)
+            if weight is not None:
+                if rate not in rate_cents:
+                    rate_cents[rate] = _cents(rate)
+                rate_paise = rate_cents[rate]
+            if rate_paise is None or weight * rate_paise >= _MAX_EXACT_PRODUCT:
+                weights.append(0)
+                amounts.append(0)
+                exact.append(False)
+                continue
+            weights.append(weight)
+            amounts.append((weight * rate_paise + 50) // 100)
+            exact.append(True)
+        return weights, amounts, exact
+
+    def _compute_numpy(self):
+        thk, w, l, nos = (np.frombuffer(column, dtype=np.float64)
+                          for column in (self.thk, self.w, self.l, self.nos))
+        quantity = np.frombuffer(self.quantity, dtype=np.float64)
+        rate = np.frombuffer(self.rate, dtype=np.float64)
+        has_dims = np.frombuffer(self.has_dims, dtype=np.int8).astype(bool)
+
+        whole = np.ones(len(self), dtype=bool)
+        for column in (thk, w, l, nos):
+            whole &= (column >= 0) & (column == np.floor(column))
+        volume_f = thk * w * l * nos
+        plate_ok = has_dims & whole & (volume_f < _MAX_EXACT_VOLUME)
+        volume = np.where(plate_ok, volume_f, 0).astype(np.int64)
+        plate_weight = (volume * _DENSITY_CENTS + _MM3_PER_CENT // 2) // _MM3_PER_CENT
+
+        # Two-decimal values survive rounding to two decimals unchanged
+        quantity_ok = ~has_dims & (quantity >= 0) & (np.round(quantity, 2) == quantity)
+        rate_ok = (rate >= 0) & (np.round(rate, 2) == rate)
+        weight = np.where(has_dims, plate_weight, np.rint(np.where(quantity_ok, quantity, 0) * 100).astype(np.int64))
+        rate_paise = np.rint(np.where(rate_ok, rate, 0) * 100).astype(np.int64)
+
+        exact = (plate_ok | quantity_ok) & rate_ok & (weight.astype(np.float64) * rate_paise < _MAX_EXACT_PRODUCT)
+        amount = np.where(exact, (weight * rate_paise + 50) // 100, 0)
+        weight = np.where(exact, weight, 0)
+        return array('q', weight.tolist()), array('q', amount.tolist()), exact.tolist()
+
+    def _compute_decimal(self, index: int) -> tuple:
+        """Exact (weight cents, amount paise) for a row the integer paths can't take"""
+        if self.has_dims[index]:
+            volume = Decimal(1)
+            for column in (self.thk, self.w, self.l, self.nos):
+                volume *= Decimal(repr(column[index]))
+            weight = (volume * Decimal('7.85') / 1_000_000).quantize(_CENT, rounding=ROUND_HALF_UP)
+        else:
+            # Amounts use the quantity as given; only the displayed weight is rounded
+            weight = Decimal(repr(self.quantity[index]))
+        amount = (weight * Decimal(repr(self.rate[index]))).quantize(_CENT, rounding=ROUND_HALF_UP)
+        return int(weight.quantize(_CENT, rounding=ROUND_HALF_UP) * 100), int(amount * 100)
+
+    # ---- results --------------------------------------------------------
+
+    @property
+    def weights(self) -> List[float]:
+        """Weight (kg) per row, rounded to 0.01"""
+        self._compute()
+        return [cents / 100 for cents in self._weight_cents]
+
+    @property
+    def amounts(self) -> List[float]:
+        """Amount per row (weight x rate), rounded to the paisa"""
+        self._compute()
+        return [paise / 100 for paise in self._amount_paise]
+
+    @property
+    def rates(self) -> List[float]:
+        return list(self.rate)
+
+    def totals(self, gst_rate: float = GST_RATE) -> Dict:
+        """Total weight, subtotal, GST and grand total"""
+        self._compute()
+        subtotal = Decimal(sum(self._amount_paise)) / 100
+        gst = (subtotal * Decimal(repr(gst_rate)) / 100).quantize(_CENT, rounding=ROUND_HALF_UP)
+        return {
+            'total_weight': sum(self._weight_cents) / 100,
+            'subtotal': float(subtotal),
+            'gst_rate': gst_rate,
+            'gst': float(gst),
+            'grand_total': float(subtotal + gst)
+        }
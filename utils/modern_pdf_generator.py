@@ -9,6 +9,8 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List
 
+from .pdf_assets import asset_url_fetcher, local_font_faces_css
+
 class ModernPDFGenerator:
     def __init__(self):
         # Setup Jinja2 environment
@@ -26,16 +28,16 @@ class ModernPDFGenerator:
         
         # Load and render template
         template = self.env.get_template('quotation.html')
-        html_content = template.render(**template_data)
+        html_content = template.render(**template_data, font_faces_css=local_font_faces_css('Inter'))
         
         # Generate filename
         filename = self._generate_quotation_filename(quote_data)
         filepath = os.path.join('data', filename)
         
         # Create PDF
-        weasyprint.HTML(string=html_content).write_pdf(
+        weasyprint.HTML(string=html_content, url_fetcher=asset_url_fetcher).write_pdf(
             filepath,
-            stylesheets=[weasyprint.CSS(string=self._get_print_css())]
+            stylesheets=[weasyprint.CSS(string=self._get_print_css(), url_fetcher=asset_url_fetcher)]
         )
         
         return filename
@@ -47,16 +49,16 @@ class ModernPDFGenerator:
         
         # Load and render template
         template = self.env.get_template('purchase_order.html')
-        html_content = template.render(**template_data)
+        html_content = template.render(**template_data, font_faces_css=local_font_faces_css('Inter'))
         
         # Generate filename
         filename = self._generate_po_filename(po_data)
         filepath = os.path.join('data', filename)
         
         # Create PDF
-        weasyprint.HTML(string=html_content).write_pdf(
+        weasyprint.HTML(string=html_content, url_fetcher=asset_url_fetcher).write_pdf(
             filepath,
-            stylesheets=[weasyprint.CSS(string=self._get_print_css())]
+            stylesheets=[weasyprint.CSS(string=self._get_print_css(), url_fetcher=asset_url_fetcher)]
         )
         
         return filename
@@ -0,0 +1,119 @@
+"""
+PDF Assets for AIBA
+Offline font and image serving for WeasyPrint: bundled files are read once
+into an in-memory cache and served through a custom URL fetcher, and
+remote URLs are refused so renders never wait on the network
+"""
+
+import mimetypes
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# URL scheme used in stylesheets/templates for bundled assets, e.g. aiba-asset:fonts/Inter-Regular.woff2
+ASSET_SCHEME = 'aiba-asset:'
+
+ASSET_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+
+# Bundled Inter faces (static/fonts); only files that exist are declared
+INTER_FACES = [
+    (300, 'Inter-Light'),
+    (400, 'Inter-Regular'),
+    (500, 'Inter-Medium'),
+    (600, 'Inter-SemiBold'),
+    (700, 'Inter-Bold'),
+]
+
+FONT_EXTENSIONS = [('.woff2', 'woff2'), ('.woff', 'woff'), ('.ttf', 'truetype'), ('.otf', 'opentype')]
+
+
+class AssetCache:
+    """Bundled static files held in memory after first use"""
+
+    def __init__(self, root: str = ASSET_ROOT):
+        self.root = os.path.abspath(root)
+        self._assets: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, relative_path: str) -> Optional[str]:
+        path = os.path.abspath(os.path.join(self.root, relative_path.lstrip('/')))
+        # Never serve files outside the asset root
+        if os.path.commonpath([path, self.root]) != self.root:
+            return None
+        return path
+
+    def exists(self, relative_path: str) -> bool:
+        path = self._resolve(relative_path)
+        return bool(path) and os.path.isfile(path)
+
+    def get(self, relative_path: str) -> Optional[Tuple[bytes, str]]:
+        """(content, mime type) for a bundled asset, or None"""
+        asset = self._assets.get(relative_path)
+        if asset is not None:
+            return asset
+
+        path = self._resolve(relative_path)
+        if not path or not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            content = f.read()
+        mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if path.endswith('.woff2'):
+            mime_type = 'font/woff2'
+        with self._lock:
+            return self._assets.setdefault(relative_path, (content, mime_type))
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+
+asset_cache = AssetCache()
+
+
+def asset_url_fetcher(url: str, timeout: int = 10, ssl_context=None) -> Dict:
+    """
+    WeasyPrint url_fetcher: bundled assets from memory, data: URIs inline,
+    and nothing from the network
+    """
+    if url.startswith(ASSET_SCHEME):
+        relative_path = url[len(ASSET_SCHEME):]
+        asset = asset_cache.get(relative_path)
+        if asset is None:
+            raise ValueError(f"Bundled PDF asset not found: {relative_path}")
+        content, mime_type = asset
+        return {'string': content, 'mime_type': mime_type, 'redirected_url': url}
+
+    if url.startswith('data:'):
+        from weasyprint import default_url_fetcher
+        return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+
+    if url.startswith('file:'):
+        from urllib.parse import unquote, urlparse
+        path = os.path.abspath(unquote(urlparse(url).path))
+        if os.path.commonpath([path, asset_cache.root]) == asset_cache.root:
+            asset = asset_cache.get(os.path.relpath(path, asset_cache.root))
+            if asset is not None:
+                content, mime_type = asset
+                return {'string': content, 'mime_type': mime_type, 'redirected_url': url}
+
+    # Remote (or unknown) resources are skipped by WeasyPrint instead of stalling the render
+    raise ValueError(f"PDF rendering is offline; refusing to fetch {url}")
+
+
+def local_font_faces_css(family: str = 'Inter', faces: List[Tuple[int, str]] = None) -> str:
+    """@font-face rules for the bundled font files that are actually present"""
+    rules = []
+    for weight, stem in faces or INTER_FACES:
+        for extension, font_format in FONT_EXTENSIONS:
+            relative_path = f"fonts/{stem}{extension}"
+            if asset_cache.exists(relative_path):
+                rules.append(
+                    "@font-face {\n"
+                    f"    font-family: '{family}';\n"
+                    "    font-style: normal;\n"
+                    f"    font-weight: {weight};\n"
+                    f"    src: url('{ASSET_SCHEME}{relative_path}') format('{font_format}');\n"
+                    "}"
+                )
+                break
+    return "\n".join(rules)
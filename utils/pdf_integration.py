@@ -4,8 +4,8 @@ Bridge between existing AIBA data format and new Steel PDF Generator
 """
 
 from .simple_steel_generator import SimpleSteelPDFGenerator
-from typing import Dict, List
-import re
+from .steel_tokenizer import STANDARD_LENGTH_MM, kg_per_meter, parse_steel_description
+from typing import Dict, List, Tuple
 
 class AIBAPDFIntegration:
     def __init__(self):
@@ -22,6 +22,22 @@ class AIBAPDFIntegration:
         Returns:
             str: Generated PDF filename
         """
+        filename, _ = self.render_quotation_from_aiba_data(quote_data, user_profile, save_to_disk=True)
+        return filename
+    
+    def render_quotation_from_aiba_data(self, quote_data: Dict, user_profile: Dict = None,
+                                        save_to_disk: bool = False) -> Tuple[str, bytes]:
+        """
+        Convert AIBA quotation data to steel PDF format and render it in memory
+        
+        Args:
+            quote_data: AIBA format quotation data
+            user_profile: User's business profile information
+            save_to_disk: Also write the PDF under data/
+            
+        Returns:
+            Tuple of (PDF filename, PDF bytes)
+        """
         
         # Prepare seller info from user profile
         seller = self._prepare_seller_info(user_profile)
@@ -39,12 +55,13 @@ class AIBAPDFIntegration:
         terms = self._prepare_terms(quote_data)
         
         # Generate PDF
-        return self.steel_generator.generate_quotation_pdf(
+        return self.steel_generator.render_quotation_pdf(
             seller=seller,
             buyer=buyer,
             bank=bank,
             items=items,
-            terms=terms
+            terms=terms,
+            save_to_disk=save_to_disk
         )
     
     def create_po_from_aiba_data(self, po_data: Dict, user_profile: Dict = None) -> str:
@@ -58,6 +75,22 @@ class AIBAPDFIntegration:
         Returns:
             str: Generated PDF filename
         """
+        filename, _ = self.render_po_from_aiba_data(po_data, user_profile, save_to_disk=True)
+        return filename
+    
+    def render_po_from_aiba_data(self, po_data: Dict, user_profile: Dict = None,
+                                 save_to_disk: bool = False) -> Tuple[str, bytes]:
+        """
+        Convert AIBA PO data to steel PDF format and render it in memory
+        
+        Args:
+            po_data: AIBA format PO data
+            user_profile: User's business profile information
+            save_to_disk: Also write the PDF under data/
+            
+        Returns:
+            Tuple of (PDF filename, PDF bytes)
+        """
         
         # Prepare seller info from user profile
         seller = self._prepare_seller_info(user_profile)
@@ -79,12 +112,13 @@ class AIBAPDFIntegration:
             })
         
         # Generate PDF
-        return self.steel_generator.generate_purchase_order_pdf(
+        return self.steel_generator.render_purchase_order_pdf(
             seller=seller,
             supplier=supplier,
             items=items,
             po_number=po_data.get('po_number'),
-            reference=po_data.get('reference')
+            reference=po_data.get('reference'),
+            save_to_disk=save_to_disk
         )
     
     def _prepare_seller_info(self, user_profile: Dict = None) -> Dict:
@@ -167,52 +201,35 @@ class AIBAPDFIntegration:
         - "12mm x 1250mm x 2500mm - 2 Nos" 
         - "10mm x 2.5m x 6m - 4 pieces"
         - "ISMB 150 - 45 Nos" (will calculate based on standard weights)
+        - "ISA 50x50x6 - 10 nos", "32mm round - 5 pcs" (theoretical weight per metre)
         """
-        
-        # Pattern for plate/sheet dimensions (thickness x width x length)
-        plate_pattern = r'(\d+(?:\.\d+)?)\s*mm\s*x\s*(\d+(?:\.\d+)?)\s*(?:mm|m)\s*x\s*(\d+(?:\.\d+)?)\s*(?:mm|m).*?(\d+)\s*(?:nos|pcs|pieces)'
-        
-        match = re.search(plate_pattern, description.lower())
-        if match:
-            thickness = float(match.group(1))
-            width = float(match.group(2))
-            length = float(match.group(3))
-            nos = int(match.group(4))
-            
-            # Convert to mm if needed
-            if 'm' in match.group(0) and 'mm' not in match.group(0):
-                width = width * 1000 if width < 100 else width  # Assume meters if < 100
-                length = length * 1000 if length < 100 else length
-            
+        spec = parse_steel_description(description)
+        if not spec or not spec['nos']:
+            return None
+        nos = spec['nos']
+
+        if spec['kind'] == 'plate':
             return {
-                'thk': thickness,
-                'w': width,
-                'l': length,
+                'thk': float(spec['thk']),
+                'w': float(spec['w']),
+                'l': float(spec['l']),
                 'nos': nos
             }
-        
-        # Pattern for standard steel sections (ISMB, ISMC, etc.)
-        section_pattern = r'(ismb|ismc|isa|rsj)\s*(\d+).*?(\d+)\s*(?:nos|pcs|pieces)'
-        match = re.search(section_pattern, description.lower())
-        if match:
-            section_type = match.group(1)
-            size = int(match.group(2))
-            nos = int(match.group(3))
-            
-            # Standard length for sections (6 meters)
-            length = 6000  # mm
-            
+
+        # Sections, angles and rounds are priced on standard 6 m lengths
+        length = STANDARD_LENGTH_MM
+        if spec['kind'] == 'section':
             # Get standard weight per meter for the section
-            weight_per_meter = self._get_standard_section_weight(section_type, size)
-            
-            if weight_per_meter:
-                # Calculate equivalent plate dimensions for weight calculation
-                # Using a simplified approach: treat as a plate with equivalent weight
-                total_weight = weight_per_meter * (length / 1000) * nos
-                return {
-                    'weight': total_weight,
-                    'unit': 'kg'
-                }
+            weight_per_meter = self._get_standard_section_weight(spec['section'], spec['size'])
+        else:
+            weight_per_meter = kg_per_meter(spec)
+
+        if weight_per_meter:
+            total_weight = weight_per_meter * (length / 1000) * nos
+            return {
+                'weight': total_weight,
+                'unit': 'kg'
+            }
         
         return None
     
@@ -0,0 +1,156 @@
+"""
+PDF Render Cache for AIBA
+Process-level cache of compiled Jinja templates, pre-parsed WeasyPrint
+stylesheets and the shared font configuration, so steady-state renders
+only parse the per-document HTML
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from .pdf_assets import asset_cache, asset_url_fetcher
+
+# <style> blocks without Jinja syntax can be compiled once and reused for every render
+STYLE_BLOCK = re.compile(r'<style[^>]*>(.*?)</style>', re.IGNORECASE | re.DOTALL)
+JINJA_SYNTAX = re.compile(r'\{\{|\{%|\{#')
+# Author CSS that would be left in the document: linked sheets and !important declarations
+REMAINING_AUTHOR_CSS = re.compile(r'<link\b[^>]*stylesheet|!\s*important', re.IGNORECASE)
+
+
+class StyleExtractingLoader(FileSystemLoader):
+    """
+    FileSystemLoader that lifts static <style> blocks out of templates
+
+    Lifted CSS is passed to write_pdf as a (user-origin) stylesheet. That only
+    cascades exactly like the in-document blocks did when nothing else in the
+    template is author CSS that could compete with it: the only author rules
+    left are inline style="" attributes, which beat these rules either way.
+    A template with Jinja inside a <style> block, a linked stylesheet or an
+    !important declaration outside its <style> blocks is left untouched.
+    """
+
+    def __init__(self, searchpath: str):
+        super().__init__(searchpath)
+        self.styles: Dict[str, List[str]] = {}
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        styles = STYLE_BLOCK.findall(source)
+        remaining = STYLE_BLOCK.sub('', source)
+        if (styles and not any(JINJA_SYNTAX.search(css) for css in styles)
+                and not REMAINING_AUTHOR_CSS.search(remaining)):
+            source = remaining
+        else:
+            styles = []
+        self.styles[template] = styles
+        return source, filename, uptodate
+
+
+class PDFRenderCache:
+    """Shared WeasyPrint/Jinja state reused across PDF renders"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._environments: Dict[str, Environment] = {}
+        self._stylesheets: Dict[str, object] = {}
+        self._font_config = None
+        self.stylesheet_hits = 0
+        self.stylesheet_misses = 0
+        # Templates are read once per process unless explicitly asked to watch for edits
+        self.auto_reload = os.getenv('AIBA_PDF_TEMPLATE_AUTO_RELOAD', '0') == '1'
+
+    def environment(self, template_dir: str) -> Environment:
+        """Jinja environment (with compiled-template cache) for a template directory"""
+        with self._lock:
+            env = self._environments.get(template_dir)
+            if env is None:
+                env = Environment(
+                    loader=StyleExtractingLoader(template_dir),
+                    autoescape=select_autoescape(['html', 'xml']),
+                    auto_reload=self.auto_reload,
+                    cache_size=-1
+                )
+                self._environments[template_dir] = env
+            return env
+
+    def font_config(self):
+        """The process-wide WeasyPrint FontConfiguration"""
+        with self._lock:
+            if self._font_config is None:
+                from weasyprint.text.fonts import FontConfiguration
+                self._font_config = FontConfiguration()
+            return self._font_config
+
+    def stylesheet(self, css_text: str, url_fetcher=asset_url_fetcher):
+        """Parsed WeasyPrint CSS for ``css_text`` (parsed once per distinct stylesheet)"""
+        key = hashlib.sha1(css_text.encode('utf-8')).hexdigest()
+        with self._lock:
+            css = self._stylesheets.get(key)
+            if css is not None:
+                self.stylesheet_hits += 1
+                return css
+
+        from weasyprint import CSS
+        kwargs = {'string': css_text, 'font_config': self.font_config()}
+        if url_fetcher is not None:
+            kwargs['url_fetcher'] = url_fetcher
+        css = CSS(**kwargs)
+        with self._lock:
+            self.stylesheet_misses += 1
+            return self._stylesheets.setdefault(key, css)
+
+    def render_template(self, template_dir: str, template_name: str, data: Dict) -> tuple:
+        """Render a template to HTML; returns (html, pre-parsed stylesheets lifted from it)"""
+        env = self.environment(template_dir)
+        template = env.get_template(template_name)
+        html_content = template.render(**data)
+        styles = env.loader.styles.get(template_name, [])
+        return html_content, [self.stylesheet(css) for css in styles]
+
+    def write_pdf(self, html_content: str, stylesheets: Optional[List] = None,
+                  base_url: str = None, url_fetcher=asset_url_fetcher) -> bytes:
+        """Lay out HTML with cached stylesheets and fonts (assets served offline by default)"""
+        from weasyprint import HTML
+        html_kwargs = {'string': html_content, 'base_url': base_url}
+        if url_fetcher is not None:
+            html_kwargs['url_fetcher'] = url_fetcher
+        return HTML(**html_kwargs).write_pdf(
+            stylesheets=stylesheets or [],
+            font_config=self.font_config()
+        )
+
+    def warm_up(self, template_dir: str, template_names: List[str], extra_css: List[str] = None) -> bool:
+        """Compile templates, parse their stylesheets and load fonts before the first request"""
+        try:
+            env = self.environment(template_dir)
+            stylesheets = []
+            for name in template_names:
+                env.get_template(name)
+                stylesheets.extend(self.stylesheet(css) for css in env.loader.styles.get(name, []))
+            for css in extra_css or []:
+                stylesheets.append(self.stylesheet(css))
+            # A tiny layout loads Pango/fontconfig and the font faces the stylesheets use
+            self.write_pdf('<p>AIBA</p>', stylesheets=stylesheets)
+            return True
+        except Exception as e:
+            print(f"⚠️ PDF warm-up skipped: {e}")
+            return False
+
+    def stats(self) -> Dict:
+        return {
+            'environments': len(self._environments),
+            'stylesheets': len(self._stylesheets),
+            'stylesheet_hits': self.stylesheet_hits,
+            'stylesheet_misses': self.stylesheet_misses,
+            'font_config_loaded': self._font_config is not None,
+            'cached_assets': len(asset_cache)
+        }
+
+
+# Shared instance - one per process
+pdf_render_cache = PDFRenderCache()
@@ -0,0 +1,128 @@
+"""
+PDF Result Cache for AIBA
+Idempotent PDF generation: rendered bytes and the saved Firestore document
+id are cached under a canonical hash of the normalized template data, so
+generating the same document twice returns the first result
+"""
+
+import hashlib
+import json
+import os
+import threading
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional
+
+from .ttl_cache import TTLCache
+
+# Fields build_template_data derives from the clock at render time; they don't change what
+# the user asked for. Dropped from the top level of template_data only - a PO number or
+# delivery date the user supplied elsewhere in the key is part of the document.
+VOLATILE_FIELDS = {'quote_number', 'po_number', 'date', 'valid_until', 'delivery_date'}
+
+# Profile sections printed on every PDF (seller letterhead, GSTIN, bank details)
+PROFILE_FIELDS = ('business_info', 'bank_info')
+
+
+def _normalize(value: Any) -> Any:
+    """Canonical form: trimmed strings, numbers as fixed-point strings, sorted mappings"""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        try:
+            # 10, 10.0 and "10.00" must hash the same
+            return format(Decimal(str(value)).normalize(), 'f')
+        except InvalidOperation:
+            return str(value)
+    if isinstance(value, str):
+        text = ' '.join(value.split())
+        try:
+            return format(Decimal(text).normalize(), 'f')
+        except InvalidOperation:
+            return text
+    return str(value)
+
+
+class PDFResultCache:
+    """Size-bounded LRU of rendered PDFs and their saved document ids"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 128 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 3600):
+        """
+        Args:
+            max_entries: Most cached PDFs
+            max_bytes: Memory budget for cached PDF bytes
+            ttl_seconds: How long a result is reused (quote dates/numbers age with it)
+        """
+        self.entries = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            sizeof=lambda entry: len(entry['pdf_bytes'])
+        )
+        # One lock per key so a double-click renders and saves once
+        self._key_locks = TTLCache(max_entries=max(max_entries * 4, 1024), ttl_seconds=600)
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def make_key(user_id: str, document_type: str, template_data: Dict, template_version: str = '') -> str:
+        """Canonical hash of who, what and which template"""
+        canonical = json.dumps(
+            {
+                'user_id': user_id or '',
+                'document_type': document_type,
+                'template_version': template_version,
+                'data': _normalize({field: value for field, value in template_data.items()
+                                    if field not in VOLATILE_FIELDS})
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+            ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def lock_for(self, key: str) -> threading.Lock:
+        """Lock serializing generation of one document"""
+        with self._locks_guard:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._key_locks.set(key, lock)
+            return lock
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached {'filename', 'pdf_bytes', 'document_id'} for ``key``, or None"""
+        entry = self.entries.get(key)
+        return dict(entry) if entry is not None else None
+
+    def put(self, key: str, filename: str, pdf_bytes: bytes, document_id: str = None, user_id: str = None):
+        if not pdf_bytes:
+            return
+        self.entries.set(key, {'filename': filename, 'pdf_bytes': pdf_bytes,
+                               'document_id': document_id, 'user_id': user_id})
+
+    def forget_document(self, document_id: str):
+        """Drop results pointing at a deleted document"""
+        for key, entry in self.entries.items():
+            if entry.get('document_id') == document_id:
+                self.entries.pop(key)
+
+    def forget_user(self, user_id: str):
+        """Drop a user's results, e.g. after their business or bank details change"""
+        for key, entry in self.entries.items():
+            if entry.get('user_id') == user_id:
+                self.entries.pop(key)
+
+    def stats(self) -> Dict:
+        return self.entries.stats()
+
+
+# Shared instance
+pdf_result_cache = PDFResultCache(
+    max_entries=int(os.getenv('AIBA_PDF_CACHE_SIZE', '256')),
+    max_bytes=int(os.getenv('AIBA_PDF_CACHE_MAX_BYTES', str(128 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv('AIBA_PDF_CACHE_TTL_SECONDS', '3600'))
+)
@@ -125,6 +125,12 @@ class PromptParser:
         """
         return self._extract_items(text)
         
+    def extract_customer_name(self, text: str) -> Optional[str]:
+        """
+        Extract the customer name from a quotation request.
+        """
+        return self._extract_customer_name(text)
+        
     def extract_additional_terms(self, text: str) -> Dict:
         """
         Extract additional terms like GST, transport, payment from text.
@@ -6,6 +6,11 @@ Enhanced prompt parsing for complex steel quotations
 
 import re
 
+from .steel_tokenizer import find_count, find_plate_dimensions, find_rate, kg_per_meter, parse_steel_description
+
+# 'and', new lines and en dashes separate items in a free-text enquiry
+ITEM_SEPARATOR_PATTERN = re.compile(r'\s+and\s+|\n|–')
+
 def split_items_from_prompt(prompt):
     """
     Enhanced parser for complex steel quotation prompts
@@ -20,14 +25,14 @@ def split_items_from_prompt(prompt):
     items = []
 
     # Preprocess for splitting using 'and' and new lines as soft separators
-    parts = re.split(r'\s+and\s+|\n|–', prompt)
+    parts = ITEM_SEPARATOR_PATTERN.split(prompt)
 
     for part in parts:
-        # Find rate
-        rate_match = re.search(r'@ ?₹?(\d+)', part)
-        if not rate_match:
+        # One scan finds the shape, piece count and rate
+        spec = parse_steel_description(part)
+        if not spec or spec['rate'] is None or not spec['nos']:
             continue
-        rate = float(rate_match.group(1))
+        rate = float(spec['rate'])
 
         # Detect material grade
         grade = ""
@@ -45,31 +50,23 @@ def split_items_from_prompt(prompt):
         else:
             grade = "Steel Item"
 
-        # Match dimensions and quantity - try different patterns
-        # Pattern 1: "10x1250x6300- 4nos" or "10x1250x6300 - 4 nos"
-        match = re.search(r'(\d+)[x×](\d+)[x×](\d+)\s*-?\s*(\d+)\s*(?:nos|pcs|plates?)', part, re.IGNORECASE)
-        if not match:
-            # Pattern 2: "4nos 10x1250x6300" (quantity first)
-            match = re.search(r'(\d+)\s*(?:nos|pcs|plates?)\s*(\d+)[x×](\d+)[x×](\d+)', part, re.IGNORECASE)
-            if match:
-                nos = int(match.group(1))
-                thk = int(match.group(2))
-                width = int(match.group(3))
-                length = int(match.group(4))
-            else:
-                continue
+        # Dimensions and quantity in either order: "10x1250x6300- 4nos" or "4nos 10x1250x6300"
+        nos = spec['nos']
+        if spec['kind'] == 'plate':
+            thk, width, length = spec['thk'], spec['w'], spec['l']
+            # Calculate weight using steel formula: Weight (kg) = (Thickness × Width × Length × 7.85 × Nos) / 1,000,000
+            weight = round((thk * width * length * 7.85 * nos) / 1_000_000, 2)
+            size = f"{thk}x{width}x{length}"
+        elif spec['kind'] == 'angle':
+            # Angles come in standard 6 m lengths
+            weight = round(kg_per_meter(spec) * 6 * nos, 2)
+            size = f"{spec['leg_a']}x{spec['leg_b']}x{spec['thk']}"
         else:
-            thk = int(match.group(1))
-            width = int(match.group(2))
-            length = int(match.group(3))
-            nos = int(match.group(4))
-
-        # Calculate weight using steel formula: Weight (kg) = (Thickness × Width × Length × 7.85 × Nos) / 1,000,000
-        weight = round((thk * width * length * 7.85 * nos) / 1_000_000, 2)
+            continue
         amount = round(weight * rate, 2)
 
         # Format description with improved formatting
-        description = f"{grade} – {thk}x{width}x{length} – {nos} Nos"
+        description = f"{grade} – {size} – {nos} Nos"
 
         items.append({
             "description": description,
@@ -107,6 +104,114 @@ def enhanced_steel_parser(prompt):
     # Fallback to basic parsing if enhanced parser doesn't find items
     return None
 
+# Words that lead into a name ("to customer ABC") rather than being part of it
+NAME_LEAD_WORDS = {'customer', 'client', 'party', 'to', 'for'}
+
+# Captures made only of these are not a customer name ("quote ... to customer")
+GENERIC_NAME_WORDS = NAME_LEAD_WORDS | {
+    'buyer', 'the', 'a', 'an', 'me', 'us', 'our', 'my', 'him', 'her', 'them', 'you', 'sir', 'madam',
+    'please', 'quote', 'quotation', 'same', 'above', 'below', 'new', 'steel', 'plate', 'plates',
+    'item', 'items', 'rate', 'price', 'material'
+}
+
+# Terms the local parser doesn't extract; prompts mentioning them go to the AI extractor
+TERMS_KEYWORD_PATTERN = re.compile(
+    r'\b(?:transport\w*|freight|deliver\w*|pay\w*|advance|credit|loading|unloading|gst|igst|cgst|sgst)\b',
+    re.IGNORECASE
+)
+
+def clean_customer_name(name):
+    """
+    Tidy a regex-captured customer name
+    
+    Strips lead-in words ("customer ABC" -> "ABC") and rejects captures with
+    no real name token ("customer", "the party").
+    
+    Returns:
+        Cleaned name, or None if nothing name-like is left
+    """
+    if not name:
+        return None
+    words = name.strip(' :,-').split()
+    while words and words[0].lower().strip(':') in NAME_LEAD_WORDS:
+        words.pop(0)
+    if not any(len(word) > 1 and word.lower() not in GENERIC_NAME_WORDS and re.search(r'[A-Za-z]', word)
+               for word in words):
+        return None
+    return ' '.join(words)
+
+def score_local_extraction(prompt, result):
+    """
+    Score how completely the local parser understood a prompt
+    
+    Every plate in the prompt must have become an item with weight and rate,
+    a customer name must be present, and the prompt must not mention terms
+    (transport, payment, loading, GST) the local parser can't extract for
+    the result to be trusted.
+    
+    Returns:
+        Tuple of (confidence 0.0-1.0, list of missing field names)
+    """
+    missing = []
+    items = (result or {}).get('items') or []
+    
+    if not (result or {}).get('customer_name'):
+        missing.append('customer_name')
+    if not items:
+        missing.append('items')
+    else:
+        if len(items) < len(find_plate_dimensions(prompt)):
+            missing.append('items')
+        if not all(float(item.get('quantity') or 0) > 0 for item in items):
+            missing.append('quantity')
+        if not all(float(item.get('rate') or 0) > 0 for item in items):
+            missing.append('rate')
+    if TERMS_KEYWORD_PATTERN.search(prompt):
+        missing.append('terms')
+    
+    checks = 5  # customer, items, quantity, rate, terms
+    confidence = round((checks - len(set(missing))) / checks, 2)
+    return confidence, missing
+
+def parse_quote_locally(prompt, parser=None):
+    """
+    Deterministic fast-path extraction for structured steel enquiries
+    
+    Runs enhanced_steel_parser plus customer name detection and returns a
+    result in the same shape as the AI extractor, with a confidence score
+    so callers can decide whether to escalate to GPT-4.
+    
+    Args:
+        prompt: Raw enquiry text
+        parser: Optional PromptParser instance (for customer name detection)
+        
+    Returns:
+        Extraction dict, or None if no items could be parsed
+    """
+    parsed = enhanced_steel_parser(prompt)
+    if not parsed:
+        return None
+    
+    if parser is None:
+        from .prompt_parser import PromptParser
+        parser = PromptParser()
+    
+    result = {
+        'success': True,
+        'customer_name': clean_customer_name(parser.extract_customer_name(prompt)),
+        'items': parsed['items'],
+        'subtotal': parsed['subtotal'],
+        'gst_amount': parsed['gst_amount'],
+        'grand_total': parsed['grand_total'],
+        'missing_fields': [],
+        'extraction_method': 'local_parser'
+    }
+    
+    confidence, missing = score_local_extraction(prompt, result)
+    result['confidence'] = confidence
+    result['missing_fields'] = missing
+    return result
+
 def format_steel_description(thickness, width, length, nos, grade="Steel Item"):
     """
     Format steel item description in the improved format
@@ -152,10 +257,8 @@ def parse_dimensions(dimension_str):
     Returns:
         Tuple of (thickness, width, length) or None if not found
     """
-    match = re.search(r'(\d+)[x×](\d+)[x×](\d+)', dimension_str)
-    if match:
-        return int(match.group(1)), int(match.group(2)), int(match.group(3))
-    return None
+    plates = find_plate_dimensions(dimension_str)
+    return plates[0] if plates else None
 
 def parse_quantity(qty_str):
     """
@@ -167,10 +270,7 @@ def parse_quantity(qty_str):
     Returns:
         Integer quantity or None if not found
     """
-    match = re.search(r'(\d+)\s*(?:nos|pcs|plates?)', qty_str, re.IGNORECASE)
-    if match:
-        return int(match.group(1))
-    return None
+    return find_count(qty_str)
 
 def parse_rate(rate_str):
     """
@@ -182,7 +282,16 @@ def parse_rate(rate_str):
     Returns:
         Float rate or None if not found
     """
-    match = re.search(r'@ ?₹?(\d+(?:\.\d+)?)', rate_str)
-    if match:
-        return float(match.group(1))
-    return None 
\ No newline at end of file
+    return find_rate(rate_str)
+
+
+def summarize_items(items):
+    """Short summary of line items for document metadata"""
+    if not items:
+        return "No items"
+    
+    if len(items) == 1:
+        item = items[0]
+        return f"{item.get('description', 'Item')} ({item.get('quantity', 'N/A')} {item.get('unit', 'nos')})"
+    else:
+        return f"{len(items)} items: {', '.join([item.get('description', 'Item')[:20] + ('...' if len(item.get('description', '')) > 20 else '') for item in items[:3]])}"
@@ -0,0 +1,251 @@
+"""
+ReportLab Style Registry for AIBA
+Paragraph and table styles built once per process and shared by every
+EnhancedReportLabGenerator instance and document. Registries are
+read-only mappings; styles must not be modified in place - derive a new
+ParagraphStyle (parent=...) instead.
+"""
+
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+# ReportLab's sample sheet, the parent of all AIBA styles
+BASE_STYLES = getSampleStyleSheet()
+
+
+def _paragraph_styles() -> MappingProxyType:
+    company_name = ParagraphStyle(
+        'CompanyName',
+        parent=BASE_STYLES['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#2c5282'),
+        spaceAfter=8,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    header = ParagraphStyle(
+        'ModernHeader',
+        parent=BASE_STYLES['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#2d3748'),
+        spaceAfter=12,
+        fontName='Helvetica-Bold'
+    )
+    document_title = ParagraphStyle(
+        'DocumentTitle',
+        parent=BASE_STYLES['Heading1'],
+        fontSize=20,
+        textColor=colors.HexColor('#2d3748'),
+        spaceAfter=10,
+        alignment=TA_LEFT,
+        fontName='Helvetica-Bold'
+    )
+    normal = ParagraphStyle(
+        'ModernNormal',
+        parent=BASE_STYLES['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#4a5568'),
+        spaceAfter=6,
+        fontName='Helvetica'
+    )
+    meta = ParagraphStyle(
+        'MetaStyle',
+        parent=BASE_STYLES['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#4a5568'),
+        alignment=TA_RIGHT,
+        fontName='Helvetica'
+    )
+    customer_name = ParagraphStyle(
+        'CustomerName',
+        parent=BASE_STYLES['Normal'],
+        fontSize=16,
+        textColor=colors.HexColor('#1a202c'),
+        fontName='Helvetica-Bold',
+        spaceAfter=8
+    )
+
+    styles = {
+        'CompanyName': company_name,
+        'ModernHeader': header,
+        'DocumentTitle': document_title,
+        'ModernNormal': normal,
+        'MetaStyle': meta,
+        'CustomerName': customer_name,
+        # Variants the _build_* methods used to create inline per document
+        'ProformaTitle': ParagraphStyle('ProformaTitle', parent=document_title, fontSize=18,
+                                        alignment=TA_CENTER, spaceAfter=30),
+        'Tagline': ParagraphStyle('Tagline', parent=normal, fontSize=12,
+                                  textColor=colors.HexColor('#718096'), alignment=TA_CENTER, spaceAfter=15),
+        'CustomerTitle': ParagraphStyle('CustomerTitle', parent=normal, fontSize=12,
+                                        textColor=colors.HexColor('#4a5568'), fontName='Helvetica-Bold'),
+        'SupplierTitle': ParagraphStyle('SupplierTitle', parent=normal, fontSize=12,
+                                        textColor=colors.HexColor('#4a5568'), fontName='Helvetica-Bold'),
+        'Terms': ParagraphStyle('Terms', parent=normal, fontSize=10, leftIndent=10, bulletIndent=5),
+        'POTerms': ParagraphStyle('POTerms', parent=normal, fontSize=10, leftIndent=10),
+        'Signature': ParagraphStyle('Signature', parent=normal, alignment=TA_CENTER),
+        'POSignature': ParagraphStyle('POSignature', parent=normal, alignment=TA_CENTER),
+    }
+    return MappingProxyType(styles)
+
+
+PARAGRAPH_STYLES = _paragraph_styles()
+
+
+def _table_styles() -> MappingProxyType:
+    boxed_terms = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0fff4')),
+        ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#38a169')),
+        ('LEFTPADDING', (0, 0), (-1, -1), 15),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 15),
+        ('TOPPADDING', (0, 0), (-1, -1), 15),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+    ])
+
+    styles = {
+        'contact': TableStyle([
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#4a5568')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 5),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+        ]),
+        'document_header': TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ]),
+        'customer_card': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f7fafc')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 15),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
+        ]),
+        # Proforma items table: header row, item rows, then three summary rows
+        'proforma_items': TableStyle([
+            # Header row - light gray background
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+
+            # Data rows
+            ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -4), 9),
+            ('ALIGN', (0, 1), (0, -4), 'CENTER'),  # S.No
+            ('ALIGN', (1, 1), (1, -4), 'LEFT'),    # Description
+            ('ALIGN', (2, 1), (-1, -4), 'RIGHT'),  # Qty, Rate, Amount
+
+            # Summary rows styling
+            ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, -3), (-1, -1), 10),
+            ('ALIGN', (3, -3), (-1, -1), 'RIGHT'),
+            ('ALIGN', (4, -3), (-1, -1), 'RIGHT'),
+
+            # Grid - black borders like the image
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+
+            # Padding
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+        # Same table on pages before the last: header row and item rows only
+        'proforma_items_page': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # S.No
+            ('ALIGN', (1, 1), (1, -1), 'LEFT'),    # Description
+            ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),  # Qty, Rate, Amount
+
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+        'totals': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -2), colors.HexColor('#f8fafc')),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#2c5282')),
+            ('TEXTCOLOR', (0, 0), (-1, -2), colors.HexColor('#4a5568')),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -2), 12),
+            ('FONTSIZE', (0, -1), (-1, -1), 14),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+        'right_wrapper': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]),
+        'terms_box': boxed_terms,
+        'po_terms_box': boxed_terms,
+        'footer': TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ]),
+        'po_header': TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]),
+        'supplier_card': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0fff4')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 15),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#48bb78')),
+        ]),
+        'po_items': TableStyle([
+            # Header
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#48bb78')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+
+            # Data
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+            ('ALIGN', (1, 1), (-1, -1), 'LEFT'),
+
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+        ]),
+        'signature': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+        ]),
+    }
+    return MappingProxyType(styles)
+
+
+TABLE_STYLES = _table_styles()
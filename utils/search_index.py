@@ -0,0 +1,155 @@
+"""
+Search Index for AIBA
+Prefix n-gram tokens stored on Firestore records (queried with array_contains)
+plus an in-process inverted index that caches token postings per user
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+from .ttl_cache import TTLCache
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Longest prefix indexed per word; longer query words are truncated to match
+MAX_PREFIX_LENGTH = 15
+
+
+def tokenize_search_text(*parts: str) -> List[str]:
+    """Lowercase alphanumeric words from the given fields (deduplicated, in order)"""
+    words = []
+    seen = set()
+    for part in parts:
+        for word in WORD_PATTERN.findall(str(part or '').lower()):
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+    return words
+
+
+def build_search_tokens(*parts: str) -> List[str]:
+    """Every word prefix (1..MAX_PREFIX_LENGTH chars) of the given fields, for storage"""
+    tokens = set()
+    for word in tokenize_search_text(*parts):
+        for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+            tokens.add(word[:length])
+    return sorted(tokens)
+
+
+def query_tokens(search_term: str) -> List[str]:
+    """Tokens a record must contain to match ``search_term``, most selective first"""
+    tokens = {word[:MAX_PREFIX_LENGTH] for word in tokenize_search_text(search_term)}
+    return sorted(tokens, key=len, reverse=True)
+
+
+class _UserIndex:
+    """Token postings loaded so far for one user and scope"""
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.postings: "OrderedDict[str, Set[str]]" = OrderedDict()
+        self.records: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+
+    def _drop_unreferenced(self):
+        referenced = set()
+        for ids in self.postings.values():
+            referenced |= ids
+        for doc_id in list(self.records):
+            if doc_id not in referenced:
+                del self.records[doc_id]
+
+
+class SearchIndexCache:
+    """
+    In-process inverted index in front of the Firestore search tokens.
+
+    A token's posting list is only cached once it was loaded completely
+    from Firestore; saves and deletes then keep loaded postings current,
+    so a cached token always answers exactly like the Firestore query.
+    """
+
+    def __init__(self, max_users: int = 512, max_tokens_per_user: int = 256,
+                 ttl_seconds: Optional[float] = 600):
+        self.max_tokens_per_user = max_tokens_per_user
+        self.users = TTLCache(max_entries=max_users, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+
+    def _user_index(self, scope: str, user_id: str, create: bool = True) -> Optional[_UserIndex]:
+        key = (scope, user_id)
+        with self._lock:
+            index = self.users.get(key)
+            if index is None and create:
+                index = _UserIndex(self.max_tokens_per_user)
+                self.users.set(key, index)
+            return index
+
+    def lookup(self, scope: str, user_id: str, token: str) -> Optional[List[Dict]]:
+        """Cached records for ``token``, or None if the token was never loaded"""
+        index = self._user_index(scope, user_id, create=False)
+        if index is None:
+            return None
+        with index.lock:
+            ids = index.postings.get(token)
+            if ids is None:
+                return None
+            index.postings.move_to_end(token)
+            return [dict(index.records[doc_id]) for doc_id in ids if doc_id in index.records]
+
+    def store(self, scope: str, user_id: str, token: str, records: Dict[str, Dict]):
+        """Cache the complete posting list for ``token``"""
+        index = self._user_index(scope, user_id)
+        with index.lock:
+            index.postings[token] = set(records)
+            index.postings.move_to_end(token)
+            index.records.update({doc_id: dict(record) for doc_id, record in records.items()})
+            if len(index.postings) > index.max_tokens:
+                while len(index.postings) > index.max_tokens:
+                    index.postings.popitem(last=False)
+                index._drop_unreferenced()
+
+    def upsert(self, scope: str, user_id: str, doc_id: str, record: Dict):
+        """Apply a saved record to every loaded posting list"""
+        index = self._user_index(scope, user_id, create=False)
+        if index is None:
+            return
+        tokens = set(record.get('search_tokens') or [])
+        with index.lock:
+            present = False
+            for token, ids in index.postings.items():
+                if token in tokens:
+                    ids.add(doc_id)
+                    present = True
+                else:
+                    ids.discard(doc_id)
+            if present:
+                index.records[doc_id] = dict(record)
+            else:
+                index.records.pop(doc_id, None)
+
+    def update_fields(self, scope: str, user_id: str, doc_id: str, updates: Dict):
+        """Patch a cached record in place (e.g. a status change)"""
+        index = self._user_index(scope, user_id, create=False)
+        if index is None:
+            return
+        with index.lock:
+            if doc_id in index.records:
+                index.records[doc_id].update(updates)
+
+    def invalidate(self, scope: str = None, user_id: str = None):
+        """Forget cached postings (all, one scope, or one user)"""
+        with self._lock:
+            for key in self.users.keys():
+                if (scope is None or key[0] == scope) and (user_id is None or key[1] == user_id):
+                    self.users.pop(key)
+
+    def stats(self) -> Dict:
+        return self.users.stats()
+
+
+def matches_all(record: Dict, tokens: Iterable[str]) -> bool:
+    """True when the record's stored search tokens contain every query token"""
+    record_tokens = set(record.get('search_tokens') or [])
+    return all(token in record_tokens for token in tokens)
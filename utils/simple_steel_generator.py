@@ -6,13 +6,13 @@ Pure ReportLab implementation without any WeasyPrint dependencies
 from .enhanced_reportlab_generator import EnhancedReportLabGenerator
 from datetime import datetime, timedelta
 import os
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 class SimpleSteelPDFGenerator:
     """Simple Steel PDF Generator using only ReportLab"""
     
     def __init__(self):
-        os.makedirs('data', exist_ok=True)
+        # data/ is created on first save so rendering works on read-only filesystems
         self.reportlab_generator = EnhancedReportLabGenerator()
     
     def generate_quotation_pdf(
@@ -51,4 +51,50 @@ class SimpleSteelPDFGenerator:
             po_number=po_number,
             reference=reference,
             output_filename=output_filename
-        ) 
\ No newline at end of file
+        )
+    
+    def render_quotation_pdf(
+        self,
+        seller: dict,
+        buyer: dict,
+        bank: dict,
+        items: list,
+        terms: dict = None,
+        output_filename: str = None,
+        save_to_disk: bool = False
+    ) -> Tuple[str, bytes]:
+        """Render steel quotation PDF in memory; returns (filename, PDF bytes)"""
+        filename, pdf_bytes = self.reportlab_generator.render_quotation_pdf(
+            seller=seller,
+            buyer=buyer,
+            bank=bank,
+            items=items,
+            terms=terms,
+            output_filename=output_filename
+        )
+        if save_to_disk:
+            self.reportlab_generator.save_pdf(filename, pdf_bytes)
+        return filename, pdf_bytes
+    
+    def render_purchase_order_pdf(
+        self,
+        seller: dict,
+        supplier: dict,
+        items: list,
+        po_number: str = None,
+        reference: str = None,
+        output_filename: str = None,
+        save_to_disk: bool = False
+    ) -> Tuple[str, bytes]:
+        """Render purchase order PDF in memory; returns (filename, PDF bytes)"""
+        filename, pdf_bytes = self.reportlab_generator.render_purchase_order_pdf(
+            seller=seller,
+            supplier=supplier,
+            items=items,
+            po_number=po_number,
+            reference=reference,
+            output_filename=output_filename
+        )
+        if save_to_disk:
+            self.reportlab_generator.save_pdf(filename, pdf_bytes)
+        return filename, pdf_bytes
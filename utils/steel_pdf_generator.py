@@ -8,6 +8,12 @@ from datetime import datetime, timedelta
 import os
 from typing import Dict, List
 
+from functools import lru_cache
+
+from .line_items import LineItems
+from .pdf_assets import local_font_faces_css
+from .pdf_render_cache import pdf_render_cache
+
 # WeasyPrint availability will be checked only when needed
 WEASYPRINT_AVAILABLE = None
 
@@ -19,7 +25,15 @@ def _check_weasyprint_available():
     except (ImportError, OSError):
         return False
 
+@lru_cache(maxsize=1)
+def _bundled_font_faces() -> str:
+    """@font-face rules for the bundled Inter files (checked once per process)"""
+    return local_font_faces_css('Inter')
+
 class SteelPDFGenerator:
+    # Parsed enhanced CSS shared by every instance (see _enhanced_stylesheet)
+    _parsed_css = None
+    
     def __init__(self):
         os.makedirs('data', exist_ok=True)
         
@@ -77,12 +91,9 @@ class SteelPDFGenerator:
         output_path = os.path.join('data', output_filename)
         
         # Calculate totals and generate item rows
-        rows_html, subtotal = self._generate_item_rows(items)
-        
-        # Calculate GST and total
         gst_rate = terms.get('gst_rate', 18) if terms else 18
-        gst_amount = round(subtotal * (gst_rate / 100), 2)
-        grand_total = round(subtotal + gst_amount, 2)
+        rows_html, totals = self._generate_item_rows(items, gst_rate)
+        subtotal, gst_amount, grand_total = totals['subtotal'], totals['gst'], totals['grand_total']
         
         # Generate quote number
         quote_number = f"AIBA-Q-{datetime.now().strftime('%Y%m%d%H%M')}"
@@ -105,12 +116,13 @@ class SteelPDFGenerator:
             terms=terms or {}
         )
         
-        # Generate PDF using WeasyPrint
-        from weasyprint import HTML, CSS
-        HTML(string=html_content).write_pdf(
-            output_path,
-            stylesheets=[CSS(string=self._get_enhanced_css())]
+        # Generate PDF using WeasyPrint (stylesheet built and parsed once per process)
+        pdf_bytes = pdf_render_cache.write_pdf(
+            html_content,
+            stylesheets=[self._enhanced_stylesheet()]
         )
+        with open(output_path, 'wb') as f:
+            f.write(pdf_bytes)
         
         return output_filename
     
@@ -156,47 +168,44 @@ class SteelPDFGenerator:
             date_str=datetime.now().strftime('%d %B %Y')
         )
         
-        # Generate PDF using WeasyPrint
-        from weasyprint import HTML, CSS
-        HTML(string=html_content).write_pdf(
-            output_path,
-            stylesheets=[CSS(string=self._get_enhanced_css())]
+        # Generate PDF using WeasyPrint (stylesheet built and parsed once per process)
+        pdf_bytes = pdf_render_cache.write_pdf(
+            html_content,
+            stylesheets=[self._enhanced_stylesheet()]
         )
+        with open(output_path, 'wb') as f:
+            f.write(pdf_bytes)
         
         return output_filename
     
-    def _generate_item_rows(self, items: list) -> tuple:
-        """Generate HTML rows for items table and calculate subtotal"""
-        rows_html = ""
-        subtotal = 0
-        
-        for i, item in enumerate(items, start=1):
-            # Calculate weight for steel items
-            if all(key in item for key in ['thk', 'w', 'l', 'nos']):
+    def _generate_item_rows(self, items: list, gst_rate: float = 18) -> tuple:
+        """Generate HTML rows for items table; returns (rows HTML, LineItems totals)"""
+        # Weights and amounts for all rows in one batch, rounded to the paisa
+        line_items = LineItems.from_items(items)
+        weights, rates, amounts = line_items.weights, line_items.rates, line_items.amounts
+        row_html = []
+        
+        for i, item in enumerate(items):
+            if line_items.has_dims[i]:
                 # Steel plate/sheet calculation: thickness × width × length × density × quantity
-                weight = round((item['thk'] * item['w'] * item['l'] * 7.85 * item['nos']) / 1_000_000, 2)
-                quantity_display = f"{weight:.2f} kg"
+                quantity_display = f"{weights[i]:.2f} kg"
             else:
                 # For other items, use provided quantity
                 weight = item.get('weight', item.get('quantity', 0))
                 unit = item.get('unit', 'kg')
                 quantity_display = f"{weight} {unit}"
             
-            rate = item.get('rate', 0)
-            amount = round(float(weight) * float(rate), 2)
-            subtotal += amount
-            
-            rows_html += f"""
+            row_html.append(f"""
                 <tr>
-                    <td class="text-center">{i}</td>
+                    <td class="text-center">{i + 1}</td>
                     <td>{item['desc']}</td>
                     <td class="text-center">{quantity_display}</td>
-                    <td class="text-right">₹{rate:.2f}</td>
-                    <td class="text-right">₹{amount:,.2f}</td>
+                    <td class="text-right">₹{rates[i]:.2f}</td>
+                    <td class="text-right">₹{amounts[i]:,.2f}</td>
                 </tr>
-            """
+            """)
         
-        return rows_html, subtotal
+        return "".join(row_html), line_items.totals(gst_rate=gst_rate)
     
     def _generate_po_item_rows(self, items: list) -> str:
         """Generate HTML rows for PO items table"""
@@ -476,10 +485,16 @@ class SteelPDFGenerator:
         </html>
         """
     
+    def _enhanced_stylesheet(self):
+        """The parsed enhanced stylesheet, built and parsed once per process"""
+        stylesheet = SteelPDFGenerator._parsed_css
+        if stylesheet is None:
+            stylesheet = SteelPDFGenerator._parsed_css = pdf_render_cache.stylesheet(self._get_enhanced_css())
+        return stylesheet
+    
     def _get_enhanced_css(self) -> str:
-        """Get enhanced CSS for modern steel industry styling"""
-        return """
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+        """Get enhanced CSS for modern steel industry styling (fonts come from static/fonts, never the network)"""
+        return _bundled_font_faces() + """
         
         * {
             margin: 0;
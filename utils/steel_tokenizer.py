@@ -0,0 +1,179 @@
+"""
+Steel Description Tokenizer for AIBA
+One precompiled pattern that scans a steel description or enquiry line in
+a single pass and yields its tokens - plate dimensions, angles, sections,
+rounds, piece counts and rates - shared by every parser that needs them.
+
+    parse_steel_description("MS Plate 12mm x 1.25m x 2500 - 4 Nos @ ₹84")
+    -> {'kind': 'plate', 'thk': 12, 'w': 1250, 'l': 2500, 'nos': 4, 'rate': 84, ...}
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_NUMBER = r'\d+(?:\.\d+)?'
+_BY = r'\s*[x×*]\s*'
+# "round 10 nos" after "25mm dia" is a count, not a second round
+_COUNT_AHEAD = r'\s*(?:mm\s*)?(?:nos|pcs|pieces|plates?)\b'
+
+# Alternatives are tried left to right at each position, so the more specific
+# shapes (angles before sections, plates before bare counts) come first. The
+# leading lookahead skips positions no token can start at without trying
+# every alternative there, which keeps the scan fast on free-text enquiries.
+TOKEN_PATTERN = re.compile(
+    rf"""
+    (?=[\d@øØ⌀aird])
+    (?:(?P<angle>\b(?:isa|angle)\s*-?\s*(?P<leg_a>{_NUMBER}){_BY}(?P<leg_b>{_NUMBER}){_BY}(?P<angle_thk>{_NUMBER})(?:\s*mm)?)
+    | (?P<plate>(?P<thk>{_NUMBER})\s*(?:mm)?{_BY}(?P<w>{_NUMBER})\s*(?P<w_unit>mm|m\b)?{_BY}(?P<l>{_NUMBER})(?:\s*(?P<l_unit>mm|m)\b)?)
+    | (?P<section>\b(?P<section_type>ismb|ismc|isa|rsj)\s*-?\s*(?P<section_size>\d+))
+    | (?P<round>(?:\b(?:rd|round|dia)\s*|[ø⌀]\s*)(?P<dia>{_NUMBER})(?!\d|\.\d|{_COUNT_AHEAD})(?:\s*mm)?|(?P<dia_first>{_NUMBER})\s*(?:mm)?\s*(?:dia|round|rd)\b)
+    | (?P<count>(?P<nos>\d+)\s*(?:nos|pcs|pieces|plates?)\b)
+    | (?P<rate>@\s*₹?\s*(?P<rate_value>{_NUMBER})))
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+SHAPES = ('plate', 'angle', 'section', 'round')
+TOKEN_KINDS = SHAPES + ('count', 'rate')
+
+# Density of steel in kg per mm³ x 1,000,000 (the 7.85 in the plate formula)
+STEEL_DENSITY = 7.85
+
+# Sections and other long products are priced on standard 6 m lengths
+STANDARD_LENGTH_MM = 6000
+
+
+def _number(text: str):
+    """int for whole numbers, float otherwise"""
+    if '.' not in text:
+        return int(text)
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _mm(value: str, unit: Optional[str]):
+    if unit and unit.lower() == 'm':
+        number = float(value) * 1000
+        return int(number) if number.is_integer() else number
+    return _number(value)
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, re.Match]]:
+    """Yield (kind, match) for every token in ``text``, left to right, in one scan"""
+    # Each alternative is wrapped in its own named group, which closes last,
+    # so lastgroup is the token kind
+    for match in TOKEN_PATTERN.finditer(text or ''):
+        yield match.lastgroup, match
+
+
+def _shape(kind: str, match: re.Match) -> Dict:
+    if kind == 'plate':
+        return {
+            'kind': 'plate',
+            'thk': _number(match.group('thk')),
+            'w': _mm(match.group('w'), match.group('w_unit')),
+            'l': _mm(match.group('l'), match.group('l_unit'))
+        }
+    if kind == 'angle':
+        return {
+            'kind': 'angle',
+            'leg_a': _number(match.group('leg_a')),
+            'leg_b': _number(match.group('leg_b')),
+            'thk': _number(match.group('angle_thk'))
+        }
+    if kind == 'section':
+        return {
+            'kind': 'section',
+            'section': match.group('section_type').lower(),
+            'size': int(match.group('section_size'))
+        }
+    return {
+        'kind': 'round',
+        'dia': _number(match.group('dia') or match.group('dia_first'))
+    }
+
+
+def parse_steel_description(text: str) -> Optional[Dict]:
+    """
+    Parse one item description (or one enquiry line) in a single pass
+
+    The first shape found decides the item; its piece count is the first
+    "N nos/pcs/pieces/plates" after it (or before it, as in "4 nos 10x1250x6300").
+    Results are memoised, since the same descriptions are parsed again when
+    a draft is re-enriched and when its PDF is built.
+
+    Returns:
+        Dict with 'kind' ('plate', 'angle', 'section' or 'round'), the shape's
+        dimensions in mm, 'nos' and 'rate' (None when absent), or None if the
+        text has no recognisable shape
+    """
+    parsed = _parse(text or '')
+    return dict(parsed) if parsed else None
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str) -> Optional[Tuple]:
+    spec = None
+    count_before = None
+    rate = None
+    for match in TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'count':
+            if spec is None:
+                if count_before is None:
+                    count_before = int(match.group('nos'))
+            elif spec['nos'] is None:
+                spec['nos'] = int(match.group('nos'))
+        elif kind == 'rate':
+            if rate is None:
+                rate = _number(match.group('rate_value'))
+        elif spec is None:
+            spec = _shape(kind, match)
+            spec['nos'] = None
+
+    if spec is None:
+        return None
+    if spec['nos'] is None:
+        spec['nos'] = count_before
+    spec['rate'] = rate
+    return tuple(spec.items())
+
+
+def find_plate_dimensions(text: str) -> List[Tuple]:
+    """(thk, w, l) in mm for every plate in ``text``"""
+    plates = []
+    for kind, match in tokenize(text):
+        if kind == 'plate':
+            shape = _shape(kind, match)
+            plates.append((shape['thk'], shape['w'], shape['l']))
+    return plates
+
+
+def find_count(text: str) -> Optional[int]:
+    """First "N nos/pcs/pieces/plates" count in ``text``"""
+    for kind, match in tokenize(text):
+        if kind == 'count':
+            return int(match.group('nos'))
+    return None
+
+
+def find_rate(text: str) -> Optional[float]:
+    """First "@ ₹N" rate in ``text``"""
+    for kind, match in tokenize(text):
+        if kind == 'rate':
+            return float(match.group('rate_value'))
+    return None
+
+
+def kg_per_meter(spec: Dict) -> float:
+    """Theoretical weight per metre of an angle or round bar"""
+    if spec['kind'] == 'angle':
+        # Two legs sharing the corner square: (a + b - t) x t mm²
+        area_mm2 = (spec['leg_a'] + spec['leg_b'] - spec['thk']) * spec['thk']
+    elif spec['kind'] == 'round':
+        area_mm2 = math.pi * spec['dia'] ** 2 / 4
+    else:
+        return 0.0
+    return round(area_mm2 * STEEL_DENSITY / 1000, 3)
@@ -4,11 +4,60 @@ Supports both WeasyPrint (preferred) and ReportLab (Windows fallback)
 Uses Jinja2 HTML templates for professional document generation
 """
 
+import hashlib
 import os
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from .line_items import LineItems
+from .pdf_render_cache import pdf_render_cache
+
+
+def build_template_data(document_data: Dict, user_profile: Dict, document_type: str) -> Dict[str, Any]:
+    """
+    Prepare AIBA document data plus the seller's profile for the template generator
+    
+    Args:
+        document_data: Customer, items and terms collected for the document
+        user_profile: Seller profile (business name, address, email, GST number)
+        document_type: 'quotation' or 'purchase_order'
+        
+    Returns:
+        Dict: Flat data accepted by generate_quotation_pdf/generate_purchase_order_pdf
+    """
+    template_data = {
+        'customer_name': document_data.get('customer_name', 'Customer'),
+        'customer_address': document_data.get('customer_address', 'Customer Address'),
+        'customer_email': document_data.get('customer_email', 'customer@email.com'),
+        'customer_gstin': document_data.get('customer_gstin', 'Customer GST'),
+        'seller_name': user_profile.get('business_name', 'IGNITE INDUSTRIAL CORPORATION'),
+        'seller_address': user_profile.get('business_address', 'No.1A, 1st FLOOR, JONES STREET, MANNADY, CHENNAI - 600001'),
+        'seller_email': user_profile.get('business_email', 'igniteindustrialcorporation@gmail.com'),
+        'seller_gstin': user_profile.get('gst_number', '33AAKFI5034N1Z6'),
+        'items': document_data.get('items', []),
+        'quote_number': f"AIBA-{document_type.upper()[0]}-{datetime.now().strftime('%Y%m%d%H%M')}",
+        'date': datetime.now().strftime('%d %B %Y'),
+        'valid_until': (datetime.now() + timedelta(days=30)).strftime('%d %B %Y'),
+        # ✨ Terms & Conditions Logic (Corrected) - Pass individual terms
+        'loading_charges': document_data.get('loading_charges', 'Included'),
+        'transport_charges': document_data.get('transport_charges', 'Included'),
+        'payment_terms': document_data.get('payment_terms', 'Included')
+    }
+    
+    # Add purchase order specific fields
+    if document_type == 'purchase_order':
+        template_data.update({
+            'po_number': template_data['quote_number'].replace('Q-', 'PO-'),
+            'delivery_date': (datetime.now() + timedelta(days=14)).strftime('%d %B %Y'),
+            'urgent': document_data.get('urgent', False),
+            'delivery_address': document_data.get('delivery_address', template_data['customer_address']),
+            'delivery_contact': document_data.get('delivery_contact', 'Site Manager'),
+            'delivery_phone': document_data.get('delivery_phone', '+91-XXXXXXXXX'),
+            'delivery_instructions': document_data.get('delivery_instructions', 'Please call before delivery')
+        })
+    
+    return template_data
+
 
 class TemplatePDFGenerator:
     """Professional template-based PDF generator with WeasyPrint and ReportLab fallback"""
@@ -21,10 +70,9 @@ class TemplatePDFGenerator:
             template_dir: Directory containing Jinja2 templates
         """
         self.template_dir = template_dir
-        self.template_env = Environment(
-            loader=FileSystemLoader(template_dir),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
+        # Shared per process: templates compile once, static <style> blocks are pre-parsed
+        self.template_env = pdf_render_cache.environment(template_dir)
+        self._template_versions = {}
         
         # Try to import WeasyPrint
         self.weasyprint_available = False
@@ -85,35 +133,25 @@ class TemplatePDFGenerator:
             }
         }
         
-        # Process items
-        total_weight = 0.0
-        subtotal = 0.0
+        # Amounts and totals for all items in one batch, rounded to the paisa
+        items = data.get('items', [])
+        line_items = LineItems.from_items(items)
+        weights = line_items.weights
+        amounts = line_items.amounts
         
-        for item in data.get('items', []):
-            # Extract description and calculate weight
-            description = item.get('description', 'Steel Item')
-            qty = float(item.get('quantity', 0))
-            rate = float(item.get('rate', 0))
-            amount = qty * rate
-            
+        for index, item in enumerate(items):
             template_data['items'].append({
-                'description': description,
-                'qty': qty,
-                'rate': rate,
-                'amount': amount
+                'description': item.get('description', 'Steel Item'),
+                'qty': weights[index] if line_items.has_dims[index] else line_items.quantity[index],
+                'rate': line_items.rate[index],
+                'amount': amounts[index]
             })
-            
-            total_weight += qty
-            subtotal += amount
-        
-        # Calculate GST and totals
-        gst_amount = subtotal * 0.18
-        grand_total = subtotal + gst_amount
         
+        totals = line_items.totals(gst_rate=template_data['summary']['gst_rate'])
         template_data['summary'].update({
-            'subtotal': subtotal,
-            'gst': gst_amount,
-            'grand_total': grand_total
+            'subtotal': totals['subtotal'],
+            'gst': totals['gst'],
+            'grand_total': totals['grand_total']
         })
         
         return template_data
@@ -130,11 +168,10 @@ class TemplatePDFGenerator:
             bytes: PDF content
         """
         try:
-            template = self.template_env.get_template(template_name)
-            html_content = template.render(**data)
+            html_content, stylesheets = pdf_render_cache.render_template(self.template_dir, template_name, data)
             
-            # Generate PDF with WeasyPrint
-            pdf_bytes = self.weasyprint_HTML(string=html_content).write_pdf()
+            # Generate PDF with WeasyPrint (cached stylesheets and font configuration)
+            pdf_bytes = pdf_render_cache.write_pdf(html_content, stylesheets=stylesheets)
             return pdf_bytes
             
         except Exception as e:
@@ -187,7 +224,7 @@ class TemplatePDFGenerator:
             # Generate with ReportLab
             generator = SimpleSteelPDFGenerator()
             if doc_type == 'quotation':
-                pdf_path = generator.generate_quotation_pdf(
+                _, pdf_bytes = generator.render_quotation_pdf(
                     seller=seller,
                     buyer=buyer,
                     bank=bank,
@@ -197,7 +234,7 @@ class TemplatePDFGenerator:
                 )
             else:
                 # For purchase orders, swap seller and buyer (supplier)
-                pdf_path = generator.generate_purchase_order_pdf(
+                _, pdf_bytes = generator.render_purchase_order_pdf(
                     seller=buyer,  # In PO, buyer becomes the seller
                     supplier=seller,  # In PO, seller becomes the supplier
                     items=converted_items,
@@ -206,19 +243,47 @@ class TemplatePDFGenerator:
                     output_filename=filename
                 )
             
-            # Read the generated PDF file and return as bytes
-            # The generator returns just the filename, so we need to construct the full path
-            full_pdf_path = os.path.join('data', pdf_path) if not os.path.isabs(pdf_path) else pdf_path
-            
-            with open(full_pdf_path, 'rb') as f:
-                pdf_bytes = f.read()
-            
             return pdf_bytes
                 
         except Exception as e:
             print(f"❌ ReportLab fallback failed: {e}")
             raise
     
+    def template_version(self, document_type: str) -> str:
+        """
+        Short content hash of the template used for a document type (part of PDF cache keys)
+        
+        Args:
+            document_type: 'quotation' or 'purchase_order'
+            
+        Returns:
+            str: Hash of the template source, or '' if it can't be read
+        """
+        template_name = 'quotation_template.html' if document_type == 'quotation' else 'purchase_order_template.html'
+        version = self._template_versions.get(template_name)
+        if version is None:
+            try:
+                with open(os.path.join(self.template_dir, template_name), 'rb') as f:
+                    version = hashlib.sha1(f.read()).hexdigest()[:12]
+            except OSError:
+                version = ''
+            self._template_versions[template_name] = version
+        return version
+    
+    def warm_up(self) -> bool:
+        """
+        Compile the PDF templates, parse their stylesheets and load fonts ahead of the first request
+        
+        Returns:
+            bool: True if WeasyPrint is ready
+        """
+        if not self.weasyprint_available:
+            return False
+        return pdf_render_cache.warm_up(
+            self.template_dir,
+            ['quotation_template.html', 'purchase_order_template.html']
+        )
+    
     def generate_quotation_pdf(self, data: Dict[str, Any]) -> bytes:
         """
         Generate a professional quotation PDF
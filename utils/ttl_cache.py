@@ -0,0 +1,208 @@
+"""
+TTL Cache for AIBA
+Thread-safe, size-bounded LRU cache with optional time-to-live expiry
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries also expire after ``ttl_seconds``"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of live entries before LRU eviction
+            ttl_seconds: Seconds since last write after which an entry expires (None = never)
+            on_evict: Optional callback ``(key, value)`` run for every evicted or expired entry
+            max_bytes: Optional cap on the summed ``sizeof`` of all entries
+            sizeof: Size estimate for a value (required for ``max_bytes``)
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        # key -> (value, stored_at, size)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._expiry_thread = None
+        self._expiry_stop = threading.Event()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def _notify(self, evicted: List[Tuple[Hashable, Any]]):
+        """Run the eviction callback outside the lock so it may do slow I/O"""
+        if not self.on_evict:
+            return
+        for key, value in evicted:
+            try:
+                self.on_evict(key, value)
+            except Exception as e:
+                print(f"⚠️ Cache eviction callback failed for {key}: {e}")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` and mark it most recently used"""
+        expired = []
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, stored_at, size = entry
+            if self._is_expired(stored_at, time.monotonic()):
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                expired.append((key, value))
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+        self._notify(expired)
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Store ``value`` under ``key``, evicting least recently used entries if full"""
+        evicted = []
+        size = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._data[key] = (value, time.monotonic(), size)
+            self._bytes += size
+
+            # Never evict the entry just written, even if it alone exceeds max_bytes
+            while len(self._data) > 1 and (
+                len(self._data) > self.max_entries or
+                (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                old_key, (old_value, _, old_size) = self._data.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+                evicted.append((old_key, old_value))
+
+        self._notify(evicted)
+
+    def touch(self, key: Hashable) -> bool:
+        """Refresh the TTL of ``key`` without replacing its value"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            self._data[key] = (entry[0], time.monotonic(), entry[2])
+            self._data.move_to_end(key)
+            return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove ``key`` without running the eviction callback"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+        return entry[0] if entry is not None else default
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry and return how many were removed"""
+        if self.ttl_seconds is None:
+            return 0
+
+        expired = []
+        now = time.monotonic()
+        with self._lock:
+            for key, (value, stored_at, size) in list(self._data.items()):
+                if self._is_expired(stored_at, now):
+                    del self._data[key]
+                    self._bytes -= size
+                    expired.append((key, value))
+            self.expirations += len(expired)
+
+        self._notify(expired)
+        return len(expired)
+
+    def clear(self):
+        """Remove all entries without running the eviction callback"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def start_background_expiry(self, interval_seconds: float = 60):
+        """Purge expired entries from a daemon thread every ``interval_seconds``"""
+        if self.ttl_seconds is None or (self._expiry_thread and self._expiry_thread.is_alive()):
+            return
+
+        def run():
+            while not self._expiry_stop.wait(interval_seconds):
+                try:
+                    self.purge_expired()
+                except Exception as e:
+                    print(f"⚠️ Cache expiry sweep failed: {e}")
+
+        self._expiry_stop.clear()
+        self._expiry_thread = threading.Thread(target=run, name='ttl-cache-expiry', daemon=True)
+        self._expiry_thread.start()
+
+    def stop_background_expiry(self):
+        self._expiry_stop.set()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def values(self) -> List[Any]:
+        with self._lock:
+            return [entry[0] for entry in self._data.values()]
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._data.items()]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._is_expired(entry[1], time.monotonic())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for AIBA
+
+    gunicorn wsgi:app
+"""
+
+from app import init_app
+
+app = init_app()